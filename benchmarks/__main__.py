@@ -0,0 +1,53 @@
+import argparse
+import sys
+from typing import List
+
+from benchmarks import suites
+from benchmarks.runner import Benchmark, Result, load, measure, regressions, report, save
+
+SUITES = ('fixtures', 'scaled', 'client')
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Benchmarks for ttss.')
+    parser.add_argument('-s', '--suite', dest='suites', action='append', choices=SUITES,
+                        help='suite to run, can be repeated (default: all)')
+    parser.add_argument('-k', dest='keyword', default='', help='only run benchmarks containing this substring')
+    parser.add_argument('--runs', type=int, default=20, help='timed runs per benchmark')
+    parser.add_argument('--save', metavar='PATH', help='save the results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare the results with a saved baseline')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative p50/peak memory increase reported as a regression (default: 0.1)')
+    args = parser.parse_args()
+
+    selected_suites = args.suites or SUITES
+    baseline = load(args.compare) if args.compare else None
+
+    def run(benchmarks: List[Benchmark]) -> List[Result]:
+        selected = [benchmark for benchmark in benchmarks if args.keyword in benchmark.name]
+        return [measure(benchmark, runs=args.runs) for benchmark in selected]
+
+    results: List[Result] = []
+    if 'fixtures' in selected_suites:
+        results += run(suites.fixtures())
+    if 'scaled' in selected_suites:
+        results += run(suites.scaled())
+    if 'client' in selected_suites:
+        with suites.client_server() as server:
+            results += run(suites.client(server))
+
+    print(report(results, baseline))
+
+    if args.save:
+        save(results, args.save)
+
+    if baseline is not None:
+        messages = regressions(results, baseline, threshold=args.threshold)
+        for message in messages:
+            print(f'REGRESSION {message}', file=sys.stderr)
+        return 1 if messages else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
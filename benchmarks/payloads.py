@@ -0,0 +1,43 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+RESOURCES_DIR = Path(__file__).parent.parent / 'tests' / 'resources'
+
+
+def load_text(name: str) -> str:
+    with open(RESOURCES_DIR / name, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def load_json(name: str) -> Any:
+    return json.loads(load_text(name))
+
+
+def scale_vehicles(count: int) -> Dict[str, Any]:
+    data = load_json('geoserviceDispatcher_vehicleinfo_vehicles.json')
+    vehicles = data['vehicles']
+    return {
+        'lastUpdate': data['lastUpdate'],
+        'vehicles': [dict(vehicles[i % len(vehicles)], id=str(-i - 1)) for i in range(count)],
+    }
+
+
+def scale_stop_passages(count: int) -> Dict[str, Any]:
+    data = load_json('passageInfo_stopPassages_stop.json')
+    passages = data['actual']
+    actual = [
+        dict(passages[i % len(passages)], passageid=str(-i - 1), actualRelativeTime=i * 7200 // count)
+        for i in range(count)
+    ]
+    return dict(data, old=[], actual=actual)
+
+
+def scale_paths(waypoint_count: int, *, waypoints_per_path: int = 500) -> Dict[str, Any]:
+    path = load_json('geoserviceDispatcher_pathinfo_route.json')['paths'][0]
+    waypoints = path['wayPoints']
+    paths: List[Dict[str, Any]] = []
+    for start in range(0, waypoint_count, waypoints_per_path):
+        stop = min(start + waypoints_per_path, waypoint_count)
+        paths.append(dict(path, wayPoints=[waypoints[i % len(waypoints)] for i in range(start, stop)]))
+    return {'paths': paths}
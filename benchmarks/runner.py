@@ -0,0 +1,106 @@
+import json
+import tracemalloc
+from dataclasses import asdict, dataclass
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+@dataclass
+class Benchmark:
+    name: str
+    function: Callable[[], Any]
+    # number of items (objects, requests) processed by a single call, used for throughput
+    items: int = 1
+
+
+@dataclass
+class Result:
+    name: str
+    runs: int
+    items: int
+    p50: float
+    p99: float
+    throughput: float
+    peak_memory: int
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    index = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def measure(benchmark: Benchmark, *, runs: int, warmup: int = 1) -> Result:
+    for _ in range(warmup):
+        benchmark.function()
+
+    timings = []
+    for _ in range(runs):
+        start = perf_counter()
+        benchmark.function()
+        timings.append(perf_counter() - start)
+    timings.sort()
+
+    # separate run, tracemalloc slows down allocations considerably
+    tracemalloc.start()
+    try:
+        benchmark.function()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Result(name=benchmark.name,
+                  runs=runs,
+                  items=benchmark.items,
+                  p50=percentile(timings, 50),
+                  p99=percentile(timings, 99),
+                  throughput=benchmark.items * len(timings) / sum(timings),
+                  peak_memory=peak_memory)
+
+
+def save(results: Iterable[Result], path: str) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([asdict(result) for result in results], f, indent=2)
+
+
+def load(path: str) -> Dict[str, Result]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return {result['name']: Result(**result) for result in json.load(f)}
+
+
+def regressions(results: Iterable[Result], baseline: Dict[str, Result], *, threshold: float) -> List[str]:
+    messages = []
+    for result in results:
+        before = baseline.get(result.name, None)
+        if before is None:
+            continue
+        if result.p50 > before.p50 * (1 + threshold):
+            messages.append(f'{result.name}: p50 {_time(before.p50)} -> {_time(result.p50)}')
+        if result.peak_memory > before.peak_memory * (1 + threshold):
+            messages.append(f'{result.name}: peak memory {_size(before.peak_memory)} -> {_size(result.peak_memory)}')
+    return messages
+
+
+def report(results: Iterable[Result], baseline: Optional[Dict[str, Result]] = None) -> str:
+    lines = [f'{"benchmark":<40} {"p50":>10} {"p99":>10} {"items/s":>12} {"peak memory":>12} {"vs baseline":>12}']
+    for result in results:
+        before = baseline.get(result.name, None) if baseline is not None else None
+        change = f'{(result.p50 / before.p50 - 1) * 100:+.1f}%' if before is not None else ''
+        lines.append(f'{result.name:<40} {_time(result.p50):>10} {_time(result.p99):>10} '
+                     f'{result.throughput:>12,.0f} {_size(result.peak_memory):>12} {change:>12}')
+    return '\n'.join(lines)
+
+
+def _time(seconds: float) -> str:
+    if seconds >= 1:
+        return f'{seconds:.2f} s'
+    if seconds >= 1e-3:
+        return f'{seconds * 1e3:.2f} ms'
+    return f'{seconds * 1e6:.1f} us'
+
+
+def _size(size: float) -> str:
+    for unit in ('B', 'KiB', 'MiB'):
+        if size < 1024:
+            return f'{size:.1f} {unit}'
+        size /= 1024
+    return f'{size:.1f} GiB'
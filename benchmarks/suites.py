@@ -0,0 +1,105 @@
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, Callable, List
+
+import pytz
+
+from benchmarks.payloads import load_json, load_text, scale_paths, scale_stop_passages, scale_vehicles
+from benchmarks.runner import Benchmark
+from ttss import TTSS, Transport
+from ttss.decoders import decode_paths, decode_stop_passages, decode_vehicles
+from ttss.extractors import extract_autocomplete_stops, extract_autocomplete_stops_json, extract_lookup_fulltext, \
+    extract_near_stops, extract_path_geometries, extract_paths, extract_route_stops, extract_routes, \
+    extract_stop, extract_stop_passages, extract_stop_point, extract_stop_points, extract_stops, \
+    extract_stops_by_character, extract_trip_passages, extract_vehicle_frame, extract_vehicles
+from ttss.testing import MockServer, SyntheticNetwork
+
+NOW = pytz.timezone('Europe/Warsaw').localize(datetime(2021, 6, 28, 21, 33, 19))
+
+
+def _extract(name: str, extractor: Callable[..., Any], data: Any, **kwargs: Any) -> Benchmark:
+    return Benchmark(name=name, function=lambda: extractor(data, **kwargs), items=1)
+
+
+def _count(name: str, function: Callable[[], Any], items: int) -> Benchmark:
+    return Benchmark(name=name, function=function, items=items)
+
+
+def fixtures() -> List[Benchmark]:
+    return [
+        _extract('fixture/autocomplete_stops', extract_autocomplete_stops, load_text('lookup_autocomplete.html')),
+        _extract('fixture/autocomplete_stops_json', extract_autocomplete_stops_json,
+                 load_json('lookup_autocomplete_json.json')),
+        _extract('fixture/lookup_fulltext', extract_lookup_fulltext, load_json('lookup_fulltext_stops.json')),
+        _extract('fixture/stops_by_character', extract_stops_by_character,
+                 load_json('lookup_stopsByCharacter.json')),
+        _extract('fixture/near_stops', extract_near_stops, load_json('lookup_autocomplete_nearStops_json.json')),
+        _extract('fixture/stops', extract_stops, load_json('geoserviceDispatcher_stopinfo_stops.json')),
+        _extract('fixture/stop_points', extract_stop_points, load_json('geoserviceDispatcher_stopinfo_stopPoints.json')),
+        _extract('fixture/stop', extract_stop, load_json('stopInfo_stop.json')),
+        _extract('fixture/stop_point', extract_stop_point, load_json('stopInfo_stopPoint.json')),
+        _extract('fixture/stop_passages', extract_stop_passages, load_json('passageInfo_stopPassages_stop.json'),
+                 now=NOW),
+        _extract('fixture/trip_passages', extract_trip_passages, load_json('tripInfo_tripPassages_actual.json')),
+        _extract('fixture/routes', extract_routes, load_json('routeInfo_route.json')),
+        _extract('fixture/route_stops', extract_route_stops, load_json('routeInfo_routeStops.json')),
+        _extract('fixture/paths', extract_paths, load_json('geoserviceDispatcher_pathinfo_route.json')),
+        _extract('fixture/path_geometries', extract_path_geometries,
+                 load_json('geoserviceDispatcher_pathinfo_route.json')),
+        _extract('fixture/vehicles', extract_vehicles, load_json('geoserviceDispatcher_vehicleinfo_vehicles.json')),
+        _extract('fixture/vehicle_frame', extract_vehicle_frame,
+                 load_json('geoserviceDispatcher_vehicleinfo_vehicles.json')),
+    ]
+
+
+def scaled() -> List[Benchmark]:
+    vehicles = scale_vehicles(10_000)
+    passages = scale_stop_passages(5_000)
+    paths = scale_paths(1_000_000)
+    vehicles_content = json.dumps(vehicles).encode()
+    passages_content = json.dumps(passages).encode()
+    paths_content = json.dumps(paths).encode()
+    return [
+        _count('scaled/extract_vehicles[10k]', lambda: extract_vehicles(vehicles), 10_000),
+        _count('scaled/extract_vehicle_frame[10k]', lambda: extract_vehicle_frame(vehicles), 10_000),
+        _count('scaled/decode_vehicles[10k]', lambda: decode_vehicles(vehicles_content), 10_000),
+        _count('scaled/extract_stop_passages[5k]', lambda: extract_stop_passages(passages, now=NOW), 5_000),
+        _count('scaled/decode_stop_passages[5k]', lambda: decode_stop_passages(passages_content, now=NOW), 5_000),
+        _count('scaled/extract_paths[1M]', lambda: extract_paths(paths), 1_000_000),
+        _count('scaled/extract_path_geometries[1M]', lambda: extract_path_geometries(paths), 1_000_000),
+        _count('scaled/decode_paths[1M]', lambda: decode_paths(paths_content), 1_000_000),
+    ]
+
+
+def client_server() -> MockServer:
+    # roughly 10k vehicles in service at NOW, responses are memoized so the server is not what gets measured
+    network = SyntheticNetwork(stops=2_000, routes=250, stops_per_route=40, headway=4)
+    return MockServer(network, clock=lambda: NOW, cache_size=1_024)
+
+
+def client(server: MockServer) -> List[Benchmark]:
+    base_url = server.base_url
+    network = server.network
+    ttss = TTSS(base_url=base_url, transport=Transport(pool_maxsize=32))
+    stop_number = network.stop_number(network.route_sequences[0][0])
+    stop_numbers = [network.stop_number(stop) for stop in range(100)]
+    benchmarks = [
+        _count('client/get_stop_passages', lambda: ttss.get_stop_passages(stop_number=stop_number, now=NOW), 1),
+        _count('client/get_route_paths', lambda: ttss.get_route_paths(route_id=network.route_id(0)), 1),
+        _count('client/get_vehicles[10k]', lambda: ttss.get_vehicles(), 1),
+        _count('client/get_many_stop_passages[100]',
+               lambda: ttss.get_many_stop_passages(stop_numbers, max_workers=16), len(stop_numbers)),
+    ]
+
+    try:
+        from ttss import AsyncTTSS
+    except ImportError:  # httpx is not installed
+        return benchmarks
+
+    async def gather() -> None:
+        async with AsyncTTSS(base_url=base_url, max_concurrency=32) as async_ttss:
+            await asyncio.gather(*(async_ttss.get_stop_passages(stop_number, now=NOW) for stop_number in stop_numbers))
+
+    benchmarks.append(_count('client/async_stop_passages[100]', lambda: asyncio.run(gather()), len(stop_numbers)))
+    return benchmarks
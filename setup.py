@@ -27,5 +27,9 @@ setuptools.setup(
     packages=setuptools.find_packages(where='src'),
     python_requires='>=3.8',
     install_requires=['requests', 'pytz'],
+    extras_require={
+        'async': ['httpx'],
+        'speedups': ['msgspec', 'orjson'],
+    },
     tests_require=['pytest', 'pytest-freezegun', 'requests-mock']
 )
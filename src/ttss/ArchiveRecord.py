@@ -0,0 +1,16 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class ArchiveRecord:
+    timestamp: float
+    url: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    status_code: int = 200
+    encoding: Optional[str] = None
+    content_type: Optional[str] = None
+    elapsed: float = 0.0
+    # position of the compressed body in the data file
+    offset: int = 0
+    length: int = 0
@@ -0,0 +1,492 @@
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, tzinfo
+from time import perf_counter
+from types import TracebackType
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type, TypeVar, Union
+
+import httpx
+import pytz
+
+from ttss.ColorType import ColorType
+from ttss.Interner import Interner
+from ttss.Mode import Mode
+from ttss.Passage import Passage
+from ttss.Path import Path
+from ttss.PathGeometry import PathGeometry
+from ttss.PositionType import PositionType
+from ttss.Route import Route
+from ttss.Stop import Stop
+from ttss.StopPoint import StopPoint
+from ttss.Trip import Trip
+from ttss.Vehicle import Vehicle
+from ttss.VehicleFrame import VehicleFrame
+from ttss.decoders import decode_paths, decode_stop_passages, decode_vehicles, decode_vehicles_update, loads
+from ttss.extractors import extract_autocomplete_stops, extract_autocomplete_stops_json, extract_stops, \
+    extract_stop_points, extract_stop, extract_stop_point, extract_trip_passages, extract_routes, \
+    extract_route_stops, extract_stops_by_character, extract_lookup_fulltext, extract_near_stops, \
+    extract_vehicle_frame, extract_path_geometries, iter_paths, iter_stop_passages, iter_vehicles
+from ttss.hooks import Hook, instrumented, record_response
+from ttss.utils import take, timestamp_ms
+
+T = TypeVar('T')
+
+
+@dataclass
+class AsyncTTSS:
+    base_url: str
+    language: str = 'pl'
+    tz: tzinfo = pytz.timezone('Europe/Warsaw')
+    options: Dict[str, Any] = field(default_factory=dict)
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    max_concurrency: int = 50
+    max_retries: int = 3
+    timeout: Optional[float] = 10.0
+    client: Optional[httpx.AsyncClient] = None
+    interner: Optional[Interner] = None
+    hooks: List[Hook] = field(default_factory=list)
+    _semaphore: Optional[asyncio.Semaphore] = field(default=None, init=False, repr=False)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self.client is None:
+            limits = httpx.Limits(max_connections=self.max_connections,
+                                  max_keepalive_connections=self.max_keepalive_connections)
+            transport = httpx.AsyncHTTPTransport(limits=limits, retries=self.max_retries)
+            self.client = httpx.AsyncClient(transport=transport, timeout=self.timeout)
+        return self.client
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _get(self, url: str, params: Dict[str, Any]) -> httpx.Response:
+        params = {key: value for key, value in params.items() if value is not None}
+        async with self._get_semaphore():
+            if not self.hooks:
+                return await self._get_client().get(url, params=params, **self.options)
+            started = perf_counter()
+            response = await self._get_client().get(url, params=params, **self.options)
+            record_response(url, params,
+                            status_code=response.status_code,
+                            content=response.content,
+                            ttfb=None,
+                            network_time=perf_counter() - started)
+            return response
+
+    async def aclose(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+
+    async def __aenter__(self) -> 'AsyncTTSS':
+        return self
+
+    async def __aexit__(self, exc_type: Optional[Type[BaseException]], exc_value: Optional[BaseException],
+                        traceback: Optional[TracebackType]) -> None:
+        await self.aclose()
+
+    @instrumented
+    async def autocomplete_stops(self, query: str) -> List[Stop]:
+        url = f'{self.base_url}/internetservice/services/lookup/autocomplete'
+        params = {
+            'query': query,
+            'language': self.language,
+        }
+        response = await self._get(url, params)
+        response.raise_for_status()
+        return extract_autocomplete_stops(response.text)
+
+    @instrumented
+    async def autocomplete_stops_json(self, query: str) -> List[Stop]:
+        url = f'{self.base_url}/internetservice/services/lookup/autocomplete/json'
+        params = {
+            'query': query,
+            'language': self.language,
+        }
+        response = await self._get(url, params)
+        response.raise_for_status()
+        return extract_autocomplete_stops_json(loads(response.content))
+
+    @instrumented
+    async def lookup_fulltext(self, search: str) -> List[Union[Stop, StopPoint]]:
+        url = f'{self.base_url}/internetservice/services/lookup/fulltext'
+        params = {'search': search}
+        response = await self._get(url, params)
+        response.raise_for_status()
+        return extract_lookup_fulltext(loads(response.content))
+
+    @instrumented
+    async def get_stops_by_character(self, character: str) -> List[Stop]:
+        url = f'{self.base_url}/internetservice/services/lookup/stopsByCharacter'
+        params = {
+            'character': character,
+            'language': self.language,
+        }
+        response = await self._get(url, params)
+        response.raise_for_status()
+        return extract_stops_by_character(loads(response.content))
+
+    @instrumented
+    async def get_near_stops(self, latitude: float, longitude: float) -> List[Stop]:
+        url = f'{self.base_url}/internetservice/services/lookup/autocomplete/nearStops/json'
+        params = {
+            'lat': latitude,
+            'lon': longitude,
+        }
+        response = await self._get(url, params)
+        response.raise_for_status()
+        return extract_near_stops(loads(response.content))
+
+    @instrumented
+    async def get_stops(self, *,
+                        min_latitude: float = -90.0, max_latitude: float = 90.0,
+                        min_longitude: float = -180.0, max_longitude: float = 180.0) -> List[Stop]:
+        url = f'{self.base_url}/internetservice/geoserviceDispatcher/services/stopinfo/stops'
+        params = {
+            'left': int(min_longitude * 3_600_000),
+            'bottom': int(min_latitude * 3_600_000),
+            'right': int(max_longitude * 3_600_000),
+            'top': int(max_latitude * 3_600_000),
+        }
+        response = await self._get(url, params)
+        response.raise_for_status()
+        return extract_stops(loads(response.content))
+
+    @instrumented
+    async def get_stop_points(self, *,
+                              min_latitude: float = -90.0, max_latitude: float = 90.0,
+                              min_longitude: float = -180.0, max_longitude: float = 180.0) -> List[StopPoint]:
+        url = f'{self.base_url}/internetservice/geoserviceDispatcher/services/stopinfo/stopPoints'
+        params = {
+            'left': int(min_longitude * 3_600_000),
+            'bottom': int(min_latitude * 3_600_000),
+            'right': int(max_longitude * 3_600_000),
+            'top': int(max_latitude * 3_600_000),
+        }
+        response = await self._get(url, params)
+        response.raise_for_status()
+        return extract_stop_points(loads(response.content))
+
+    @instrumented
+    async def get_stop(self, stop_number: str) -> Optional[Stop]:
+        url = f'{self.base_url}/internetservice/services/stopInfo/stop'
+        params = {
+            'stop': stop_number,
+            'language': self.language,
+        }
+        response = await self._get(url, params)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return extract_stop(loads(response.content))
+
+    @instrumented
+    async def get_stop_point(self, stop_point_code: str) -> Optional[StopPoint]:
+        url = f'{self.base_url}/internetservice/services/stopInfo/stopPoint'
+        params = {
+            'stopPoint': stop_point_code,
+            'language': self.language,
+        }
+        response = await self._get(url, params)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return extract_stop_point(loads(response.content))
+
+    @instrumented
+    async def get_stop_passages(self, stop_number: str, *,
+                                authority: Optional[str] = None,
+                                route_id: Optional[str] = None,
+                                direction: Optional[str] = None,
+                                mode: Mode = Mode.DEPARTURES,
+                                timeframe: int = 120,
+                                now: Optional[datetime] = None) -> Tuple[Stop, List[Route], List[Passage]]:
+        if now is None:
+            now = datetime.now(self.tz).replace(microsecond=0)
+        url = f'{self.base_url}/internetservice/services/passageInfo/stopPassages/stop'
+        params = {
+            'language': self.language,
+            'stop': stop_number,
+            'authority': authority,
+            'routeId': route_id,
+            'direction': direction,
+            'mode': mode.value,
+            'timeFrame': timeframe,
+            'cacheBuster': timestamp_ms(),
+        }
+        response = await self._get(url, params)
+        response.raise_for_status()
+        return decode_stop_passages(response.content, now=now, interner=self.interner)
+
+    @instrumented
+    async def get_stop_point_passages(self, stop_point_code: str, *,
+                                      authority: Optional[str] = None,
+                                      route_id: Optional[str] = None,
+                                      direction: Optional[str] = None,
+                                      mode: Mode = Mode.DEPARTURES,
+                                      timeframe: int = 120,
+                                      now: Optional[datetime] = None) -> Tuple[Stop, List[Route], List[Passage]]:
+        if now is None:
+            now = datetime.now(self.tz).replace(microsecond=0)
+        url = f'{self.base_url}/internetservice/services/passageInfo/stopPassages/stopPoint'
+        params = {
+            'language': self.language,
+            'stopPoint': stop_point_code,
+            'authority': authority,
+            'routeId': route_id,
+            'direction': direction,
+            'mode': mode.value,
+            'timeFrame': timeframe,
+            'cacheBuster': timestamp_ms(),
+        }
+        response = await self._get(url, params)
+        response.raise_for_status()
+        return decode_stop_passages(response.content, now=now, interner=self.interner)
+
+    @instrumented
+    async def iter_stop_passages(self, stop_number: str, *,
+                                 authority: Optional[str] = None,
+                                 route_id: Optional[str] = None,
+                                 direction: Optional[str] = None,
+                                 mode: Mode = Mode.DEPARTURES,
+                                 timeframe: int = 120,
+                                 now: Optional[datetime] = None,
+                                 old: bool = True,
+                                 predicate: Optional[Callable[[Passage], bool]] = None,
+                                 limit: Optional[int] = None) -> Iterator[Passage]:
+        if now is None:
+            now = datetime.now(self.tz).replace(microsecond=0)
+        url = f'{self.base_url}/internetservice/services/passageInfo/stopPassages/stop'
+        params = {
+            'language': self.language,
+            'stop': stop_number,
+            'authority': authority,
+            'routeId': route_id,
+            'direction': direction,
+            'mode': mode.value,
+            'timeFrame': timeframe,
+            'cacheBuster': timestamp_ms(),
+        }
+        response = await self._get(url, params)
+        response.raise_for_status()
+        passages = iter_stop_passages(loads(response.content), now=now, old=old, interner=self.interner)
+        return take(passages, predicate=predicate, limit=limit)
+
+    @instrumented
+    async def iter_stop_point_passages(self, stop_point_code: str, *,
+                                       authority: Optional[str] = None,
+                                       route_id: Optional[str] = None,
+                                       direction: Optional[str] = None,
+                                       mode: Mode = Mode.DEPARTURES,
+                                       timeframe: int = 120,
+                                       now: Optional[datetime] = None,
+                                       old: bool = True,
+                                       predicate: Optional[Callable[[Passage], bool]] = None,
+                                       limit: Optional[int] = None) -> Iterator[Passage]:
+        if now is None:
+            now = datetime.now(self.tz).replace(microsecond=0)
+        url = f'{self.base_url}/internetservice/services/passageInfo/stopPassages/stopPoint'
+        params = {
+            'language': self.language,
+            'stopPoint': stop_point_code,
+            'authority': authority,
+            'routeId': route_id,
+            'direction': direction,
+            'mode': mode.value,
+            'timeFrame': timeframe,
+            'cacheBuster': timestamp_ms(),
+        }
+        response = await self._get(url, params)
+        response.raise_for_status()
+        passages = iter_stop_passages(loads(response.content), now=now, old=old, interner=self.interner)
+        return take(passages, predicate=predicate, limit=limit)
+
+    async def get_many_stop_passages(self, stop_numbers: Iterable[str], *,
+                                     authority: Optional[str] = None,
+                                     route_id: Optional[str] = None,
+                                     direction: Optional[str] = None,
+                                     mode: Mode = Mode.DEPARTURES,
+                                     timeframe: int = 120) -> Dict[str, Union[Tuple[Stop, List[Route], List[Passage]], Exception]]:
+        return await self._get_many(self.get_stop_passages, stop_numbers,
+                                    authority=authority, route_id=route_id, direction=direction, mode=mode,
+                                    timeframe=timeframe)
+
+    async def get_many_stop_point_passages(self, stop_point_codes: Iterable[str], *,
+                                           authority: Optional[str] = None,
+                                           route_id: Optional[str] = None,
+                                           direction: Optional[str] = None,
+                                           mode: Mode = Mode.DEPARTURES,
+                                           timeframe: int = 120) -> Dict[str, Union[Tuple[Stop, List[Route], List[Passage]], Exception]]:
+        return await self._get_many(self.get_stop_point_passages, stop_point_codes,
+                                    authority=authority, route_id=route_id, direction=direction, mode=mode,
+                                    timeframe=timeframe)
+
+    async def _get_many(self, method: Callable[..., Awaitable[T]], keys: Iterable[str],
+                        **kwargs: Any) -> Dict[str, Union[T, Exception]]:
+        now = datetime.now(self.tz).replace(microsecond=0)
+
+        async def get(key: str) -> Union[T, Exception]:
+            try:
+                return await method(key, now=now, **kwargs)
+            except Exception as e:
+                return e
+
+        keys = list(keys)
+        results = await asyncio.gather(*(get(key) for key in keys))
+        return dict(zip(keys, results))
+
+    @instrumented
+    async def get_trip_passages(self, trip_id: str, *, vehicle_id: Optional[str] = None,
+                                mode: Mode = Mode.DEPARTURES) -> Tuple[Optional[Trip], List[Passage]]:
+        url = f'{self.base_url}/internetservice/services/tripInfo/tripPassages'
+        params = {
+            'language': self.language,
+            'tripId': trip_id,
+            'mode': mode.value,
+            'vehicleId': vehicle_id,
+            'cacheBuster': timestamp_ms(),
+        }
+        response = await self._get(url, params)
+        response.raise_for_status()
+        return extract_trip_passages(loads(response.content), interner=self.interner)
+
+    @instrumented
+    async def get_routes(self) -> List[Route]:
+        url = f'{self.base_url}/internetservice/services/routeInfo/route'
+        params = {'language': self.language}
+        response = await self._get(url, params)
+        response.raise_for_status()
+        return extract_routes(loads(response.content))
+
+    @instrumented
+    async def get_route_stops(self, route_id: str) -> Tuple[Route, List[Stop]]:
+        url = f'{self.base_url}/internetservice/services/routeInfo/routeStops'
+        params = {
+            'routeId': route_id,
+            'language': self.language,
+            'cacheBuster': timestamp_ms(),
+        }
+        response = await self._get(url, params)
+        response.raise_for_status()
+        return extract_route_stops(loads(response.content))
+
+    @instrumented
+    async def get_route_paths(self, route_id: str, *, direction: Optional[str] = None) -> List[Path]:
+        url = f'{self.base_url}/internetservice/geoserviceDispatcher/services/pathinfo/route'
+        params = {
+            'id': route_id,
+            'direction': direction,
+        }
+        response = await self._get(url, params)
+        if response.status_code == 404:
+            return []
+        response.raise_for_status()
+        return decode_paths(response.content)
+
+    @instrumented
+    async def iter_route_paths(self, route_id: str, *, direction: Optional[str] = None,
+                               predicate: Optional[Callable[[Path], bool]] = None,
+                               limit: Optional[int] = None) -> Iterator[Path]:
+        url = f'{self.base_url}/internetservice/geoserviceDispatcher/services/pathinfo/route'
+        params = {
+            'id': route_id,
+            'direction': direction,
+        }
+        response = await self._get(url, params)
+        if response.status_code == 404:
+            return iter(())
+        response.raise_for_status()
+        return take(iter_paths(loads(response.content)), predicate=predicate, limit=limit)
+
+    @instrumented
+    async def get_vehicle_paths(self, vehicle_id: str) -> List[Path]:
+        url = f'{self.base_url}/internetservice/geoserviceDispatcher/services/pathinfo/vehicle'
+        params = {'id': vehicle_id}
+        response = await self._get(url, params)
+        response.raise_for_status()
+        return decode_paths(response.content)
+
+    @instrumented
+    async def get_route_path_geometries(self, route_id: str, *, direction: Optional[str] = None) -> List[PathGeometry]:
+        url = f'{self.base_url}/internetservice/geoserviceDispatcher/services/pathinfo/route'
+        params = {
+            'id': route_id,
+            'direction': direction,
+        }
+        response = await self._get(url, params)
+        if response.status_code == 404:
+            return []
+        response.raise_for_status()
+        return extract_path_geometries(loads(response.content))
+
+    @instrumented
+    async def get_vehicle_path_geometries(self, vehicle_id: str) -> List[PathGeometry]:
+        url = f'{self.base_url}/internetservice/geoserviceDispatcher/services/pathinfo/vehicle'
+        params = {'id': vehicle_id}
+        response = await self._get(url, params)
+        response.raise_for_status()
+        return extract_path_geometries(loads(response.content))
+
+    @instrumented
+    async def get_vehicles(self, *,
+                           last_update: Optional[int] = None,
+                           position_type: PositionType = PositionType.CORRECTED,
+                           color_type: ColorType = ColorType.ROUTE_BASED) -> List[Vehicle]:
+        url = f'{self.base_url}/internetservice/geoserviceDispatcher/services/vehicleinfo/vehicles'
+        params = {
+            'lastUpdate': last_update,
+            'positionType': position_type.value,
+            'colorType': color_type.value,
+        }
+        response = await self._get(url, params)
+        response.raise_for_status()
+        return decode_vehicles(response.content, interner=self.interner)
+
+    @instrumented
+    async def iter_vehicles(self, *,
+                            last_update: Optional[int] = None,
+                            position_type: PositionType = PositionType.CORRECTED,
+                            color_type: ColorType = ColorType.ROUTE_BASED,
+                            predicate: Optional[Callable[[Vehicle], bool]] = None,
+                            limit: Optional[int] = None) -> Iterator[Vehicle]:
+        url = f'{self.base_url}/internetservice/geoserviceDispatcher/services/vehicleinfo/vehicles'
+        params = {
+            'lastUpdate': last_update,
+            'positionType': position_type.value,
+            'colorType': color_type.value,
+        }
+        response = await self._get(url, params)
+        response.raise_for_status()
+        vehicles = iter_vehicles(loads(response.content), interner=self.interner)
+        return take(vehicles, predicate=predicate, limit=limit)
+
+    @instrumented
+    async def get_vehicles_update(self, *,
+                                  last_update: Optional[int] = None,
+                                  position_type: PositionType = PositionType.CORRECTED,
+                                  color_type: ColorType = ColorType.ROUTE_BASED) -> Tuple[Optional[int], List[Vehicle]]:
+        url = f'{self.base_url}/internetservice/geoserviceDispatcher/services/vehicleinfo/vehicles'
+        params = {
+            'lastUpdate': last_update,
+            'positionType': position_type.value,
+            'colorType': color_type.value,
+        }
+        response = await self._get(url, params)
+        response.raise_for_status()
+        return decode_vehicles_update(response.content, interner=self.interner)
+
+    @instrumented
+    async def get_vehicle_frame(self, *,
+                                last_update: Optional[int] = None,
+                                position_type: PositionType = PositionType.CORRECTED,
+                                color_type: ColorType = ColorType.ROUTE_BASED) -> VehicleFrame:
+        url = f'{self.base_url}/internetservice/geoserviceDispatcher/services/vehicleinfo/vehicles'
+        params = {
+            'lastUpdate': last_update,
+            'positionType': position_type.value,
+            'colorType': color_type.value,
+        }
+        response = await self._get(url, params)
+        response.raise_for_status()
+        return extract_vehicle_frame(loads(response.content))
@@ -0,0 +1,145 @@
+import functools
+import inspect
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple, TypeVar, cast
+
+T = TypeVar('T')
+F = TypeVar('F', bound=Callable[..., Any])
+
+DAY = 24 * 60 * 60
+
+DEFAULT_TTLS: Dict[str, float] = {
+    'get_stops_by_character': DAY,
+    'get_stops': DAY,
+    'get_stop_points': DAY,
+    'get_stop': DAY,
+    'get_stop_point': DAY,
+    'get_stop_passages': 10,
+    'get_stop_point_passages': 10,
+    'get_routes': DAY,
+    'get_route_stops': DAY,
+    'get_route_paths': DAY,
+    'get_route_path_geometries': DAY,
+}
+
+
+@dataclass
+class Cache:
+    ttls: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_TTLS))
+    max_size: int = 1024
+    clock: Callable[[], float] = time.monotonic
+    hits: int = field(default=0, init=False)
+    misses: int = field(default=0, init=False)
+    coalesced: int = field(default=0, init=False)
+    _entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = field(default_factory=OrderedDict, init=False, repr=False)
+    _in_flight: Dict[Hashable, 'Future[Any]'] = field(default_factory=dict, init=False, repr=False)
+    # in-flight loads invalidated before they finished, their values are returned but not stored
+    _stale: Set[Hashable] = field(default_factory=set, init=False, repr=False)
+    _lock: Lock = field(default_factory=Lock, init=False, repr=False)
+
+    def get_or_load(self, endpoint: str, key: Hashable, load: Callable[[], T]) -> T:
+        ttl = self.ttls.get(endpoint, None)
+        if ttl is None:
+            return load()
+
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is not None and entry[0] > self.clock():
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return cast(T, entry[1])
+            future = self._in_flight.get(key, None)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                self.misses += 1
+                self._in_flight[key] = Future()
+
+        if future is not None:
+            return cast(T, future.result())
+
+        try:
+            value = load()
+        except BaseException as e:
+            with self._lock:
+                future = self._in_flight.pop(key)
+                self._stale.discard(key)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            future = self._in_flight.pop(key)
+            if key in self._stale:
+                self._stale.remove(key)
+            else:
+                self._entries[key] = (self.clock() + ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        future.set_result(value)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            if key in self._in_flight:
+                self._stale.add(key)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            self._stale.update(key for key in self._in_flight if predicate(key))
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stale.update(self._in_flight)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_ratio(self) -> Optional[float]:
+        requests = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / requests if requests else None
+
+
+def cached(*, endpoint: Optional[str] = None, ignore: Tuple[str, ...] = ()) -> Callable[[F], F]:
+    def decorator(method: F) -> F:
+        name = endpoint if endpoint is not None else method.__name__
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            cache: Optional[Cache] = self.cache
+            if cache is None:
+                return method(self, *args, **kwargs)
+            arguments = signature.bind(self, *args, **kwargs)
+            arguments.apply_defaults()
+            # a cache may be shared by clients of different services or languages
+            key = (name, self.base_url, self.language, tuple(
+                (name, value)
+                for name, value in arguments.arguments.items()
+                if name != 'self' and name not in ignore
+            ))
+            return _copy(cache.get_or_load(name, key, lambda: method(self, *args, **kwargs)))
+
+        return cast(F, wrapper)
+
+    return decorator
+
+
+def _copy(value: Any) -> Any:
+    # every caller gets its own lists, the model objects in them are shared and must not be modified
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, tuple):
+        return tuple(list(item) if isinstance(item, list) else item for item in value)
+    return value
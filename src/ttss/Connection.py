@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from ttss.utils import SLOTS
+
+
+@dataclass(**SLOTS)
+class Connection:
+    trip_id: str
+    from_stop: str
+    to_stop: str
+    departure: datetime
+    arrival: datetime
+    route: Optional[str] = None
+    direction: Optional[str] = None
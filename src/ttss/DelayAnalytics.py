@@ -0,0 +1,123 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import time
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from ttss.DelayStats import DelayStats
+from ttss.Passage import Passage
+from ttss.Status import Status
+
+GROUPS = ('route', 'stop', 'direction', 'hour')
+
+# route name, stop name, direction, planned hour
+GroupKey = Tuple[Optional[str], Optional[str], Optional[str], Optional[int]]
+
+
+@dataclass
+class DelayAnalytics:
+    early_tolerance: int = 1
+    late_tolerance: int = 3
+    # passages not seen departing yet, the oldest ones are counted with their last delay when this is exceeded
+    max_pending: int = 100_000
+    observations: int = 0
+    duplicates: int = 0
+    _pending: 'OrderedDict[Hashable, Tuple[GroupKey, int]]' = field(default_factory=OrderedDict, init=False,
+                                                                    repr=False)
+    _counted: 'OrderedDict[Hashable, None]' = field(default_factory=OrderedDict, init=False, repr=False)
+    _stats: Dict[GroupKey, DelayStats] = field(default_factory=dict, init=False, repr=False)
+
+    def ingest(self, passages: Iterable[Passage], *, trip_id: Optional[str] = None,
+               planned: Optional[Iterable[Passage]] = None) -> int:
+        # get_trip_passages has neither passage nor trip ids, so trip_id identifies them, and its actual times
+        # come without planned ones, which are taken by stop sequence number from the planned mode passages
+        planned_times = {passage.seq_num: passage.planned_time for passage in planned or ()}
+        count = 0
+        for passage in passages:
+            planned_time = passage.planned_time
+            if planned_time is None:
+                planned_time = planned_times.get(passage.seq_num, None)
+            if passage.actual_time is None or planned_time is None or passage.status == Status.PLANNED:
+                continue
+            key = _passage_key(passage, trip_id)
+            self.observations += 1
+            count += 1
+            if key in self._counted:
+                self.duplicates += 1
+                continue
+            if key in self._pending:
+                self.duplicates += 1
+            self._pending[key] = _group_key(passage, planned_time), _delay(planned_time, passage.actual_time)
+            self._pending.move_to_end(key)
+            if passage.old or passage.status == Status.DEPARTED:
+                self._count(key)
+        while len(self._pending) > self.max_pending:
+            self._count(next(iter(self._pending)))
+        return count
+
+    def flush(self) -> int:
+        # counts every pending passage with its last observed delay, e.g. at the end of a day
+        count = len(self._pending)
+        while self._pending:
+            self._count(next(iter(self._pending)))
+        return count
+
+    def _count(self, key: Hashable) -> None:
+        group, delay = self._pending.pop(key)
+        stats = self._stats.get(group, None)
+        if stats is None:
+            stats = self._stats[group] = DelayStats()
+        stats.observe(delay, early_tolerance=self.early_tolerance, late_tolerance=self.late_tolerance)
+        self._counted[key] = None
+        while len(self._counted) > 2 * self.max_pending:
+            self._counted.popitem(last=False)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def stats(self, by: Sequence[str] = ()) -> Dict[Tuple[Any, ...], DelayStats]:
+        indices = [GROUPS.index(name) for name in by]
+        result: Dict[Tuple[Any, ...], DelayStats] = {}
+        for group, stats in self._stats.items():
+            key = tuple(group[i] for i in indices)
+            merged = result.get(key, None)
+            if merged is None:
+                merged = result[key] = DelayStats()
+            merged.merge(stats)
+        return result
+
+    def summary(self, by: Sequence[str] = (), *,
+                quantiles: Sequence[float] = (0.5, 0.9, 0.95)) -> List[Dict[str, Any]]:
+        rows = []
+        for key, stats in sorted(self.stats(by).items(), key=lambda item: tuple(str(value) for value in item[0])):
+            row: Dict[str, Any] = dict(zip(by, key))
+            row['count'] = stats.count
+            row['mean'] = stats.mean
+            for q in quantiles:
+                row[f'p{q * 100:g}'] = stats.quantile(q)
+            row['on_time_ratio'] = stats.on_time_ratio
+            rows.append(row)
+        return rows
+
+
+def _passage_key(passage: Passage, trip_id: Optional[str]) -> Hashable:
+    if passage.id is not None:
+        return passage.id
+    if trip_id is None and passage.trip is not None:
+        trip_id = passage.trip.id
+    stop = passage.stop
+    return trip_id, stop.id or stop.name if stop is not None else None, passage.seq_num, passage.planned_time
+
+
+def _group_key(passage: Passage, planned_time: time) -> GroupKey:
+    route = passage.route or (passage.trip.route if passage.trip is not None else None)
+    return (route.name if route is not None else None,
+            passage.stop.name if passage.stop is not None else None,
+            passage.trip.direction if passage.trip is not None else None,
+            planned_time.hour)
+
+
+def _delay(planned_time: time, actual_time: time) -> int:
+    # in minutes, the closest one across midnight
+    delay = (actual_time.hour * 60 + actual_time.minute - planned_time.hour * 60 - planned_time.minute) % 1440
+    return delay - 1440 if delay >= 720 else delay
@@ -0,0 +1,54 @@
+from dataclasses import dataclass, field
+from math import ceil
+from typing import Optional
+
+from ttss.Histogram import Histogram
+
+# one bucket per minute, delays outside the range are counted in the first and the last bucket
+DELAY_BUCKETS = tuple(float(minutes) for minutes in range(-15, 121))
+
+
+@dataclass
+class DelayStats:
+    histogram: Histogram = field(default_factory=lambda: Histogram(buckets=DELAY_BUCKETS))
+    early: int = 0
+    on_time: int = 0
+    late: int = 0
+
+    def observe(self, delay: int, *, early_tolerance: int = 1, late_tolerance: int = 3) -> None:
+        self.histogram.observe(delay)
+        if delay < -early_tolerance:
+            self.early += 1
+        elif delay > late_tolerance:
+            self.late += 1
+        else:
+            self.on_time += 1
+
+    def merge(self, other: 'DelayStats') -> None:
+        self.histogram.merge(other.histogram)
+        self.early += other.early
+        self.on_time += other.on_time
+        self.late += other.late
+
+    @property
+    def count(self) -> int:
+        return self.histogram.count
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.histogram.mean
+
+    def quantile(self, q: float) -> Optional[float]:
+        # nearest rank, delays are whole minutes so the upper bound of the bucket holding it is exact
+        if self.count == 0:
+            return None
+        rank = max(1, ceil(q * self.count))
+        buckets = self.histogram.buckets
+        for i, total in enumerate(self.histogram.cumulative_counts()):
+            if total >= rank:
+                return buckets[min(i, len(buckets) - 1)]
+        return buckets[-1]
+
+    @property
+    def on_time_ratio(self) -> Optional[float]:
+        return self.on_time / self.count if self.count else None
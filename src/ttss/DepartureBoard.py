@@ -0,0 +1,169 @@
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from threading import Event, Lock, Thread
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from ttss.Mode import Mode
+from ttss.Passage import Passage
+from ttss.TTSS import TTSS
+
+# (kind, key) where kind is 'stop' or 'stop_point'
+Source = Tuple[str, str]
+
+
+@dataclass
+class DepartureBoard:
+    ttss: TTSS
+    stop_numbers: List[str] = field(default_factory=list)
+    stop_point_codes: List[str] = field(default_factory=list)
+    mode: Mode = Mode.DEPARTURES
+    timeframe: int = 120
+    old: bool = False
+    interval: float = 10
+    max_workers: int = 10
+    errors: Dict[Source, Exception] = field(default_factory=dict, init=False)
+    updated_at: Optional[datetime] = field(default=None, init=False)
+    _sources: Dict[Source, List[Passage]] = field(default_factory=dict, init=False, repr=False)
+    _timeline: List[Passage] = field(default_factory=list, init=False, repr=False)
+    _executor: Optional[ThreadPoolExecutor] = field(default=None, init=False, repr=False)
+    _thread: Optional[Thread] = field(default=None, init=False, repr=False)
+    _stopped: Event = field(default_factory=Event, init=False, repr=False)
+    _lock: Lock = field(default_factory=Lock, init=False, repr=False)
+
+    @property
+    def sources(self) -> List[Source]:
+        sources = [('stop', stop_number) for stop_number in self.stop_numbers]
+        sources.extend(('stop_point', stop_point_code) for stop_point_code in self.stop_point_codes)
+        return sources
+
+    def subscribe(self, *, stop_number: Optional[str] = None, stop_point_code: Optional[str] = None) -> None:
+        with self._lock:
+            if stop_number is not None and stop_number not in self.stop_numbers:
+                self.stop_numbers.append(stop_number)
+            if stop_point_code is not None and stop_point_code not in self.stop_point_codes:
+                self.stop_point_codes.append(stop_point_code)
+
+    def unsubscribe(self, *, stop_number: Optional[str] = None, stop_point_code: Optional[str] = None) -> None:
+        with self._lock:
+            if stop_number is not None and stop_number in self.stop_numbers:
+                self.stop_numbers.remove(stop_number)
+                self._sources.pop(('stop', stop_number), None)
+                self.errors.pop(('stop', stop_number), None)
+            if stop_point_code is not None and stop_point_code in self.stop_point_codes:
+                self.stop_point_codes.remove(stop_point_code)
+                self._sources.pop(('stop_point', stop_point_code), None)
+                self.errors.pop(('stop_point', stop_point_code), None)
+            self._timeline = _merge(self._sources.values())
+
+    def snapshot(self, limit: Optional[int] = None) -> List[Passage]:
+        # the timeline is replaced, never mutated, so readers only pay for the slice
+        return self._timeline[:limit]
+
+    def __len__(self) -> int:
+        return len(self._timeline)
+
+    def update(self, *, now: Optional[datetime] = None) -> List[Passage]:
+        if now is None:
+            now = datetime.now(self.ttss.tz).replace(microsecond=0)
+        sources = self.sources
+        executor = self._get_executor()
+        futures = [(source, executor.submit(self._fetch, source, now)) for source in sources]
+        results: Dict[Source, List[Passage]] = {}
+        errors: Dict[Source, Exception] = {}
+        for source, future in futures:
+            try:
+                results[source] = future.result()
+            except Exception as e:
+                errors[source] = e
+
+        with self._lock:
+            # sources unsubscribed while fetching are dropped, not written back
+            subscribed = set(self.sources)
+            for source in list(self._sources):
+                if source not in subscribed:
+                    del self._sources[source]
+            for source in list(self.errors):
+                if source not in subscribed:
+                    del self.errors[source]
+            for source in sources:
+                if source not in subscribed:
+                    continue
+                if source in results:
+                    self._sources[source] = results[source]
+                    self.errors.pop(source, None)
+                elif source in errors:
+                    # keep the last good passages of a failing source
+                    self.errors[source] = errors[source]
+            self._timeline = _merge(self._sources.values())
+            self.updated_at = now
+            return self._timeline
+
+    def _fetch(self, source: Source, now: datetime) -> List[Passage]:
+        kind, key = source
+        if kind == 'stop':
+            _, _, passages = self.ttss.get_stop_passages(key, mode=self.mode, timeframe=self.timeframe, now=now)
+        else:
+            _, _, passages = self.ttss.get_stop_point_passages(key, mode=self.mode, timeframe=self.timeframe, now=now)
+        if not self.old:
+            passages = [passage for passage in passages if not passage.old]
+        return sorted(passages, key=_sort_key)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='ttss-board')
+            return self._executor
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = Thread(target=self._run, name='ttss-board-refresh', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self.update()
+            self._stopped.wait(self.interval)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def __enter__(self) -> 'DepartureBoard':
+        self.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.stop()
+
+
+def _sort_key(passage: Passage) -> Tuple[bool, datetime]:
+    return passage.dt is None, passage.dt or datetime.min
+
+
+def _dedupe_key(passage: Passage) -> Hashable:
+    if passage.id is not None:
+        return passage.id
+    if passage.trip is not None and passage.trip.id is not None:
+        return passage.trip.id, passage.stop.name if passage.stop is not None else None
+    return id(passage)
+
+
+def _merge(sources: Iterable[List[Passage]]) -> List[Passage]:
+    seen = set()
+    timeline = []
+    for passage in heapq.merge(*sources, key=_sort_key):
+        key = _dedupe_key(passage)
+        if key not in seen:
+            seen.add(key)
+            timeline.append(passage)
+    return timeline
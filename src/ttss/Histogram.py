@@ -0,0 +1,54 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass
+class Histogram:
+    buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    # counts[i] is the number of values in (buckets[i - 1], buckets[i]], the last one is the +Inf bucket
+    counts: List[int] = field(default_factory=list)
+    sum: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other: 'Histogram') -> None:
+        if other.buckets != self.buckets:
+            raise ValueError('histograms have different buckets')
+        self.counts = [count + other_count for count, other_count in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.count += other.count
+
+    def cumulative_counts(self) -> List[int]:
+        result = []
+        total = 0
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+
+    def quantile(self, q: float) -> Optional[float]:
+        # linear interpolation within the bucket, like Prometheus' histogram_quantile
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        lower, previous = 0.0, 0
+        for upper, total in zip(self.buckets, self.cumulative_counts()):
+            if total >= rank:
+                return lower + (upper - lower) * (rank - previous) / (total - previous) if total > previous else upper
+            lower, previous = upper, total
+        return self.buckets[-1]
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
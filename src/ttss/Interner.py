@@ -0,0 +1,79 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, Tuple
+
+from ttss.Route import Route
+from ttss.Stop import Stop
+from ttss.Trip import Trip
+from ttss.Vehicle import Vehicle
+
+
+class Interner:
+    # safe to share between threads, each table keeps at most max_size of the most recently used objects;
+    # the objects are shared by every caller, so they must not be modified
+    def __init__(self, *, max_size: int = 100_000) -> None:
+        self.max_size = max_size
+        self.routes: 'OrderedDict[Tuple[Optional[str], Optional[str]], Route]' = OrderedDict()
+        self.trips: 'OrderedDict[Tuple[Optional[str], int, Optional[str]], Trip]' = OrderedDict()
+        self.stops: 'OrderedDict[Tuple[Optional[str], Optional[str], Optional[str]], Stop]' = OrderedDict()
+        self.vehicles: 'OrderedDict[Tuple[Optional[str], int], Vehicle]' = OrderedDict()
+        self._lock = Lock()
+
+    def route(self, route_id: Optional[str], name: Optional[str]) -> Route:
+        key = (route_id, name)
+        with self._lock:
+            route = self.routes.get(key, None)
+            if route is None:
+                route = self.routes[key] = Route(id=route_id, name=name)
+                self._evict(self.routes)
+            else:
+                self.routes.move_to_end(key)
+            return route
+
+    def trip(self, trip_id: Optional[str], route: Route, direction: Optional[str]) -> Trip:
+        # the interned trip keeps its route alive, so the route identity is a stable key until it is evicted
+        key = (trip_id, id(route), direction)
+        with self._lock:
+            trip = self.trips.get(key, None)
+            if trip is None:
+                trip = self.trips[key] = Trip(id=trip_id, route=route, direction=direction)
+                self._evict(self.trips)
+            else:
+                self.trips.move_to_end(key)
+            return trip
+
+    def stop(self, stop_id: Optional[str], name: Optional[str], number: Optional[str]) -> Stop:
+        key = (stop_id, name, number)
+        with self._lock:
+            stop = self.stops.get(key, None)
+            if stop is None:
+                stop = self.stops[key] = Stop(id=stop_id, name=name, number=number)
+                self._evict(self.stops)
+            else:
+                self.stops.move_to_end(key)
+            return stop
+
+    def vehicle(self, vehicle_id: Optional[str], trip: Trip) -> Vehicle:
+        key = (vehicle_id, id(trip))
+        with self._lock:
+            vehicle = self.vehicles.get(key, None)
+            if vehicle is None:
+                vehicle = self.vehicles[key] = Vehicle(id=vehicle_id, trip=trip)
+                self._evict(self.vehicles)
+            else:
+                self.vehicles.move_to_end(key)
+            return vehicle
+
+    def _evict(self, table: 'OrderedDict') -> None:
+        while len(table) > self.max_size:
+            table.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.routes.clear()
+            self.trips.clear()
+            self.stops.clear()
+            self.vehicles.clear()
+
+    def __len__(self) -> int:
+        return len(self.routes) + len(self.trips) + len(self.stops) + len(self.vehicles)
@@ -0,0 +1,26 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List
+
+from ttss.JourneyLeg import JourneyLeg
+
+
+@dataclass
+class Journey:
+    legs: List[JourneyLeg] = field(default_factory=list)
+
+    @property
+    def departure(self) -> datetime:
+        return self.legs[0].departure
+
+    @property
+    def arrival(self) -> datetime:
+        return self.legs[-1].arrival
+
+    @property
+    def duration(self) -> timedelta:
+        return self.arrival - self.departure
+
+    @property
+    def transfers(self) -> int:
+        return max(0, len(self.legs) - 1)
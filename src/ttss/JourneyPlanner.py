@@ -0,0 +1,184 @@
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ttss.Connection import Connection
+from ttss.Journey import Journey
+from ttss.JourneyLeg import JourneyLeg
+from ttss.Passage import Passage
+from ttss.TTSS import TTSS
+from ttss.Trip import Trip
+from ttss.utils import service_datetime
+
+
+class JourneyPlanner:
+    # Connection Scan Algorithm over the timetable of known trips, live times replace planned ones as they come
+    def __init__(self, *, transfer_time: timedelta = timedelta(0)) -> None:
+        self.transfer_time = transfer_time
+        self._trips: Dict[str, List[Connection]] = {}
+        # stop passages seen for trips without trip passages, by stop name
+        self._observed: Dict[str, Dict[str, Tuple[datetime, Optional[str], Optional[str]]]] = {}
+        # the last error of every trip load_trips failed to fetch
+        self.errors: Dict[str, Exception] = {}
+        self._connections: List[Connection] = []
+        self._departures: List[datetime] = []
+        self._rows: List[Tuple[float, float, str, str, str]] = []
+        self._dirty = False
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return sum(len(connections) for connections in self._trips.values())
+
+    def add_trip(self, trip_id: str, trip: Optional[Trip], passages: List[Passage], *, now: datetime) -> int:
+        # passages of get_trip_passages, in stop sequence order
+        route = trip.route.name if trip is not None and trip.route is not None else None
+        direction = trip.direction if trip is not None else None
+        stops = []
+        for passage in sorted(passages, key=lambda passage: passage.seq_num or 0):
+            value = passage.actual_time or passage.planned_time
+            if passage.stop is None or passage.stop.name is None or value is None:
+                continue
+            stops.append((passage.stop.name, service_datetime(now, value)))
+        connections = _connect(trip_id, stops, route, direction)
+        with self._lock:
+            self._trips[trip_id] = connections
+            self._observed.pop(trip_id, None)
+            self._dirty = True
+        return len(connections)
+
+    def add_stop_passages(self, passages: Iterable[Passage]) -> int:
+        # chains stop passages of the same trip by time, for trips not added with their trip passages
+        trip_ids = set()
+        with self._lock:
+            for passage in passages:
+                trip = passage.trip
+                dt = passage.actual_dt or passage.planned_dt
+                if trip is None or trip.id is None or passage.stop is None or passage.stop.name is None or dt is None:
+                    continue
+                if trip.id in self._trips and trip.id not in self._observed:
+                    continue
+                route = passage.route.name if passage.route is not None else None
+                self._observed.setdefault(trip.id, {})[passage.stop.name] = dt, route, trip.direction
+                trip_ids.add(trip.id)
+            for trip_id in trip_ids:
+                observed = self._observed[trip_id]
+                stops = sorted(((stop, dt) for stop, (dt, _, _) in observed.items()), key=lambda item: item[1])
+                _, route, direction = next(iter(observed.values()))
+                self._trips[trip_id] = _connect(trip_id, stops, route, direction)
+            self._dirty = True
+        return len(trip_ids)
+
+    def load_trips(self, ttss: TTSS, trip_ids: Iterable[str], *, now: Optional[datetime] = None,
+                   max_workers: int = 10) -> int:
+        if now is None:
+            now = datetime.now(ttss.tz).replace(microsecond=0)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {trip_id: executor.submit(ttss.get_trip_passages, trip_id) for trip_id in trip_ids}
+        count = 0
+        for trip_id, future in futures.items():
+            try:
+                trip, passages = future.result()
+            except Exception as e:
+                # the trip keeps its earlier connections, if any
+                self.errors[trip_id] = e
+                continue
+            self.errors.pop(trip_id, None)
+            count += self.add_trip(trip_id, trip, passages, now=now)
+        return count
+
+    def remove_trip(self, trip_id: str) -> None:
+        with self._lock:
+            if self._trips.pop(trip_id, None) is not None:
+                self._dirty = True
+            self._observed.pop(trip_id, None)
+
+    def prune(self, before: datetime) -> int:
+        # drops trips that arrived everywhere before the given time
+        with self._lock:
+            trip_ids = [
+                trip_id for trip_id, connections in self._trips.items()
+                if not connections or connections[-1].arrival < before
+            ]
+            for trip_id in trip_ids:
+                del self._trips[trip_id]
+                self._observed.pop(trip_id, None)
+            if trip_ids:
+                self._dirty = True
+            return len(trip_ids)
+
+    def _timetable(self) -> Tuple[List[Connection], List[datetime], List[Tuple[float, float, str, str, str]]]:
+        with self._lock:
+            if self._dirty:
+                connections = [connection for trip in self._trips.values() for connection in trip]
+                connections.sort(key=lambda connection: (connection.departure, connection.arrival))
+                self._connections = connections
+                self._departures = [connection.departure for connection in connections]
+                # the scan only compares timestamps and strings
+                self._rows = [
+                    (connection.departure.timestamp(), connection.arrival.timestamp(), connection.trip_id,
+                     connection.from_stop, connection.to_stop)
+                    for connection in connections
+                ]
+                self._dirty = False
+            return self._connections, self._departures, self._rows
+
+    def plan(self, origin: str, destination: str, departure: datetime, *,
+             transfer_time: Optional[timedelta] = None,
+             window: timedelta = timedelta(hours=3)) -> Optional[Journey]:
+        # earliest arrival, stops are names, connections leaving later than the window are not scanned
+        if transfer_time is None:
+            transfer_time = self.transfer_time
+        connections, departures, rows = self._timetable()
+        transfer = transfer_time.total_seconds()
+        start = departure.timestamp()
+        arrivals: Dict[str, float] = {origin: start}
+        # when a trip can be boarded at a stop, that is the arrival plus the transfer time except at the origin
+        ready: Dict[str, float] = {origin: start}
+        boarded: Dict[str, int] = {}
+        via: Dict[str, Tuple[int, int]] = {}
+        best = float('inf')
+        for i in range(bisect_left(departures, departure), bisect_right(departures, departure + window)):
+            connection_departure, connection_arrival, trip_id, from_stop, to_stop = rows[i]
+            if connection_departure >= best:
+                break
+            if trip_id not in boarded:
+                if connection_departure < ready.get(from_stop, best):
+                    continue
+                boarded[trip_id] = i
+            if connection_arrival < arrivals.get(to_stop, best):
+                arrivals[to_stop] = connection_arrival
+                ready[to_stop] = connection_arrival + transfer
+                via[to_stop] = boarded[trip_id], i
+                if to_stop == destination:
+                    best = connection_arrival
+        if destination not in via:
+            return None
+
+        legs = []
+        stop = destination
+        while stop != origin:
+            first, last = via[stop]
+            boarding, alighting = connections[first], connections[last]
+            legs.append(JourneyLeg(trip_id=boarding.trip_id,
+                                   from_stop=boarding.from_stop,
+                                   to_stop=alighting.to_stop,
+                                   departure=boarding.departure,
+                                   arrival=alighting.arrival,
+                                   route=boarding.route,
+                                   direction=boarding.direction,
+                                   stops=sum(1 for connection in connections[first:last + 1]
+                                             if connection.trip_id == boarding.trip_id)))
+            stop = boarding.from_stop
+        return Journey(legs=legs[::-1])
+
+
+def _connect(trip_id: str, stops: List[Tuple[str, datetime]], route: Optional[str],
+             direction: Optional[str]) -> List[Connection]:
+    return [
+        Connection(trip_id=trip_id, from_stop=from_stop, to_stop=to_stop, departure=departure, arrival=arrival,
+                   route=route, direction=direction)
+        for (from_stop, departure), (to_stop, arrival) in zip(stops, stops[1:])
+        if arrival >= departure
+    ]
@@ -0,0 +1,89 @@
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Dict, List, Tuple
+
+from ttss.Histogram import DEFAULT_BUCKETS, Histogram
+from ttss.RequestEvent import RequestEvent
+
+# OpenMetrics name, attribute and help text
+COUNTERS = (
+    ('calls', 'calls', 'Calls per endpoint'),
+    ('errors', 'errors', 'Failed calls per endpoint'),
+    ('cache_hits', 'cache_hits', 'Calls answered from the cache'),
+    ('response_bytes', 'bytes', 'Response body bytes'),
+    ('objects', 'objects', 'Objects returned'),
+)
+
+HISTOGRAMS = (
+    ('duration_seconds', 'total_time', 'Total call time'),
+    ('network_seconds', 'network_time', 'Time spent on the request'),
+    ('extract_seconds', 'extract_time', 'Time spent parsing the response'),
+)
+
+
+@dataclass
+class Metrics:
+    buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    calls: Dict[str, int] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+    cache_hits: Dict[str, int] = field(default_factory=dict)
+    bytes: Dict[str, int] = field(default_factory=dict)
+    objects: Dict[str, int] = field(default_factory=dict)
+    total_time: Dict[str, Histogram] = field(default_factory=dict)
+    network_time: Dict[str, Histogram] = field(default_factory=dict)
+    extract_time: Dict[str, Histogram] = field(default_factory=dict)
+    _lock: Lock = field(default_factory=Lock, init=False, repr=False)
+
+    def __call__(self, event: RequestEvent) -> None:
+        endpoint = event.endpoint
+        with self._lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            if event.error is not None:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+            if event.cached:
+                self.cache_hits[endpoint] = self.cache_hits.get(endpoint, 0) + 1
+            self.bytes[endpoint] = self.bytes.get(endpoint, 0) + event.bytes
+            if event.objects is not None:
+                self.objects[endpoint] = self.objects.get(endpoint, 0) + event.objects
+            self._histogram(self.total_time, endpoint).observe(event.total_time)
+            if event.network_time is not None:
+                self._histogram(self.network_time, endpoint).observe(event.network_time)
+            extract_time = event.extract_time
+            if extract_time is not None:
+                self._histogram(self.extract_time, endpoint).observe(extract_time)
+
+    def _histogram(self, histograms: Dict[str, Histogram], endpoint: str) -> Histogram:
+        histogram = histograms.get(endpoint, None)
+        if histogram is None:
+            histogram = histograms[endpoint] = Histogram(buckets=self.buckets)
+        return histogram
+
+    def reset(self) -> None:
+        with self._lock:
+            for metric in (self.calls, self.errors, self.cache_hits, self.bytes, self.objects,
+                           self.total_time, self.network_time, self.extract_time):
+                metric.clear()
+
+    def to_openmetrics(self, *, prefix: str = 'ttss') -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, attribute, description in COUNTERS:
+                values: Dict[str, int] = getattr(self, attribute)
+                lines.append(f'# TYPE {prefix}_{name} counter')
+                lines.append(f'# HELP {prefix}_{name} {description}.')
+                for endpoint, value in sorted(values.items()):
+                    lines.append(f'{prefix}_{name}_total{{endpoint="{endpoint}"}} {value}')
+            for name, attribute, description in HISTOGRAMS:
+                histograms: Dict[str, Histogram] = getattr(self, attribute)
+                lines.append(f'# TYPE {prefix}_{name} histogram')
+                lines.append(f'# HELP {prefix}_{name} {description}.')
+                for endpoint, histogram in sorted(histograms.items()):
+                    labels = f'endpoint="{endpoint}"'
+                    cumulative_counts = histogram.cumulative_counts()
+                    for bucket, count in zip(histogram.buckets, cumulative_counts):
+                        lines.append(f'{prefix}_{name}_bucket{{{labels},le="{bucket}"}} {count}')
+                    lines.append(f'{prefix}_{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                    lines.append(f'{prefix}_{name}_sum{{{labels}}} {histogram.sum}')
+                    lines.append(f'{prefix}_{name}_count{{{labels}}} {histogram.count}')
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,80 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ttss.Route import Route
+from ttss.Stop import Stop
+from ttss.TTSS import TTSS
+
+
+class NetworkGraph:
+    # stops and routes linked by the stops each route serves, stops are identified by name like in stop passages
+    def __init__(self, route_stops: Iterable[Tuple[Route, List[Stop]]] = ()) -> None:
+        self.routes: Dict[str, Route] = {}
+        self.stops: Dict[str, Stop] = {}
+        self._stop_routes: Dict[str, Set[str]] = {}
+        self._route_stops: Dict[str, List[str]] = {}
+        for route, stops in route_stops:
+            self.add_route(route, stops)
+
+    @classmethod
+    def fetch(cls, ttss: TTSS, *, max_workers: int = 10) -> 'NetworkGraph':
+        routes = ttss.get_routes()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(ttss.get_route_stops, route.id) for route in routes if route.id is not None]
+            return cls(future.result() for future in futures)
+
+    def add_route(self, route: Route, stops: List[Stop]) -> None:
+        key = _route_key(route)
+        self.routes[key] = route
+        names = []
+        for stop in stops:
+            if stop.name is None:
+                continue
+            self.stops.setdefault(stop.name, stop)
+            self._stop_routes.setdefault(stop.name, set()).add(key)
+            names.append(stop.name)
+        self._route_stops[key] = names
+
+    def routes_at(self, stop_name: str) -> List[Route]:
+        return [self.routes[key] for key in sorted(self._stop_routes.get(stop_name, ()))]
+
+    def stops_on(self, route: Route) -> List[Stop]:
+        return [self.stops[name] for name in self._route_stops.get(_route_key(route), [])]
+
+    def route_plan(self, origin: str, destination: str) -> Optional[List[Route]]:
+        # fewest routes connecting the stops, breadth-first over stop -> route -> stop
+        if origin not in self._stop_routes or destination not in self._stop_routes:
+            return None
+        if origin == destination:
+            return []
+        previous: Dict[str, Tuple[Optional[str], Optional[str]]] = {origin: (None, None)}
+        visited_routes: Set[str] = set()
+        queue = deque([origin])
+        while queue:
+            stop = queue.popleft()
+            for key in self._stop_routes[stop]:
+                if key in visited_routes:
+                    continue
+                visited_routes.add(key)
+                for next_stop in self._route_stops[key]:
+                    if next_stop in previous:
+                        continue
+                    previous[next_stop] = stop, key
+                    if next_stop == destination:
+                        return self._unwind(previous, destination)
+                    queue.append(next_stop)
+        return None
+
+    def _unwind(self, previous: Dict[str, Tuple[Optional[str], Optional[str]]], stop: str) -> List[Route]:
+        routes = []
+        current: Optional[str] = stop
+        while current is not None:
+            current, key = previous[current]
+            if key is not None:
+                routes.append(self.routes[key])
+        return routes[::-1]
+
+
+def _route_key(route: Route) -> str:
+    return route.id or route.name or ''
@@ -0,0 +1,16 @@
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from ttss.Path import Path
+from ttss.Route import Route
+from ttss.Stop import Stop
+from ttss.StopPoint import StopPoint
+
+
+@dataclass
+class NetworkSnapshot:
+    created_at: float
+    stops: List[Stop] = field(default_factory=list)
+    stop_points: List[StopPoint] = field(default_factory=list)
+    routes: List[Route] = field(default_factory=list)
+    route_paths: Dict[str, List[Path]] = field(default_factory=dict)
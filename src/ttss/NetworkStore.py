@@ -0,0 +1,94 @@
+import gzip
+import hashlib
+import os
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Optional, Union
+
+from ttss.NetworkSnapshot import NetworkSnapshot
+from ttss.TTSS import TTSS
+
+# bumped whenever the pickled models change, so snapshots of an older layout are not even read
+FORMAT_VERSION = 2
+
+
+@dataclass
+class NetworkStore:
+    ttss: TTSS
+    directory: Union[str, os.PathLike]
+    max_age: float = 24 * 60 * 60
+    max_workers: int = 10
+    compresslevel: int = 6
+    _snapshot: Optional[NetworkSnapshot] = field(default=None, init=False, repr=False)
+    _refresh_thread: Optional[Thread] = field(default=None, init=False, repr=False)
+    _lock: Lock = field(default_factory=Lock, init=False, repr=False)
+
+    @property
+    def path(self) -> Path:
+        key = hashlib.sha1(f'{self.ttss.base_url}|{self.ttss.language}'.encode('utf-8')).hexdigest()[:16]
+        return Path(self.directory) / f'network-v{FORMAT_VERSION}-{key}.pickle.gz'
+
+    def get(self) -> NetworkSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.load()
+            if snapshot is None:
+                return self.refresh()
+            self._snapshot = snapshot
+        if self.is_stale(snapshot):
+            self.refresh_in_background()
+        return snapshot
+
+    def is_stale(self, snapshot: NetworkSnapshot) -> bool:
+        return time.time() - snapshot.created_at >= self.max_age
+
+    def load(self) -> Optional[NetworkSnapshot]:
+        try:
+            with gzip.open(self.path, 'rb') as f:
+                snapshot = pickle.load(f)
+        except Exception:
+            # a missing, truncated or incompatible snapshot is a miss, e.g. pickled before the models changed
+            return None
+        return snapshot if isinstance(snapshot, NetworkSnapshot) else None
+
+    def save(self, snapshot: NetworkSnapshot) -> None:
+        path = self.path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        with gzip.open(tmp_path, 'wb', compresslevel=self.compresslevel) as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def fetch(self) -> NetworkSnapshot:
+        created_at = time.time()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            stops = executor.submit(self.ttss.get_stops)
+            stop_points = executor.submit(self.ttss.get_stop_points)
+            routes = self.ttss.get_routes()
+            route_paths = {
+                route.id: executor.submit(self.ttss.get_route_paths, route.id)
+                for route in routes
+                if route.id is not None
+            }
+            return NetworkSnapshot(created_at=created_at,
+                                   stops=stops.result(),
+                                   stop_points=stop_points.result(),
+                                   routes=routes,
+                                   route_paths={route_id: paths.result() for route_id, paths in route_paths.items()})
+
+    def refresh(self) -> NetworkSnapshot:
+        snapshot = self.fetch()
+        self.save(snapshot)
+        self._snapshot = snapshot
+        return snapshot
+
+    def refresh_in_background(self) -> Thread:
+        with self._lock:
+            if self._refresh_thread is None or not self._refresh_thread.is_alive():
+                self._refresh_thread = Thread(target=self.refresh, name='ttss-network-refresh', daemon=True)
+                self._refresh_thread.start()
+            return self._refresh_thread
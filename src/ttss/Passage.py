@@ -7,9 +7,10 @@ from ttss.Status import Status
 from ttss.Stop import Stop
 from ttss.Trip import Trip
 from ttss.Vehicle import Vehicle
+from ttss.utils import SLOTS, service_datetime
 
 
-@dataclass
+@dataclass(**SLOTS)
 class Passage:
     id: Optional[str] = None
     old: Optional[bool] = None
@@ -22,3 +23,15 @@ class Passage:
     trip: Optional[Trip] = None
     route: Optional[Route] = None
     vehicle: Optional[Vehicle] = None
+
+    @property
+    def planned_dt(self) -> Optional[datetime]:
+        if self.planned_time is None or self.dt is None:
+            return None
+        return service_datetime(self.dt, self.planned_time)
+
+    @property
+    def actual_dt(self) -> Optional[datetime]:
+        if self.actual_time is None or self.dt is None:
+            return None
+        return service_datetime(self.dt, self.actual_time)
@@ -1,8 +1,10 @@
 from dataclasses import dataclass
 from typing import List, Tuple
 
+from ttss.utils import SLOTS
 
-@dataclass
+
+@dataclass(**SLOTS)
 class Path:
     color: str
     waypoints: List[Tuple[float, float]]
@@ -0,0 +1,147 @@
+from array import array
+from dataclasses import dataclass, field
+from math import cos, pi, radians
+from typing import Dict, Iterable, List, Tuple
+
+from ttss.Path import Path
+from ttss.utils import EARTH_RADIUS
+
+UNITS_PER_DEGREE = 3_600_000
+
+METERS_PER_UNIT = radians(1) * EARTH_RADIUS / UNITS_PER_DEGREE
+
+# ground resolution of a 256 px Web Mercator tile at zoom level 0, in meters per pixel at the equator
+METERS_PER_PIXEL = 2 * pi * 6_378_137 / 256
+
+
+@dataclass
+class PathGeometry:
+    color: str
+    # interleaved latitude/longitude pairs in TTSS units (1/3,600,000 of a degree)
+    coordinates: 'array[int]' = field(default_factory=lambda: array('i'))
+
+    def __len__(self) -> int:
+        return len(self.coordinates) // 2
+
+    @property
+    def latitudes(self) -> List[float]:
+        return [value / UNITS_PER_DEGREE for value in self.coordinates[0::2]]
+
+    @property
+    def longitudes(self) -> List[float]:
+        return [value / UNITS_PER_DEGREE for value in self.coordinates[1::2]]
+
+    @property
+    def waypoints(self) -> List[Tuple[float, float]]:
+        return list(zip(self.latitudes, self.longitudes))
+
+    @classmethod
+    def from_path(cls, path: Path) -> 'PathGeometry':
+        coordinates = array('i')
+        for latitude, longitude in path.waypoints:
+            coordinates.append(round(latitude * UNITS_PER_DEGREE))
+            coordinates.append(round(longitude * UNITS_PER_DEGREE))
+        return cls(color=path.color, coordinates=coordinates)
+
+    def to_path(self) -> Path:
+        return Path(color=self.color, waypoints=self.waypoints)
+
+    def simplify(self, tolerance: float) -> 'PathGeometry':
+        # Douglas-Peucker with the tolerance in meters
+        n = len(self)
+        if n <= 2 or tolerance <= 0:
+            return PathGeometry(color=self.color, coordinates=array('i', self.coordinates))
+
+        coordinates = self.coordinates
+        # local equirectangular projection to meters, good enough for a single route
+        scale_y = METERS_PER_UNIT
+        scale_x = METERS_PER_UNIT * cos(radians(coordinates[0] / UNITS_PER_DEGREE))
+        xs = [value * scale_x for value in coordinates[1::2]]
+        ys = [value * scale_y for value in coordinates[0::2]]
+
+        keep = bytearray(n)
+        keep[0] = keep[n - 1] = 1
+        squared_tolerance = tolerance * tolerance
+        stack = [(0, n - 1)]
+        while stack:
+            first, last = stack.pop()
+            x1, y1, x2, y2 = xs[first], ys[first], xs[last], ys[last]
+            dx, dy = x2 - x1, y2 - y1
+            length = dx * dx + dy * dy
+            max_distance, max_index = -1.0, -1
+            for i in range(first + 1, last):
+                px, py = xs[i] - x1, ys[i] - y1
+                if length == 0:
+                    distance = px * px + py * py
+                else:
+                    t = max(0.0, min(1.0, (px * dx + py * dy) / length))
+                    ex, ey = px - t * dx, py - t * dy
+                    distance = ex * ex + ey * ey
+                if distance > max_distance:
+                    max_distance, max_index = distance, i
+            if max_distance > squared_tolerance:
+                keep[max_index] = 1
+                stack.append((first, max_index))
+                stack.append((max_index, last))
+
+        simplified = array('i')
+        for i in range(n):
+            if keep[i]:
+                simplified.append(coordinates[2 * i])
+                simplified.append(coordinates[2 * i + 1])
+        return PathGeometry(color=self.color, coordinates=simplified)
+
+    def lods(self, zoom_levels: Iterable[int], *, pixel_tolerance: float = 1.0) -> Dict[int, 'PathGeometry']:
+        latitude = self.coordinates[0] / UNITS_PER_DEGREE if self.coordinates else 0.0
+        return {
+            zoom: self.simplify(pixel_tolerance * METERS_PER_PIXEL * cos(radians(latitude)) / 2 ** zoom)
+            for zoom in zoom_levels
+        }
+
+    def encode_polyline(self, *, precision: int = 5) -> str:
+        factor = 10 ** precision
+        chunks = []
+        previous_latitude = previous_longitude = 0
+        for i in range(0, len(self.coordinates), 2):
+            latitude = round(self.coordinates[i] / UNITS_PER_DEGREE * factor)
+            longitude = round(self.coordinates[i + 1] / UNITS_PER_DEGREE * factor)
+            chunks.append(_encode_value(latitude - previous_latitude))
+            chunks.append(_encode_value(longitude - previous_longitude))
+            previous_latitude, previous_longitude = latitude, longitude
+        return ''.join(chunks)
+
+    @classmethod
+    def decode_polyline(cls, color: str, encoded: str, *, precision: int = 5) -> 'PathGeometry':
+        factor = 10 ** precision
+        coordinates = array('i')
+        index = latitude = longitude = 0
+        while index < len(encoded):
+            delta, index = _decode_value(encoded, index)
+            latitude += delta
+            delta, index = _decode_value(encoded, index)
+            longitude += delta
+            coordinates.append(round(latitude * UNITS_PER_DEGREE / factor))
+            coordinates.append(round(longitude * UNITS_PER_DEGREE / factor))
+        return cls(color=color, coordinates=coordinates)
+
+
+def _encode_value(value: int) -> str:
+    value = ~(value << 1) if value < 0 else value << 1
+    chunks = []
+    while value >= 0x20:
+        chunks.append(chr((0x20 | (value & 0x1f)) + 63))
+        value >>= 5
+    chunks.append(chr(value + 63))
+    return ''.join(chunks)
+
+
+def _decode_value(encoded: str, index: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = ord(encoded[index]) - 63
+        index += 1
+        result |= (byte & 0x1f) << shift
+        shift += 5
+        if byte < 0x20:
+            break
+    return (~(result >> 1) if result & 1 else result >> 1), index
@@ -0,0 +1,30 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+
+
+@dataclass
+class PolledResource:
+    key: str
+    fetch: Callable[[], Any]
+    interval: float
+    min_interval: float = 1.0
+    max_interval: float = 600.0
+    # returns the next interval for a result, None keeps the base interval
+    adapt: Optional[Callable[[Any], Optional[float]]] = None
+    callbacks: List[Callable[[Any], None]] = field(default_factory=list)
+    error_callbacks: List[Callable[[Exception], None]] = field(default_factory=list)
+    next_run: float = 0.0
+    current_interval: Optional[float] = None
+    last_result: Any = None
+    last_error: Optional[Exception] = None
+    runs: int = 0
+    failures: int = 0
+
+    def next_interval(self, result: Any) -> float:
+        interval = self.adapt(result) if self.adapt is not None else None
+        if interval is None:
+            interval = self.interval
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def backoff_interval(self) -> float:
+        return min(self.max_interval, max(self.min_interval, self.interval * 2 ** min(self.failures, 10)))
@@ -0,0 +1,28 @@
+import time
+from typing import Any, Callable, Dict
+
+import requests
+
+from ttss.ResponseArchive import ResponseArchive
+from ttss.Transport import Transport
+
+
+class RecordingTransport(Transport):
+    def __init__(self, archive: ResponseArchive, *, clock: Callable[[], float] = time.time, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.archive = archive
+        self.clock = clock
+
+    def get(self, url: str, params: Dict[str, Any], **options: Any) -> requests.Response:
+        response = super().get(url, params, **options)
+        self.archive.append(url, params, response.content,
+                            timestamp=self.clock(),
+                            status_code=response.status_code,
+                            encoding=response.encoding,
+                            content_type=response.headers.get('Content-Type', None),
+                            elapsed=response.elapsed.total_seconds())
+        return response
+
+    def close(self) -> None:
+        super().close()
+        self.archive.close()
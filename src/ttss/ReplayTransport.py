@@ -0,0 +1,96 @@
+import time
+from bisect import bisect_right
+from datetime import timedelta
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from ttss.ArchiveRecord import ArchiveRecord
+from ttss.ResponseArchive import ResponseArchive, request_key
+from ttss.Transport import Transport
+
+
+class ReplayTransport(Transport):
+    # speed=1.0 replays the recording in real time, 10.0 ten times faster, None serves the recorded
+    # responses of each request one after another regardless of time
+    def __init__(self, archive: ResponseArchive, *,
+                 speed: Optional[float] = 1.0,
+                 simulate_latency: bool = False,
+                 ignore_params: Tuple[str, ...] = ('cacheBuster',),
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep,
+                 **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.archive = archive
+        self.speed = speed
+        self.simulate_latency = simulate_latency
+        self.ignore_params = ignore_params
+        self.clock = clock
+        self.sleep = sleep
+        self._records: Dict[str, List[ArchiveRecord]] = {}
+        self._timestamps: Dict[str, List[float]] = {}
+        self._cursors: Dict[str, int] = {}
+        self._lock = Lock()
+
+        for record in sorted(archive.records, key=lambda record: record.timestamp):
+            key = request_key(record.url, record.params, ignore=ignore_params)
+            self._records.setdefault(key, []).append(record)
+            self._timestamps.setdefault(key, []).append(record.timestamp)
+        self.start_timestamp = min((record.timestamp for record in archive.records), default=0.0)
+        self.end_timestamp = max((record.timestamp for record in archive.records), default=0.0)
+        self.rewind()
+
+    def rewind(self) -> None:
+        with self._lock:
+            self._origin = self.clock()
+            self._cursors.clear()
+
+    @property
+    def replay_timestamp(self) -> float:
+        # the moment of the recording that is being replayed now
+        return self.start_timestamp + (self.clock() - self._origin) * (self.speed or 0.0)
+
+    @property
+    def finished(self) -> bool:
+        return self.speed is not None and self.replay_timestamp > self.end_timestamp
+
+    def _find(self, key: str) -> Optional[ArchiveRecord]:
+        records = self._records.get(key, None)
+        if not records:
+            return None
+        if self.speed is None:
+            with self._lock:
+                cursor = self._cursors.get(key, 0)
+                self._cursors[key] = cursor + 1
+            return records[min(cursor, len(records) - 1)]
+        index = bisect_right(self._timestamps[key], self.replay_timestamp) - 1
+        # nothing had been recorded for the request yet at this moment of the recording
+        return records[index] if index >= 0 else None
+
+    def get(self, url: str, params: Dict[str, Any], **options: Any) -> requests.Response:
+        record = self._find(request_key(url, params, ignore=self.ignore_params))
+
+        response = requests.Response()
+        response.url = requests.Request('GET', url, params=params).prepare().url or url
+        if record is None:
+            response.status_code = 404
+            response.reason = 'Not Found'
+            response._content = b''
+            return response
+
+        if self.simulate_latency and record.elapsed > 0:
+            self.sleep(record.elapsed / (self.speed or 1.0))
+
+        response.status_code = record.status_code
+        response._content = self.archive.read(record)
+        response.encoding = record.encoding
+        response.elapsed = timedelta(seconds=record.elapsed)
+        if record.content_type is not None:
+            response.headers = CaseInsensitiveDict({'Content-Type': record.content_type})
+        return response
+
+    def close(self) -> None:
+        super().close()
+        self.archive.close()
@@ -0,0 +1,24 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class RequestEvent:
+    endpoint: str
+    url: Optional[str] = None
+    params: Dict[str, Any] = field(default_factory=dict)
+    status_code: Optional[int] = None
+    bytes: int = 0
+    cached: bool = False
+    objects: Optional[int] = None
+    error: Optional[BaseException] = None
+    # seconds, time to first byte is measured until the response headers were parsed
+    ttfb: Optional[float] = None
+    network_time: Optional[float] = None
+    total_time: float = 0.0
+
+    @property
+    def extract_time(self) -> Optional[float]:
+        if self.network_time is None:
+            return None
+        return max(0.0, self.total_time - self.network_time)
@@ -0,0 +1,114 @@
+import json
+import os
+import zlib
+from dataclasses import asdict
+from threading import Lock
+from types import TracebackType
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, TextIO, Tuple, Type, Union
+from urllib.parse import urlencode
+
+from ttss.ArchiveRecord import ArchiveRecord
+
+DATA_FILE = 'responses.bin'
+
+INDEX_FILE = 'index.jsonl'
+
+
+def request_key(url: str, params: Dict[str, Any], *, ignore: Tuple[str, ...] = ()) -> str:
+    query = urlencode(sorted((key, str(value)) for key, value in params.items()
+                             if value is not None and key not in ignore))
+    return f'{url}?{query}'
+
+
+class ResponseArchive:
+    # append-only: zlib compressed bodies are concatenated in the data file and each one gets a JSON line in the index
+    def __init__(self, path: Union[str, 'os.PathLike[str]'], *, compression_level: int = 6,
+                 load_index: bool = True) -> None:
+        self.path = os.fspath(path)
+        self.compression_level = compression_level
+        self.records: List[ArchiveRecord] = []
+        self._writer: Optional[BinaryIO] = None
+        self._index_writer: Optional[TextIO] = None
+        self._reader: Optional[BinaryIO] = None
+        # the size of the index without a line left incomplete by a crash, it is cut off before appending
+        self._index_size: Optional[int] = None
+        self._lock = Lock()
+
+        os.makedirs(self.path, exist_ok=True)
+        index_path = os.path.join(self.path, INDEX_FILE)
+        if load_index and os.path.exists(index_path):
+            with open(index_path, 'rb') as f:
+                lines = f.read().split(b'\n')
+            size = 0
+            for i, line in enumerate(lines):
+                try:
+                    if line.strip():
+                        self.records.append(ArchiveRecord(**json.loads(line)))
+                except ValueError:
+                    if i < len(lines) - 1:
+                        raise ValueError(f'{index_path}: invalid record on line {i + 1}')
+                    break
+                if i < len(lines) - 1:
+                    size += len(line) + 1
+                elif line:
+                    # valid but not terminated, the newline may be all that is missing
+                    self.records.pop()
+            self._index_size = size
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[ArchiveRecord]:
+        return iter(self.records)
+
+    def append(self, url: str, params: Dict[str, Any], content: bytes, *, timestamp: float, status_code: int = 200,
+               encoding: Optional[str] = None, content_type: Optional[str] = None,
+               elapsed: float = 0.0) -> ArchiveRecord:
+        compressed = zlib.compress(content, self.compression_level)
+        with self._lock:
+            if self._writer is None or self._index_writer is None:
+                self._writer = open(os.path.join(self.path, DATA_FILE), 'ab')
+                index_path = os.path.join(self.path, INDEX_FILE)
+                if self._index_size is not None and os.path.getsize(index_path) > self._index_size:
+                    os.truncate(index_path, self._index_size)
+                self._index_writer = open(index_path, 'a', encoding='utf-8')
+            record = ArchiveRecord(timestamp=timestamp,
+                                   url=url,
+                                   params={key: value for key, value in params.items() if value is not None},
+                                   status_code=status_code,
+                                   encoding=encoding,
+                                   content_type=content_type,
+                                   elapsed=elapsed,
+                                   offset=self._writer.seek(0, os.SEEK_END),
+                                   length=len(compressed))
+            self._writer.write(compressed)
+            self._writer.flush()
+            # the index line is written after the body, so a crash never leaves a record without its data
+            self._index_writer.write(json.dumps(asdict(record), separators=(',', ':')) + '\n')
+            self._index_writer.flush()
+            self.records.append(record)
+        return record
+
+    def read(self, record: ArchiveRecord) -> bytes:
+        with self._lock:
+            if self._writer is not None:
+                self._writer.flush()
+            if self._reader is None:
+                self._reader = open(os.path.join(self.path, DATA_FILE), 'rb')
+            self._reader.seek(record.offset)
+            compressed = self._reader.read(record.length)
+        return zlib.decompress(compressed)
+
+    def close(self) -> None:
+        with self._lock:
+            for f in (self._writer, self._index_writer, self._reader):
+                if f is not None:
+                    f.close()
+            self._writer = self._index_writer = self._reader = None
+
+    def __enter__(self) -> 'ResponseArchive':
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]], exc_value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.close()
@@ -0,0 +1,243 @@
+import asyncio
+import heapq
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from random import Random
+from threading import Condition, Thread
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ttss.Mode import Mode
+from ttss.Passage import Passage
+from ttss.PolledResource import PolledResource
+from ttss.TTSS import TTSS
+from ttss.TokenBucket import TokenBucket
+
+
+@dataclass
+class Scheduler:
+    ttss: TTSS
+    rps: float = 10.0
+    burst: Optional[float] = None
+    # each interval is stretched or shrunk by up to this fraction
+    jitter: float = 0.1
+    max_workers: int = 10
+    clock: Callable[[], float] = time.monotonic
+    seed: Optional[int] = None
+    resources: Dict[str, PolledResource] = field(default_factory=dict, init=False)
+    _queue: List[Tuple[float, int, str]] = field(default_factory=list, init=False, repr=False)
+    _counter: Iterator[int] = field(default_factory=itertools.count, init=False, repr=False)
+    _bucket: TokenBucket = field(init=False, repr=False)
+    _random: Random = field(init=False, repr=False)
+    _condition: Condition = field(default_factory=Condition, init=False, repr=False)
+    _executor: Optional[ThreadPoolExecutor] = field(default=None, init=False, repr=False)
+    _thread: Optional[Thread] = field(default=None, init=False, repr=False)
+    _stopped: bool = field(default=False, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._bucket = TokenBucket(rate=self.rps, capacity=self.burst, clock=self.clock)
+        self._random = Random(self.seed)
+
+    def register(self, key: str, fetch: Callable[[], Any], *,
+                 interval: float,
+                 min_interval: float = 1.0,
+                 max_interval: float = 600.0,
+                 adapt: Optional[Callable[[Any], Optional[float]]] = None,
+                 callback: Optional[Callable[[Any], None]] = None,
+                 on_error: Optional[Callable[[Exception], None]] = None) -> PolledResource:
+        resource = PolledResource(key=key, fetch=fetch, interval=interval, min_interval=min_interval,
+                                  max_interval=max_interval, adapt=adapt)
+        if callback is not None:
+            resource.callbacks.append(callback)
+        if on_error is not None:
+            resource.error_callbacks.append(on_error)
+        with self._condition:
+            if key in self.resources:
+                raise ValueError(f'resource {key!r} is already registered')
+            self.resources[key] = resource
+            # spread the first requests over one interval instead of sending them all at once
+            self._push(resource, self.clock() + self._random.uniform(0, interval))
+        return resource
+
+    def unregister(self, key: str) -> Optional[PolledResource]:
+        with self._condition:
+            return self.resources.pop(key, None)
+
+    def poll_stop_passages(self, stop_number: str, *,
+                           interval: float = 10.0,
+                           fast_interval: float = 5.0,
+                           slow_interval: float = 120.0,
+                           soon: float = 120.0,
+                           mode: Mode = Mode.DEPARTURES,
+                           timeframe: int = 120,
+                           callback: Optional[Callable[[Any], None]] = None,
+                           on_error: Optional[Callable[[Exception], None]] = None) -> PolledResource:
+        return self.register(
+            f'stop_passages:{stop_number}',
+            lambda: self.ttss.get_stop_passages(stop_number, mode=mode, timeframe=timeframe),
+            interval=interval, min_interval=min(fast_interval, interval), max_interval=max(slow_interval, interval),
+            adapt=lambda result: passages_interval(result[2], interval=interval, fast_interval=fast_interval,
+                                                   slow_interval=slow_interval, soon=soon),
+            callback=callback, on_error=on_error)
+
+    def poll_trip_passages(self, trip_id: str, *,
+                           interval: float = 15.0,
+                           callback: Optional[Callable[[Any], None]] = None,
+                           on_error: Optional[Callable[[Exception], None]] = None) -> PolledResource:
+        return self.register(f'trip_passages:{trip_id}', lambda: self.ttss.get_trip_passages(trip_id),
+                             interval=interval, callback=callback, on_error=on_error)
+
+    def poll_vehicles(self, *,
+                      interval: float = 5.0,
+                      callback: Optional[Callable[[Any], None]] = None,
+                      on_error: Optional[Callable[[Exception], None]] = None) -> PolledResource:
+        return self.register('vehicles', self.ttss.get_vehicles,
+                             interval=interval, callback=callback, on_error=on_error)
+
+    def run_pending(self) -> int:
+        # runs the due resources in the calling thread for as long as the budget allows
+        count = 0
+        while True:
+            with self._condition:
+                resource = self._pop_due()
+                if resource is None:
+                    return count
+                if self._bucket.consume() > 0:
+                    self._push(resource, resource.next_run)
+                    return count
+            self._run(resource)
+            count += 1
+
+    def start(self) -> None:
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='ttss-scheduler')
+            self._thread = Thread(target=self._dispatch, name='ttss-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def __enter__(self) -> 'Scheduler':
+        self.start()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.stop()
+
+    async def stream(self, key: str, *, max_size: int = 1) -> AsyncIterator[Any]:
+        # yields results of one resource, dropping the oldest ones when the consumer falls behind
+        loop = asyncio.get_running_loop()
+        queue: 'asyncio.Queue[Any]' = asyncio.Queue(max_size)
+
+        def put(result: Any) -> None:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(result)
+
+        def callback(result: Any) -> None:
+            loop.call_soon_threadsafe(put, result)
+
+        resource = self.resources[key]
+        resource.callbacks.append(callback)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            resource.callbacks.remove(callback)
+
+    def _push(self, resource: PolledResource, next_run: float) -> None:
+        resource.next_run = next_run
+        heapq.heappush(self._queue, (next_run, next(self._counter), resource.key))
+        self._condition.notify_all()
+
+    def _peek(self) -> Optional[PolledResource]:
+        # drops entries of unregistered resources
+        while self._queue:
+            next_run, _, key = self._queue[0]
+            resource = self.resources.get(key, None)
+            if resource is not None and resource.next_run == next_run:
+                return resource
+            heapq.heappop(self._queue)
+        return None
+
+    def _pop_due(self) -> Optional[PolledResource]:
+        resource = self._peek()
+        if resource is None or resource.next_run > self.clock():
+            return None
+        heapq.heappop(self._queue)
+        return resource
+
+    def _run(self, resource: PolledResource) -> None:
+        try:
+            result = resource.fetch()
+        except Exception as e:
+            resource.failures += 1
+            resource.last_error = e
+            self._reschedule(resource, resource.backoff_interval())
+            for error_callback in list(resource.error_callbacks):
+                error_callback(e)
+            return
+        resource.runs += 1
+        resource.failures = 0
+        resource.last_result = result
+        self._reschedule(resource, resource.next_interval(result))
+        for callback in list(resource.callbacks):
+            callback(result)
+
+    def _reschedule(self, resource: PolledResource, interval: float) -> None:
+        with self._condition:
+            resource.current_interval = interval
+            if self.resources.get(resource.key, None) is resource:
+                delay = interval * (1 + self._random.uniform(-self.jitter, self.jitter))
+                self._push(resource, self.clock() + delay)
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._condition:
+                while True:
+                    if self._stopped:
+                        return
+                    resource = self._peek()
+                    if resource is None:
+                        self._condition.wait()
+                        continue
+                    delay = resource.next_run - self.clock()
+                    if delay > 0:
+                        self._condition.wait(delay)
+                        continue
+                    wait = self._bucket.consume()
+                    if wait > 0:
+                        self._condition.wait(wait)
+                        continue
+                    heapq.heappop(self._queue)
+                    break
+            if self._executor is not None:
+                self._executor.submit(self._run, resource)
+
+
+def passages_interval(passages: List[Passage], *,
+                      interval: float,
+                      fast_interval: float,
+                      slow_interval: float,
+                      soon: float,
+                      now: Optional[datetime] = None) -> float:
+    upcoming = [passage.dt for passage in passages if not passage.old and passage.dt is not None]
+    if not upcoming:
+        return slow_interval
+    first = min(upcoming)
+    if now is None:
+        now = datetime.now(first.tzinfo)
+    return fast_interval if first - now <= timedelta(seconds=soon) else interval
@@ -0,0 +1,109 @@
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Set, Tuple, Union
+
+from ttss.Stop import Stop
+from ttss.StopPoint import StopPoint
+
+EXACT, NAME_PREFIX, WORD_PREFIX, CODE_PREFIX, FUZZY = range(5)
+
+FOLDED_CHARACTERS = str.maketrans({'ł': 'l', 'Ł': 'l', 'ß': 'ss'})
+
+
+def fold(text: str) -> str:
+    decomposed = unicodedata.normalize('NFKD', text.translate(FOLDED_CHARACTERS))
+    stripped = ''.join(character for character in decomposed if not unicodedata.combining(character))
+    return ' '.join(''.join(character if character.isalnum() else ' ' for character in stripped.lower()).split())
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    def __init__(self, stops: Iterable[Stop] = (), stop_points: Iterable[StopPoint] = (), *,
+                 min_similarity: float = 0.3) -> None:
+        self.min_similarity = min_similarity
+        self.names: List[str] = []
+        self.results: List[Union[Stop, StopPoint]] = []
+        self.words: List[Tuple[str, int]] = []
+        self.codes: List[Tuple[str, int]] = []
+        self.trigrams: Dict[str, List[int]] = {}
+        self.trigram_counts: List[int] = []
+
+        seen: Set[Tuple[type, str]] = set()
+        for stop in stops:
+            if stop.name is not None and stop.number is not None and (Stop, stop.number) not in seen:
+                seen.add((Stop, stop.number))
+                self._add(stop.name, stop.number, Stop(number=stop.number, name=stop.name))
+        for stop_point in stop_points:
+            if stop_point.name is not None and stop_point.code is not None and (StopPoint, stop_point.code) not in seen:
+                seen.add((StopPoint, stop_point.code))
+                self._add(stop_point.name, stop_point.code, StopPoint(code=stop_point.code, name=stop_point.name))
+
+        self.words.sort()
+        self.codes.sort()
+
+    def _add(self, name: str, code: str, result: Union[Stop, StopPoint]) -> None:
+        index = len(self.results)
+        folded = fold(name)
+        self.names.append(folded)
+        self.results.append(result)
+        self.words.extend((word, index) for word in set(folded.split()))
+        self.codes.append((code, index))
+        name_trigrams = trigrams(folded)
+        self.trigram_counts.append(len(name_trigrams))
+        for trigram in name_trigrams:
+            self.trigrams.setdefault(trigram, []).append(index)
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def search(self, query: str, *, limit: int = 20) -> List[Union[Stop, StopPoint]]:
+        folded = fold(query)
+        if not folded:
+            return []
+
+        ranks: Dict[int, Tuple[int, float]] = {}
+
+        tokens = folded.split()
+        for index in self._prefixed(self.words, tokens[0]):
+            if index in ranks:
+                continue
+            name = self.names[index]
+            if name == folded:
+                ranks[index] = (EXACT, 0.0)
+            elif name.startswith(folded):
+                ranks[index] = (NAME_PREFIX, 0.0)
+            elif all(any(word.startswith(token) for word in name.split()) for token in tokens[1:]):
+                ranks[index] = (WORD_PREFIX, 0.0)
+
+        if folded.isdigit():
+            for code, index in self._prefixed_keys(self.codes, folded):
+                rank = (EXACT if code == folded else CODE_PREFIX, 0.0)
+                ranks[index] = min(ranks.get(index, rank), rank)
+
+        if len(ranks) < limit:
+            query_trigrams = trigrams(folded)
+            shared: Dict[int, int] = {}
+            for trigram in query_trigrams:
+                for index in self.trigrams.get(trigram, ()):
+                    shared[index] = shared.get(index, 0) + 1
+            for index, count in shared.items():
+                similarity = count / (len(query_trigrams) + self.trigram_counts[index] - count)
+                if similarity >= self.min_similarity and index not in ranks:
+                    ranks[index] = (FUZZY, -similarity)
+
+        ranked = sorted(ranks, key=lambda index: (ranks[index], self.names[index], index))
+        return [self.results[index] for index in ranked[:limit]]
+
+    @staticmethod
+    def _prefixed_keys(keys: List[Tuple[str, int]], prefix: str) -> Iterable[Tuple[str, int]]:
+        for i in range(bisect_left(keys, (prefix, -1)), len(keys)):
+            if not keys[i][0].startswith(prefix):
+                break
+            yield keys[i]
+
+    def _prefixed(self, keys: List[Tuple[str, int]], prefix: str) -> Iterable[int]:
+        return (index for _, index in self._prefixed_keys(keys, prefix))
@@ -0,0 +1,115 @@
+import heapq
+from itertools import count
+from math import cos, floor, radians
+from typing import Dict, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
+
+from ttss.Stop import Stop
+from ttss.StopPoint import StopPoint
+from ttss.utils import EARTH_RADIUS, haversine
+
+T = TypeVar('T', bound=Union[Stop, StopPoint])
+
+METERS_PER_DEGREE = radians(1) * EARTH_RADIUS
+
+
+class SpatialIndex(Generic[T]):
+    def __init__(self, items: Iterable[T], *, cell_size: float = 0.005) -> None:
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[Tuple[float, float, T]]] = {}
+        self.size = 0
+        for item in items:
+            if item.latitude is None or item.longitude is None:
+                continue
+            cell = self._cell(item.latitude, item.longitude)
+            self.cells.setdefault(cell, []).append((item.latitude, item.longitude, item))
+            self.size += 1
+        if self.cells:
+            self.min_row = min(row for row, _ in self.cells)
+            self.max_row = max(row for row, _ in self.cells)
+            self.min_col = min(col for _, col in self.cells)
+            self.max_col = max(col for _, col in self.cells)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return floor(latitude / self.cell_size), floor(longitude / self.cell_size)
+
+    def _ring(self, row: int, col: int, radius: int) -> Iterator[Tuple[float, float, T]]:
+        if radius == 0:
+            yield from self.cells.get((row, col), [])
+            return
+        for r in range(row - radius, row + radius + 1):
+            step = 1 if r in (row - radius, row + radius) else 2 * radius
+            for c in range(col - radius, col + radius + 1, step):
+                yield from self.cells.get((r, c), [])
+
+    def _max_radius(self, row: int, col: int) -> int:
+        return max(abs(row - self.min_row), abs(row - self.max_row), abs(col - self.min_col), abs(col - self.max_col))
+
+    def within_bbox(self, min_latitude: float, min_longitude: float,
+                    max_latitude: float, max_longitude: float) -> List[T]:
+        min_row, min_col = self._cell(min_latitude, min_longitude)
+        max_row, max_col = self._cell(max_latitude, max_longitude)
+        if (max_row - min_row + 1) * (max_col - min_col + 1) <= len(self.cells):
+            cells = [
+                self.cells[row, col]
+                for row in range(min_row, max_row + 1)
+                for col in range(min_col, max_col + 1)
+                if (row, col) in self.cells
+            ]
+        else:
+            cells = [
+                items
+                for (row, col), items in self.cells.items()
+                if min_row <= row <= max_row and min_col <= col <= max_col
+            ]
+        return [
+            item
+            for items in cells
+            for item_latitude, item_longitude, item in items
+            if min_latitude <= item_latitude <= max_latitude and min_longitude <= item_longitude <= max_longitude
+        ]
+
+    def within_radius(self, latitude: float, longitude: float, radius: float) -> List[Tuple[float, T]]:
+        if not self.cells:
+            return []
+        row, col = self._cell(latitude, longitude)
+        result: List[Tuple[float, T]] = []
+        for ring in range(0, self._max_radius(row, col) + 1):
+            if self._min_distance(latitude, ring) > radius:
+                break
+            for item_latitude, item_longitude, item in self._ring(row, col, ring):
+                distance = haversine(latitude, longitude, item_latitude, item_longitude)
+                if distance <= radius:
+                    result.append((distance, item))
+        result.sort(key=lambda pair: pair[0])
+        return result
+
+    def nearest(self, latitude: float, longitude: float, k: int = 1, *,
+                max_distance: Optional[float] = None) -> List[Tuple[float, T]]:
+        if not self.cells or k <= 0:
+            return []
+        row, col = self._cell(latitude, longitude)
+        candidates: List[Tuple[float, int, T]] = []
+        # ties are broken by the order of discovery, items are never compared
+        order = count()
+        for ring in range(0, self._max_radius(row, col) + 1):
+            min_distance = self._min_distance(latitude, ring)
+            if len(candidates) >= k and candidates[k - 1][0] <= min_distance:
+                break
+            if max_distance is not None and min_distance > max_distance:
+                break
+            for item_latitude, item_longitude, item in self._ring(row, col, ring):
+                distance = haversine(latitude, longitude, item_latitude, item_longitude)
+                if max_distance is None or distance <= max_distance:
+                    candidates.append((distance, next(order), item))
+            candidates = heapq.nsmallest(k, candidates)
+        return [(distance, item) for distance, _, item in candidates]
+
+    def _min_distance(self, latitude: float, ring: int) -> float:
+        # a lower bound on the distance to any item in the given ring of cells around the query cell
+        if ring <= 1:
+            return 0.0
+        farthest_latitude = min(abs(latitude) + (ring + 1) * self.cell_size, 90.0)
+        return (ring - 1) * self.cell_size * METERS_PER_DEGREE * cos(radians(farthest_latitude))
@@ -1,8 +1,10 @@
 from dataclasses import dataclass
 from typing import Optional
 
+from ttss.utils import SLOTS
 
-@dataclass
+
+@dataclass(**SLOTS)
 class StopPoint:
     id: Optional[str] = None
     name: Optional[str] = None
@@ -1,25 +1,37 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, tzinfo
-from typing import Any, Dict, List, Optional, Tuple, Union
+from time import perf_counter
+from types import TracebackType
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type, TypeVar, Union
 
 import pytz
 import requests
 
+from ttss.Cache import Cache, cached
 from ttss.ColorType import ColorType
+from ttss.Interner import Interner
 from ttss.Mode import Mode
 from ttss.Passage import Passage
 from ttss.Path import Path
+from ttss.PathGeometry import PathGeometry
 from ttss.PositionType import PositionType
 from ttss.Route import Route
 from ttss.Stop import Stop
 from ttss.StopPoint import StopPoint
+from ttss.Transport import Transport
 from ttss.Trip import Trip
 from ttss.Vehicle import Vehicle
+from ttss.VehicleFrame import VehicleFrame
+from ttss.decoders import decode_paths, decode_stop_passages, decode_vehicles, decode_vehicles_update, loads
 from ttss.extractors import extract_autocomplete_stops, extract_autocomplete_stops_json, extract_stops, \
-    extract_stop_points, extract_stop, extract_stop_point, extract_stop_passages, extract_stop_point_passages, \
-    extract_trip_passages, extract_routes, extract_route_stops, extract_route_paths, extract_vehicle_paths, \
-    extract_vehicles, extract_stops_by_character, extract_lookup_fulltext, extract_near_stops
-from ttss.utils import timestamp_ms
+    extract_stop_points, extract_stop, extract_stop_point, extract_trip_passages, extract_routes, \
+    extract_route_stops, extract_stops_by_character, extract_lookup_fulltext, extract_near_stops, \
+    extract_vehicle_frame, extract_path_geometries, iter_paths, iter_stop_passages, iter_vehicles
+from ttss.hooks import Hook, instrumented, record_response
+from ttss.utils import take, timestamp_ms
+
+T = TypeVar('T')
 
 
 @dataclass
@@ -28,54 +40,88 @@ class TTSS:
     language: str = 'pl'
     tz: tzinfo = pytz.timezone('Europe/Warsaw')
     options: Dict[str, Any] = field(default_factory=dict)
+    transport: Transport = field(default_factory=Transport)
+    cache: Optional[Cache] = None
+    interner: Optional[Interner] = None
+    hooks: List[Hook] = field(default_factory=list)
+
+    def _get(self, url: str, params: Dict[str, Any]) -> requests.Response:
+        if not self.hooks:
+            return self.transport.get(url, params, **self.options)
+        started = perf_counter()
+        response = self.transport.get(url, params, **self.options)
+        record_response(url, params,
+                        status_code=response.status_code,
+                        content=response.content,
+                        ttfb=response.elapsed.total_seconds(),
+                        network_time=perf_counter() - started)
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
 
+    def __enter__(self) -> 'TTSS':
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]], exc_value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.close()
+
+    @instrumented
     def autocomplete_stops(self, query: str) -> List[Stop]:
         url = f'{self.base_url}/internetservice/services/lookup/autocomplete'
         params = {
             'query': query,
             'language': self.language,
         }
-        response = requests.get(url, params, **self.options)
+        response = self._get(url, params)
         response.raise_for_status()
         return extract_autocomplete_stops(response.text)
 
+    @instrumented
     def autocomplete_stops_json(self, query: str) -> List[Stop]:
         url = f'{self.base_url}/internetservice/services/lookup/autocomplete/json'
         params = {
             'query': query,
             'language': self.language,
         }
-        response = requests.get(url, params, **self.options)
+        response = self._get(url, params)
         response.raise_for_status()
-        return extract_autocomplete_stops_json(response.json())
+        return extract_autocomplete_stops_json(loads(response.content))
 
+    @instrumented
     def lookup_fulltext(self, search: str) -> List[Union[Stop, StopPoint]]:
         url = f'{self.base_url}/internetservice/services/lookup/fulltext'
         params = {'search': search}
-        response = requests.get(url, params, **self.options)
+        response = self._get(url, params)
         response.raise_for_status()
-        return extract_lookup_fulltext(response.json())
+        return extract_lookup_fulltext(loads(response.content))
 
+    @instrumented
+    @cached()
     def get_stops_by_character(self, character: str) -> List[Stop]:
         url = f'{self.base_url}/internetservice/services/lookup/stopsByCharacter'
         params = {
             'character': character,
             'language': self.language,
         }
-        response = requests.get(url, params, **self.options)
+        response = self._get(url, params)
         response.raise_for_status()
-        return extract_stops_by_character(response.json())
+        return extract_stops_by_character(loads(response.content))
 
+    @instrumented
     def get_near_stops(self, latitude: float, longitude: float) -> List[Stop]:
         url = f'{self.base_url}/internetservice/services/lookup/autocomplete/nearStops/json'
         params = {
             'lat': latitude,
             'lon': longitude,
         }
-        response = requests.get(url, params, **self.options)
+        response = self._get(url, params)
         response.raise_for_status()
-        return extract_near_stops(response.json())
+        return extract_near_stops(loads(response.content))
 
+    @instrumented
+    @cached()
     def get_stops(self, *,
                   min_latitude: float = -90.0, max_latitude: float = 90.0,
                   min_longitude: float = -180.0, max_longitude: float = 180.0) -> List[Stop]:
@@ -86,10 +132,12 @@ class TTSS:
             'right': int(max_longitude * 3_600_000),
             'top': int(max_latitude * 3_600_000),
         }
-        response = requests.get(url, params, **self.options)
+        response = self._get(url, params)
         response.raise_for_status()
-        return extract_stops(response.json())
+        return extract_stops(loads(response.content))
 
+    @instrumented
+    @cached()
     def get_stop_points(self, *,
                         min_latitude: float = -90.0, max_latitude: float = 90.0,
                         min_longitude: float = -180.0, max_longitude: float = 180.0) -> List[StopPoint]:
@@ -100,41 +148,60 @@ class TTSS:
             'right': int(max_longitude * 3_600_000),
             'top': int(max_latitude * 3_600_000),
         }
-        response = requests.get(url, params, **self.options)
+        response = self._get(url, params)
         response.raise_for_status()
-        return extract_stop_points(response.json())
+        return extract_stop_points(loads(response.content))
 
+    @instrumented
+    @cached()
     def get_stop(self, stop_number: str) -> Optional[Stop]:
         url = f'{self.base_url}/internetservice/services/stopInfo/stop'
         params = {
             'stop': stop_number,
             'language': self.language,
         }
-        response = requests.get(url, params, **self.options)
+        response = self._get(url, params)
         if response.status_code == 404:
             return None
         response.raise_for_status()
-        return extract_stop(response.json())
+        return extract_stop(loads(response.content))
 
+    @instrumented
+    @cached()
     def get_stop_point(self, stop_point_code: str) -> Optional[StopPoint]:
         url = f'{self.base_url}/internetservice/services/stopInfo/stopPoint'
         params = {
             'stopPoint': stop_point_code,
             'language': self.language,
         }
-        response = requests.get(url, params, **self.options)
+        response = self._get(url, params)
         if response.status_code == 404:
             return None
         response.raise_for_status()
-        return extract_stop_point(response.json())
+        return extract_stop_point(loads(response.content))
 
+    @instrumented
     def get_stop_passages(self, stop_number: str, *,
                           authority: Optional[str] = None,
                           route_id: Optional[str] = None,
                           direction: Optional[str] = None,
                           mode: Mode = Mode.DEPARTURES,
-                          timeframe: int = 120) -> Tuple[Stop, List[Route], List[Passage]]:
-        now = datetime.now(self.tz).replace(microsecond=0)
+                          timeframe: int = 120,
+                          now: Optional[datetime] = None) -> Tuple[Stop, List[Route], List[Passage]]:
+        if now is None:
+            now = datetime.now(self.tz).replace(microsecond=0)
+        content = self._get_stop_passages_content(stop_number, authority=authority, route_id=route_id,
+                                                  direction=direction, mode=mode, timeframe=timeframe)
+        return decode_stop_passages(content, now=now, interner=self.interner)
+
+    # the response is cached rather than the passages, whose datetimes depend on the caller's now
+    @cached(endpoint='get_stop_passages')
+    def _get_stop_passages_content(self, stop_number: str, *,
+                                   authority: Optional[str],
+                                   route_id: Optional[str],
+                                   direction: Optional[str],
+                                   mode: Mode,
+                                   timeframe: int) -> bytes:
         url = f'{self.base_url}/internetservice/services/passageInfo/stopPassages/stop'
         params = {
             'language': self.language,
@@ -146,17 +213,88 @@ class TTSS:
             'timeFrame': timeframe,
             'cacheBuster': timestamp_ms(),
         }
-        response = requests.get(url, params, **self.options)
+        response = self._get(url, params)
         response.raise_for_status()
-        return extract_stop_passages(response.json(), now=now)
+        return response.content
 
+    @instrumented
     def get_stop_point_passages(self, stop_point_code: str, *,
                                 authority: Optional[str] = None,
                                 route_id: Optional[str] = None,
                                 direction: Optional[str] = None,
                                 mode: Mode = Mode.DEPARTURES,
-                                timeframe: int = 120) -> Tuple[Stop, List[Route], List[Passage]]:
-        now = datetime.now(self.tz).replace(microsecond=0)
+                                timeframe: int = 120,
+                                now: Optional[datetime] = None) -> Tuple[Stop, List[Route], List[Passage]]:
+        if now is None:
+            now = datetime.now(self.tz).replace(microsecond=0)
+        content = self._get_stop_point_passages_content(stop_point_code, authority=authority, route_id=route_id,
+                                                        direction=direction, mode=mode, timeframe=timeframe)
+        return decode_stop_passages(content, now=now, interner=self.interner)
+
+    @cached(endpoint='get_stop_point_passages')
+    def _get_stop_point_passages_content(self, stop_point_code: str, *,
+                                         authority: Optional[str],
+                                         route_id: Optional[str],
+                                         direction: Optional[str],
+                                         mode: Mode,
+                                         timeframe: int) -> bytes:
+        url = f'{self.base_url}/internetservice/services/passageInfo/stopPassages/stopPoint'
+        params = {
+            'language': self.language,
+            'stopPoint': stop_point_code,
+            'authority': authority,
+            'routeId': route_id,
+            'direction': direction,
+            'mode': mode.value,
+            'timeFrame': timeframe,
+            'cacheBuster': timestamp_ms(),
+        }
+        response = self._get(url, params)
+        response.raise_for_status()
+        return response.content
+
+    @instrumented
+    def iter_stop_passages(self, stop_number: str, *,
+                           authority: Optional[str] = None,
+                           route_id: Optional[str] = None,
+                           direction: Optional[str] = None,
+                           mode: Mode = Mode.DEPARTURES,
+                           timeframe: int = 120,
+                           now: Optional[datetime] = None,
+                           old: bool = True,
+                           predicate: Optional[Callable[[Passage], bool]] = None,
+                           limit: Optional[int] = None) -> Iterator[Passage]:
+        if now is None:
+            now = datetime.now(self.tz).replace(microsecond=0)
+        url = f'{self.base_url}/internetservice/services/passageInfo/stopPassages/stop'
+        params = {
+            'language': self.language,
+            'stop': stop_number,
+            'authority': authority,
+            'routeId': route_id,
+            'direction': direction,
+            'mode': mode.value,
+            'timeFrame': timeframe,
+            'cacheBuster': timestamp_ms(),
+        }
+        response = self._get(url, params)
+        response.raise_for_status()
+        passages = iter_stop_passages(loads(response.content), now=now, old=old, interner=self.interner)
+        return take(passages, predicate=predicate, limit=limit)
+
+    @instrumented
+    def iter_stop_point_passages(self, stop_point_code: str, *,
+                                 authority: Optional[str] = None,
+                                 route_id: Optional[str] = None,
+                                 direction: Optional[str] = None,
+                                 mode: Mode = Mode.DEPARTURES,
+                                 timeframe: int = 120,
+                                 now: Optional[datetime] = None,
+                                 old: bool = True,
+                                 predicate: Optional[Callable[[Passage], bool]] = None,
+                                 limit: Optional[int] = None) -> Iterator[Passage]:
+        if now is None:
+            now = datetime.now(self.tz).replace(microsecond=0)
         url = f'{self.base_url}/internetservice/services/passageInfo/stopPassages/stopPoint'
         params = {
             'language': self.language,
@@ -168,10 +306,47 @@ class TTSS:
             'timeFrame': timeframe,
             'cacheBuster': timestamp_ms(),
         }
-        response = requests.get(url, params, **self.options)
+        response = self._get(url, params)
         response.raise_for_status()
-        return extract_stop_point_passages(response.json(), now=now)
+        passages = iter_stop_passages(loads(response.content), now=now, old=old, interner=self.interner)
+        return take(passages, predicate=predicate, limit=limit)
+
+    def get_many_stop_passages(self, stop_numbers: Iterable[str], *,
+                               authority: Optional[str] = None,
+                               route_id: Optional[str] = None,
+                               direction: Optional[str] = None,
+                               mode: Mode = Mode.DEPARTURES,
+                               timeframe: int = 120,
+                               max_workers: int = 10) -> Dict[str, Union[Tuple[Stop, List[Route], List[Passage]], Exception]]:
+        return self._get_many(self.get_stop_passages, stop_numbers, max_workers=max_workers,
+                              authority=authority, route_id=route_id, direction=direction, mode=mode,
+                              timeframe=timeframe)
+
+    def get_many_stop_point_passages(self, stop_point_codes: Iterable[str], *,
+                                     authority: Optional[str] = None,
+                                     route_id: Optional[str] = None,
+                                     direction: Optional[str] = None,
+                                     mode: Mode = Mode.DEPARTURES,
+                                     timeframe: int = 120,
+                                     max_workers: int = 10) -> Dict[str, Union[Tuple[Stop, List[Route], List[Passage]], Exception]]:
+        return self._get_many(self.get_stop_point_passages, stop_point_codes, max_workers=max_workers,
+                              authority=authority, route_id=route_id, direction=direction, mode=mode,
+                              timeframe=timeframe)
 
+    def _get_many(self, method: Callable[..., T], keys: Iterable[str], *,
+                  max_workers: int, **kwargs: Any) -> Dict[str, Union[T, Exception]]:
+        now = datetime.now(self.tz).replace(microsecond=0)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {key: executor.submit(method, key, now=now, **kwargs) for key in keys}
+        results: Dict[str, Union[T, Exception]] = {}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                results[key] = e
+        return results
+
+    @instrumented
     def get_trip_passages(self, trip_id: str, *, vehicle_id: Optional[str] = None,
                           mode: Mode = Mode.DEPARTURES) -> Tuple[Optional[Trip], List[Passage]]:
         url = f'{self.base_url}/internetservice/services/tripInfo/tripPassages'
@@ -182,17 +357,21 @@ class TTSS:
             'vehicleId': vehicle_id,
             'cacheBuster': timestamp_ms(),
         }
-        response = requests.get(url, params, **self.options)
+        response = self._get(url, params)
         response.raise_for_status()
-        return extract_trip_passages(response.json())
+        return extract_trip_passages(loads(response.content), interner=self.interner)
 
+    @instrumented
+    @cached()
     def get_routes(self) -> List[Route]:
         url = f'{self.base_url}/internetservice/services/routeInfo/route'
         params = {'language': self.language}
-        response = requests.get(url, params, **self.options)
+        response = self._get(url, params)
         response.raise_for_status()
-        return extract_routes(response.json())
+        return extract_routes(loads(response.content))
 
+    @instrumented
+    @cached()
     def get_route_stops(self, route_id: str) -> Tuple[Route, List[Stop]]:
         url = f'{self.base_url}/internetservice/services/routeInfo/routeStops'
         params = {
@@ -200,29 +379,70 @@ class TTSS:
             'language': self.language,
             'cacheBuster': timestamp_ms(),
         }
-        response = requests.get(url, params, **self.options)
+        response = self._get(url, params)
         response.raise_for_status()
-        return extract_route_stops(response.json())
+        return extract_route_stops(loads(response.content))
 
+    @instrumented
+    @cached()
     def get_route_paths(self, route_id: str, *, direction: Optional[str] = None) -> List[Path]:
         url = f'{self.base_url}/internetservice/geoserviceDispatcher/services/pathinfo/route'
         params = {
             'id': route_id,
             'direction': direction,
         }
-        response = requests.get(url, params, **self.options)
+        response = self._get(url, params)
         if response.status_code == 404:
             return []
         response.raise_for_status()
-        return extract_route_paths(response.json())
+        return decode_paths(response.content)
+
+    @instrumented
+    def iter_route_paths(self, route_id: str, *, direction: Optional[str] = None,
+                         predicate: Optional[Callable[[Path], bool]] = None,
+                         limit: Optional[int] = None) -> Iterator[Path]:
+        url = f'{self.base_url}/internetservice/geoserviceDispatcher/services/pathinfo/route'
+        params = {
+            'id': route_id,
+            'direction': direction,
+        }
+        response = self._get(url, params)
+        if response.status_code == 404:
+            return iter(())
+        response.raise_for_status()
+        return take(iter_paths(loads(response.content)), predicate=predicate, limit=limit)
 
+    @instrumented
     def get_vehicle_paths(self, vehicle_id: str) -> List[Path]:
         url = f'{self.base_url}/internetservice/geoserviceDispatcher/services/pathinfo/vehicle'
         params = {'id': vehicle_id}
-        response = requests.get(url, params, **self.options)
+        response = self._get(url, params)
         response.raise_for_status()
-        return extract_vehicle_paths(response.json())
+        return decode_paths(response.content)
 
+    @instrumented
+    @cached()
+    def get_route_path_geometries(self, route_id: str, *, direction: Optional[str] = None) -> List[PathGeometry]:
+        url = f'{self.base_url}/internetservice/geoserviceDispatcher/services/pathinfo/route'
+        params = {
+            'id': route_id,
+            'direction': direction,
+        }
+        response = self._get(url, params)
+        if response.status_code == 404:
+            return []
+        response.raise_for_status()
+        return extract_path_geometries(loads(response.content))
+
+    @instrumented
+    def get_vehicle_path_geometries(self, vehicle_id: str) -> List[PathGeometry]:
+        url = f'{self.base_url}/internetservice/geoserviceDispatcher/services/pathinfo/vehicle'
+        params = {'id': vehicle_id}
+        response = self._get(url, params)
+        response.raise_for_status()
+        return extract_path_geometries(loads(response.content))
+
+    @instrumented
     def get_vehicles(self, *,
                      last_update: Optional[int] = None,
                      position_type: PositionType = PositionType.CORRECTED,
@@ -233,6 +453,54 @@ class TTSS:
             'positionType': position_type.value,
             'colorType': color_type.value,
         }
-        response = requests.get(url, params, **self.options)
+        response = self._get(url, params)
+        response.raise_for_status()
+        return decode_vehicles(response.content, interner=self.interner)
+
+    @instrumented
+    def iter_vehicles(self, *,
+                      last_update: Optional[int] = None,
+                      position_type: PositionType = PositionType.CORRECTED,
+                      color_type: ColorType = ColorType.ROUTE_BASED,
+                      predicate: Optional[Callable[[Vehicle], bool]] = None,
+                      limit: Optional[int] = None) -> Iterator[Vehicle]:
+        url = f'{self.base_url}/internetservice/geoserviceDispatcher/services/vehicleinfo/vehicles'
+        params = {
+            'lastUpdate': last_update,
+            'positionType': position_type.value,
+            'colorType': color_type.value,
+        }
+        response = self._get(url, params)
+        response.raise_for_status()
+        vehicles = iter_vehicles(loads(response.content), interner=self.interner)
+        return take(vehicles, predicate=predicate, limit=limit)
+
+    @instrumented
+    def get_vehicles_update(self, *,
+                            last_update: Optional[int] = None,
+                            position_type: PositionType = PositionType.CORRECTED,
+                            color_type: ColorType = ColorType.ROUTE_BASED) -> Tuple[Optional[int], List[Vehicle]]:
+        url = f'{self.base_url}/internetservice/geoserviceDispatcher/services/vehicleinfo/vehicles'
+        params = {
+            'lastUpdate': last_update,
+            'positionType': position_type.value,
+            'colorType': color_type.value,
+        }
+        response = self._get(url, params)
+        response.raise_for_status()
+        return decode_vehicles_update(response.content, interner=self.interner)
+
+    @instrumented
+    def get_vehicle_frame(self, *,
+                          last_update: Optional[int] = None,
+                          position_type: PositionType = PositionType.CORRECTED,
+                          color_type: ColorType = ColorType.ROUTE_BASED) -> VehicleFrame:
+        url = f'{self.base_url}/internetservice/geoserviceDispatcher/services/vehicleinfo/vehicles'
+        params = {
+            'lastUpdate': last_update,
+            'positionType': position_type.value,
+            'colorType': color_type.value,
+        }
+        response = self._get(url, params)
         response.raise_for_status()
-        return extract_vehicles(response.json())
+        return extract_vehicle_frame(loads(response.content))
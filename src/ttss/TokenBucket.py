@@ -0,0 +1,31 @@
+import time
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Callable, Optional
+
+
+@dataclass
+class TokenBucket:
+    rate: float
+    capacity: Optional[float] = None
+    clock: Callable[[], float] = time.monotonic
+    _tokens: float = field(default=0.0, init=False, repr=False)
+    _updated_at: Optional[float] = field(default=None, init=False, repr=False)
+    _lock: Lock = field(default_factory=Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.capacity is None:
+            self.capacity = max(1.0, self.rate)
+        self._tokens = self.capacity
+
+    def consume(self, tokens: float = 1.0) -> float:
+        # takes the tokens and returns 0 or returns how long to wait until they are available
+        with self._lock:
+            now = self.clock()
+            if self._updated_at is not None:
+                self._tokens = min(self.capacity or 0.0, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
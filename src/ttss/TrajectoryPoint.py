@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from ttss.utils import SLOTS
+
+
+@dataclass(**SLOTS)
+class TrajectoryPoint:
+    vehicle_id: str
+    # milliseconds since the epoch, like Vehicle updates
+    timestamp: int
+    latitude: float
+    longitude: float
+    heading: Optional[int] = None
+    trip_id: Optional[str] = None
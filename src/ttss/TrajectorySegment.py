@@ -0,0 +1,133 @@
+import json
+import mmap
+import os
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from ttss.PathGeometry import UNITS_PER_DEGREE
+from ttss.TrajectoryPoint import TrajectoryPoint
+from ttss.VehicleFrame import NO_HEADING
+
+NO_TRIP = -1
+
+# column name, array typecode; wider types first so every column in the data file stays aligned
+COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ('timestamps', 'q'),
+    ('latitudes', 'i'),
+    ('longitudes', 'i'),
+    ('trips', 'i'),
+    ('headings', 'h'),
+)
+
+
+class TrajectorySegment:
+    # rows are grouped by vehicle and sorted by timestamp within each vehicle, every column is a contiguous block
+    def __init__(self, start: int, end: int, ranges: Dict[str, Tuple[int, int]], trip_ids: List[str],
+                 columns: Mapping[str, Sequence[int]]) -> None:
+        self.start = start
+        self.end = end
+        self.ranges = ranges
+        self.trip_ids = trip_ids
+        self.timestamps = columns['timestamps']
+        self.latitudes = columns['latitudes']
+        self.longitudes = columns['longitudes']
+        self.trips = columns['trips']
+        self.headings = columns['headings']
+        self._mmap: Optional[mmap.mmap] = None
+        self._views: List[memoryview] = []
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def from_columns(cls, start: int, end: int, vehicles: Dict[str, Dict[str, 'array[int]']],
+                     trip_ids: List[str]) -> 'TrajectorySegment':
+        ranges = {}
+        columns = {name: array(typecode) for name, typecode in COLUMNS}
+        for vehicle_id, vehicle_columns in vehicles.items():
+            begin = len(columns['timestamps'])
+            for name, _ in COLUMNS:
+                columns[name].extend(vehicle_columns[name])
+            ranges[vehicle_id] = (begin, len(columns['timestamps']))
+        return cls(start, end, ranges, trip_ids, columns)
+
+    def save(self, path: Union[str, 'os.PathLike[str]']) -> None:
+        path = os.fspath(path)
+        with open(f'{path}.tmp', 'wb') as f:
+            for name, typecode in COLUMNS:
+                column = getattr(self, name)
+                f.write(column if isinstance(column, array) else array(typecode, column))
+        os.replace(f'{path}.tmp', f'{path}.bin')
+        # the metadata is written last, a segment without it is incomplete and ignored
+        metadata = {
+            'start': self.start,
+            'end': self.end,
+            'rows': len(self),
+            'byteorder': sys.byteorder,
+            'vehicles': self.ranges,
+            'trips': self.trip_ids,
+        }
+        with open(f'{path}.json.tmp', 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, separators=(',', ':'))
+        os.replace(f'{path}.json.tmp', f'{path}.json')
+
+    @classmethod
+    def load(cls, path: Union[str, 'os.PathLike[str]']) -> 'TrajectorySegment':
+        path = os.fspath(path)
+        with open(f'{path}.json', 'r', encoding='utf-8') as f:
+            metadata: Dict[str, Any] = json.load(f)
+        if metadata['byteorder'] != sys.byteorder:
+            raise ValueError(f'segment {path} was written with {metadata["byteorder"]} byte order')
+        rows = metadata['rows']
+        columns: Dict[str, Sequence[int]] = {name: array(typecode) for name, typecode in COLUMNS}
+        views = []
+        data = None
+        if rows:
+            with open(f'{path}.bin', 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(data)
+            offset = 0
+            for name, typecode in COLUMNS:
+                size = array(typecode).itemsize * rows
+                column = view[offset:offset + size].cast(typecode)  # type: ignore[call-overload]
+                views.append(column)
+                columns[name] = column
+                offset += size
+            views.append(view)
+        segment = cls(metadata['start'], metadata['end'],
+                      {vehicle_id: (begin, end) for vehicle_id, (begin, end) in metadata['vehicles'].items()},
+                      metadata['trips'], columns)
+        segment._mmap = data
+        segment._views = views
+        return segment
+
+    def close(self) -> None:
+        for view in self._views:
+            view.release()
+        self._views = []
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def rows(self, vehicle_id: str, start: int, end: int) -> range:
+        # rows of the vehicle with start <= timestamp < end
+        begin, stop = self.ranges.get(vehicle_id, (0, 0))
+        return range(bisect_left(self.timestamps, start, begin, stop), bisect_left(self.timestamps, end, begin, stop))
+
+    def last_row(self, vehicle_id: str, timestamp: int) -> Optional[int]:
+        # last row of the vehicle with timestamp <= the given one
+        begin, stop = self.ranges.get(vehicle_id, (0, 0))
+        row = bisect_right(self.timestamps, timestamp, begin, stop) - 1
+        return row if row >= begin else None
+
+    def point(self, vehicle_id: str, row: int) -> TrajectoryPoint:
+        heading = self.headings[row]
+        trip = self.trips[row]
+        return TrajectoryPoint(vehicle_id=vehicle_id,
+                               timestamp=self.timestamps[row],
+                               latitude=self.latitudes[row] / UNITS_PER_DEGREE,
+                               longitude=self.longitudes[row] / UNITS_PER_DEGREE,
+                               heading=None if heading == NO_HEADING else heading,
+                               trip_id=None if trip == NO_TRIP else self.trip_ids[trip])
@@ -0,0 +1,198 @@
+import glob
+import os
+import time
+from array import array
+from contextlib import contextmanager
+from threading import Condition, Lock
+from types import TracebackType
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Type, Union
+
+from ttss.PathGeometry import UNITS_PER_DEGREE
+from ttss.TrajectoryPoint import TrajectoryPoint
+from ttss.TrajectorySegment import COLUMNS, NO_TRIP, TrajectorySegment
+from ttss.Vehicle import Vehicle
+from ttss.VehicleFrame import NO_HEADING
+
+SEGMENT_PREFIX = 'segment-'
+
+
+class TrajectoryStore:
+    # append-only: positions are buffered per vehicle and sealed into memory-mapped columnar segments, the buffer is
+    # also sealed once it holds max_buffer_rows positions or spans max_buffer_age, so a crash loses little
+    def __init__(self, path: Union[str, 'os.PathLike[str]'], *, segment_duration: int = 60 * 60 * 1000,
+                 max_buffer_rows: int = 100_000, max_buffer_age: int = 5 * 60 * 1000) -> None:
+        self.path = os.fspath(path)
+        self.segment_duration = segment_duration
+        self.max_buffer_rows = max_buffer_rows
+        self.max_buffer_age = max_buffer_age
+        self.segments: List[TrajectorySegment] = []
+        self._buffer: Dict[str, Dict[str, 'array[int]']] = {}
+        self._buffer_start: Optional[int] = None
+        self._buffer_segment: Optional[TrajectorySegment] = None
+        self._trip_ids: List[str] = []
+        self._trip_indices: Dict[str, int] = {}
+        self._buffer_rows = 0
+        self._last_timestamp: Optional[int] = None
+        self._lock = Lock()
+        # queries in progress, the segments are not unmapped until they finish
+        self._readers = 0
+        self._readers_done = Condition(self._lock)
+        self._closed = False
+
+        os.makedirs(self.path, exist_ok=True)
+        for metadata_path in sorted(glob.glob(os.path.join(glob.escape(self.path), f'{SEGMENT_PREFIX}*.json'))):
+            self.segments.append(TrajectorySegment.load(metadata_path[:-len('.json')]))
+        self.segments.sort(key=lambda segment: segment.start)
+        if self.segments:
+            self._last_timestamp = max(segment.end for segment in self.segments)
+
+    def append(self, vehicles: Iterable[Vehicle], *, timestamp: Optional[int] = None) -> int:
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+        with self._lock:
+            if self._last_timestamp is not None and timestamp < self._last_timestamp:
+                raise ValueError(f'timestamp {timestamp} is older than the last one, {self._last_timestamp}')
+            buffer_start = self._buffer_start
+            if buffer_start is not None:
+                new_window = timestamp // self.segment_duration != buffer_start // self.segment_duration
+                if new_window or timestamp - buffer_start >= self.max_buffer_age:
+                    self._seal()
+            if self._buffer_start is None:
+                self._buffer_start = timestamp
+            self._last_timestamp = timestamp
+            self._buffer_segment = None
+
+            count = 0
+            for vehicle in vehicles:
+                if vehicle.id is None or not vehicle.active or vehicle.latitude is None or vehicle.longitude is None:
+                    continue
+                columns = self._buffer.get(vehicle.id, None)
+                if columns is None:
+                    columns = self._buffer[vehicle.id] = {name: array(typecode) for name, typecode in COLUMNS}
+                trip_id = vehicle.trip.id if vehicle.trip is not None else None
+                if trip_id is None:
+                    trip = NO_TRIP
+                else:
+                    trip = self._trip_indices.get(trip_id, -1)
+                    if trip == -1:
+                        trip = self._trip_indices[trip_id] = len(self._trip_ids)
+                        self._trip_ids.append(trip_id)
+                columns['timestamps'].append(timestamp)
+                columns['latitudes'].append(round(vehicle.latitude * UNITS_PER_DEGREE))
+                columns['longitudes'].append(round(vehicle.longitude * UNITS_PER_DEGREE))
+                columns['trips'].append(trip)
+                columns['headings'].append(vehicle.heading if vehicle.heading is not None else NO_HEADING)
+                count += 1
+            self._buffer_rows += count
+            if self._buffer_rows >= self.max_buffer_rows:
+                self._seal()
+            return count
+
+    def flush(self) -> None:
+        with self._lock:
+            self._seal()
+
+    def _seal(self) -> None:
+        if self._buffer_start is None or self._last_timestamp is None:
+            return
+        segment = TrajectorySegment.from_columns(self._buffer_start, self._last_timestamp, self._buffer,
+                                                 self._trip_ids)
+        # the sequence number keeps names unique when a reopened store continues within the same window
+        path = os.path.join(self.path, f'{SEGMENT_PREFIX}{self._buffer_start:013d}-{len(self.segments):06d}')
+        segment.save(path)
+        self.segments.append(TrajectorySegment.load(path))
+        self._buffer = {}
+        self._buffer_rows = 0
+        self._buffer_start = None
+        self._buffer_segment = None
+        self._trip_ids = []
+        self._trip_indices = {}
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._closed = True
+            while self._readers:
+                self._readers_done.wait()
+            for segment in self.segments:
+                segment.close()
+            self.segments = []
+
+    def __enter__(self) -> 'TrajectoryStore':
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]], exc_value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.close()
+
+    @contextmanager
+    def _overlapping(self, start: int, end: int) -> Iterator[List[TrajectorySegment]]:
+        # segments with any position in [start, end], the unsealed buffer included, kept mapped until the query ends
+        with self._lock:
+            if self._closed:
+                raise ValueError('the trajectory store is closed')
+            segments = [segment for segment in self.segments if segment.start <= end and segment.end >= start]
+            buffer_start, buffer_end = self._buffer_start, self._last_timestamp
+            if buffer_start is not None and buffer_end is not None and buffer_start <= end and buffer_end >= start:
+                if self._buffer_segment is None:
+                    self._buffer_segment = TrajectorySegment.from_columns(buffer_start, buffer_end, self._buffer,
+                                                                          list(self._trip_ids))
+                segments.append(self._buffer_segment)
+            self._readers += 1
+        try:
+            yield segments
+        finally:
+            with self._lock:
+                self._readers -= 1
+                if not self._readers:
+                    self._readers_done.notify_all()
+
+    def vehicle_ids(self) -> Set[str]:
+        with self._lock:
+            vehicle_ids = set(self._buffer)
+            for segment in self.segments:
+                vehicle_ids.update(segment.ranges)
+            return vehicle_ids
+
+    def trajectory(self, vehicle_id: str, start: int, end: int) -> List[TrajectoryPoint]:
+        # positions with start <= timestamp < end
+        with self._overlapping(start, end - 1) as segments:
+            return [
+                segment.point(vehicle_id, row)
+                for segment in segments
+                for row in segment.rows(vehicle_id, start, end)
+            ]
+
+    def position(self, vehicle_id: str, timestamp: int, *, max_age: int = 60_000) -> Optional[TrajectoryPoint]:
+        latest: Optional[Tuple[TrajectorySegment, int]] = None
+        with self._overlapping(timestamp - max_age, timestamp) as segments:
+            for segment in segments:
+                row = segment.last_row(vehicle_id, timestamp)
+                if row is None or segment.timestamps[row] < timestamp - max_age:
+                    continue
+                if latest is None or segment.timestamps[row] >= latest[0].timestamps[latest[1]]:
+                    latest = segment, row
+            return latest[0].point(vehicle_id, latest[1]) if latest is not None else None
+
+    def vehicles_in_box(self, timestamp: int, min_latitude: float, min_longitude: float,
+                        max_latitude: float, max_longitude: float, *, max_age: int = 60_000) -> List[TrajectoryPoint]:
+        # last known position of every vehicle at the timestamp, no older than max_age
+        latest: Dict[str, Tuple[int, TrajectorySegment, int]] = {}
+        min_lat, max_lat = round(min_latitude * UNITS_PER_DEGREE), round(max_latitude * UNITS_PER_DEGREE)
+        min_lon, max_lon = round(min_longitude * UNITS_PER_DEGREE), round(max_longitude * UNITS_PER_DEGREE)
+        with self._overlapping(timestamp - max_age, timestamp) as segments:
+            for segment in segments:
+                timestamps = segment.timestamps
+                for vehicle_id in segment.ranges:
+                    row = segment.last_row(vehicle_id, timestamp)
+                    if row is None or timestamps[row] < timestamp - max_age:
+                        continue
+                    previous = latest.get(vehicle_id, None)
+                    if previous is None or timestamps[row] >= previous[0]:
+                        latest[vehicle_id] = timestamps[row], segment, row
+
+            return [
+                segment.point(vehicle_id, row)
+                for vehicle_id, (_, segment, row) in latest.items()
+                if min_lat <= segment.latitudes[row] <= max_lat and min_lon <= segment.longitudes[row] <= max_lon
+            ]
@@ -0,0 +1,50 @@
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import Any, Dict, Optional, Tuple, Type
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+@dataclass
+class Transport:
+    pool_connections: int = 10
+    pool_maxsize: int = 10
+    pool_block: bool = False
+    max_retries: int = 3
+    backoff_factor: float = 0.3
+    status_forcelist: Tuple[int, ...] = (500, 502, 503, 504)
+    # seconds, None waits forever like requests without a transport did
+    timeout: Optional[float] = 10.0
+    headers: Dict[str, str] = field(default_factory=dict)
+    session: requests.Session = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        retry = Retry(total=self.max_retries,
+                      backoff_factor=self.backoff_factor,
+                      status_forcelist=self.status_forcelist,
+                      allowed_methods=frozenset(['GET']),
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=self.pool_connections,
+                              pool_maxsize=self.pool_maxsize,
+                              pool_block=self.pool_block,
+                              max_retries=retry)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, url: str, params: Dict[str, Any], **options: Any) -> requests.Response:
+        options.setdefault('timeout', self.timeout)
+        return self.session.get(url, params=params, **options)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> 'Transport':
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]], exc_value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.close()
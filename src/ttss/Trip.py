@@ -2,9 +2,10 @@ from dataclasses import dataclass
 from typing import Optional
 
 from ttss.Route import Route
+from ttss.utils import SLOTS
 
 
-@dataclass
+@dataclass(**SLOTS)
 class Trip:
     id: Optional[str] = None
     route: Optional[Route] = None
@@ -0,0 +1,15 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from ttss.Passage import Passage
+from ttss.Path import Path
+from ttss.Trip import Trip
+
+
+@dataclass
+class TripDetail:
+    trip_id: str
+    vehicle_id: Optional[str] = None
+    trip: Optional[Trip] = None
+    passages: List[Passage] = field(default_factory=list)
+    paths: List[Path] = field(default_factory=list)
@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Optional, Set
+
+from ttss.Cache import Cache
+from ttss.Mode import Mode
+from ttss.TTSS import TTSS
+from ttss.TripDetail import TripDetail
+from ttss.VehicleChanges import VehicleChanges
+
+ENDPOINT = 'trip_detail'
+
+
+@dataclass
+class TripDetailService:
+    ttss: TTSS
+    ttl: float = 10
+    max_size: int = 1024
+    max_workers: int = 10
+    cache: Cache = field(init=False)
+    _executor: Optional[ThreadPoolExecutor] = field(default=None, init=False, repr=False)
+    _lock: Lock = field(default_factory=Lock, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.cache = Cache(ttls={ENDPOINT: self.ttl}, max_size=self.max_size)
+
+    def get(self, trip_id: str, *, vehicle_id: Optional[str] = None) -> TripDetail:
+        # concurrent requests for the same trip share one fetch, the vehicle is the one serving the trip
+        # and is part of the key, since only a detail fetched with it has paths
+        return self.cache.get_or_load(ENDPOINT, (ENDPOINT, trip_id, vehicle_id),
+                                      lambda: self.fetch(trip_id, vehicle_id=vehicle_id))
+
+    def fetch(self, trip_id: str, *, vehicle_id: Optional[str] = None) -> TripDetail:
+        paths = None
+        if vehicle_id is not None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='ttss-trip')
+                executor = self._executor
+            paths = executor.submit(self.ttss.get_vehicle_paths, vehicle_id)
+        trip, passages = self.ttss.get_trip_passages(trip_id, vehicle_id=vehicle_id, mode=Mode.DEPARTURES)
+        return TripDetail(trip_id=trip_id,
+                          vehicle_id=vehicle_id,
+                          trip=trip,
+                          passages=passages,
+                          paths=paths.result() if paths is not None else [])
+
+    def invalidate(self, trip_id: str) -> None:
+        self._invalidate({trip_id})
+
+    def apply(self, changes: VehicleChanges) -> int:
+        # a vehicle that moved or left has advanced its trip, so the cached passages are out of date,
+        # and one that switched trips no longer serves its previous trip
+        trip_ids = {
+            vehicle.trip.id
+            for vehicle in changes.updated + changes.previous + changes.removed
+            if vehicle.trip is not None and vehicle.trip.id is not None
+        }
+        self._invalidate(trip_ids)
+        return len(trip_ids)
+
+    def _invalidate(self, trip_ids: Set[str]) -> None:
+        # every vehicle's detail of the trips, fetches still in flight are not stored
+        if trip_ids:
+            self.cache.invalidate_where(lambda key: isinstance(key, tuple) and key[1] in trip_ids)
+
+    def close(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def __enter__(self) -> 'TripDetailService':
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
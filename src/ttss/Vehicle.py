@@ -2,9 +2,10 @@ from dataclasses import dataclass
 from typing import Optional
 
 from ttss.Trip import Trip
+from ttss.utils import SLOTS
 
 
-@dataclass
+@dataclass(**SLOTS)
 class Vehicle:
     id: Optional[str] = None
     active: Optional[bool] = None
@@ -0,0 +1,16 @@
+from dataclasses import dataclass, field
+from typing import List
+
+from ttss.Vehicle import Vehicle
+
+
+@dataclass
+class VehicleChanges:
+    added: List[Vehicle] = field(default_factory=list)
+    updated: List[Vehicle] = field(default_factory=list)
+    removed: List[Vehicle] = field(default_factory=list)
+    # the state before the update of each vehicle in updated, in the same order
+    previous: List[Vehicle] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
@@ -0,0 +1,82 @@
+from array import array
+from dataclasses import dataclass, field
+from math import isnan, nan
+from typing import Dict, List, Optional
+
+from ttss.Route import Route
+from ttss.Trip import Trip
+from ttss.Vehicle import Vehicle
+
+NO_HEADING = -1
+
+
+@dataclass
+class VehicleFrame:
+    ids: List[str] = field(default_factory=list)
+    active: 'array[int]' = field(default_factory=lambda: array('b'))
+    latitude: 'array[float]' = field(default_factory=lambda: array('d'))
+    longitude: 'array[float]' = field(default_factory=lambda: array('d'))
+    heading: 'array[int]' = field(default_factory=lambda: array('h'))
+    category: 'array[int]' = field(default_factory=lambda: array('I'))
+    categories: List[Optional[str]] = field(default_factory=list)
+    color: 'array[int]' = field(default_factory=lambda: array('I'))
+    colors: List[Optional[str]] = field(default_factory=list)
+    trip_ids: List[Optional[str]] = field(default_factory=list)
+    names: List[Optional[str]] = field(default_factory=list)
+    last_update: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def category_of(self, index: int) -> Optional[str]:
+        return self.categories[self.category[index]]
+
+    def color_of(self, index: int) -> Optional[str]:
+        return self.colors[self.color[index]]
+
+    @classmethod
+    def from_vehicles(cls, vehicles: List[Vehicle], *, last_update: Optional[int] = None) -> 'VehicleFrame':
+        categories: Dict[Optional[str], int] = {}
+        colors: Dict[Optional[str], int] = {}
+        frame = cls(last_update=last_update)
+        for vehicle in vehicles:
+            frame.ids.append(vehicle.id or '')
+            frame.active.append(1 if vehicle.active else 0)
+            frame.latitude.append(vehicle.latitude if vehicle.latitude is not None else nan)
+            frame.longitude.append(vehicle.longitude if vehicle.longitude is not None else nan)
+            frame.heading.append(vehicle.heading if vehicle.heading is not None else NO_HEADING)
+            frame.category.append(categories.setdefault(vehicle.category, len(categories)))
+            frame.color.append(colors.setdefault(vehicle.color, len(colors)))
+            trip = vehicle.trip
+            if trip is None:
+                frame.trip_ids.append(None)
+                frame.names.append(None)
+            else:
+                route_name = trip.route.name if trip.route is not None else None
+                frame.trip_ids.append(trip.id)
+                frame.names.append(f'{route_name} {trip.direction}' if trip.direction is not None else route_name)
+        frame.categories = list(categories)
+        frame.colors = list(colors)
+        return frame
+
+    def to_vehicles(self) -> List[Vehicle]:
+        vehicles = []
+        for i in range(len(self.ids)):
+            trip = None
+            if self.trip_ids[i] is not None:
+                name = self.names[i]
+                route_name: Optional[str] = name
+                direction: Optional[str] = None
+                if name is not None and ' ' in name:
+                    route_name, direction = name.split(' ', 1)
+                trip = Trip(id=self.trip_ids[i], route=Route(name=route_name), direction=direction)
+            latitude, longitude, heading = self.latitude[i], self.longitude[i], self.heading[i]
+            vehicles.append(Vehicle(id=self.ids[i],
+                                    active=bool(self.active[i]),
+                                    category=self.category_of(i),
+                                    latitude=None if isnan(latitude) else latitude,
+                                    longitude=None if isnan(longitude) else longitude,
+                                    heading=None if heading == NO_HEADING else heading,
+                                    color=self.color_of(i),
+                                    trip=trip))
+        return vehicles
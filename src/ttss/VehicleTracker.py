@@ -0,0 +1,49 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from ttss.ColorType import ColorType
+from ttss.PositionType import PositionType
+from ttss.TTSS import TTSS
+from ttss.Vehicle import Vehicle
+from ttss.VehicleChanges import VehicleChanges
+
+
+@dataclass
+class VehicleTracker:
+    ttss: TTSS
+    position_type: PositionType = PositionType.CORRECTED
+    color_type: ColorType = ColorType.ROUTE_BASED
+    vehicles: Dict[str, Vehicle] = field(default_factory=dict)
+    last_update: Optional[int] = None
+
+    def update(self) -> VehicleChanges:
+        last_update, vehicles = self.ttss.get_vehicles_update(last_update=self.last_update,
+                                                              position_type=self.position_type,
+                                                              color_type=self.color_type)
+        return self.apply(last_update, vehicles)
+
+    def apply(self, last_update: Optional[int], vehicles: List[Vehicle]) -> VehicleChanges:
+        changes = VehicleChanges()
+        for vehicle in vehicles:
+            if vehicle.id is None:
+                continue
+            if not vehicle.active:
+                removed = self.vehicles.pop(vehicle.id, None)
+                if removed is not None:
+                    changes.removed.append(removed)
+            elif vehicle.id in self.vehicles:
+                previous = self.vehicles[vehicle.id]
+                if previous != vehicle:
+                    self.vehicles[vehicle.id] = vehicle
+                    changes.updated.append(vehicle)
+                    changes.previous.append(previous)
+            else:
+                self.vehicles[vehicle.id] = vehicle
+                changes.added.append(vehicle)
+        if last_update is not None:
+            self.last_update = last_update
+        return changes
+
+    def reset(self) -> None:
+        self.vehicles.clear()
+        self.last_update = None
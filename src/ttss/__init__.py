@@ -1,12 +1,50 @@
+from ttss.ArchiveRecord import ArchiveRecord  # noqa: F401
+from ttss.Cache import Cache  # noqa: F401
 from ttss.ColorType import ColorType  # noqa: F401
+from ttss.Connection import Connection  # noqa: F401
+from ttss.DelayAnalytics import DelayAnalytics  # noqa: F401
+from ttss.DelayStats import DelayStats  # noqa: F401
+from ttss.DepartureBoard import DepartureBoard  # noqa: F401
+from ttss.Histogram import Histogram  # noqa: F401
+from ttss.Interner import Interner  # noqa: F401
+from ttss.Journey import Journey  # noqa: F401
+from ttss.JourneyLeg import JourneyLeg  # noqa: F401
+from ttss.JourneyPlanner import JourneyPlanner  # noqa: F401
+from ttss.Metrics import Metrics  # noqa: F401
 from ttss.Mode import Mode  # noqa: F401
 from ttss.Passage import Passage  # noqa: F401
+from ttss.NetworkGraph import NetworkGraph  # noqa: F401
+from ttss.NetworkSnapshot import NetworkSnapshot  # noqa: F401
+from ttss.NetworkStore import NetworkStore  # noqa: F401
 from ttss.Path import Path  # noqa: F401
+from ttss.PathGeometry import PathGeometry  # noqa: F401
+from ttss.PolledResource import PolledResource  # noqa: F401
 from ttss.PositionType import PositionType  # noqa: F401
+from ttss.RecordingTransport import RecordingTransport  # noqa: F401
+from ttss.ReplayTransport import ReplayTransport  # noqa: F401
+from ttss.RequestEvent import RequestEvent  # noqa: F401
+from ttss.ResponseArchive import ResponseArchive  # noqa: F401
 from ttss.Route import Route  # noqa: F401
+from ttss.Scheduler import Scheduler  # noqa: F401
+from ttss.SearchIndex import SearchIndex  # noqa: F401
+from ttss.SpatialIndex import SpatialIndex  # noqa: F401
 from ttss.Status import Status  # noqa: F401
 from ttss.Stop import Stop  # noqa: F401
 from ttss.StopPoint import StopPoint  # noqa: F401
+from ttss.TokenBucket import TokenBucket  # noqa: F401
+from ttss.TrajectoryPoint import TrajectoryPoint  # noqa: F401
+from ttss.TrajectoryStore import TrajectoryStore  # noqa: F401
+from ttss.Transport import Transport  # noqa: F401
 from ttss.Trip import Trip  # noqa: F401
+from ttss.TripDetail import TripDetail  # noqa: F401
+from ttss.TripDetailService import TripDetailService  # noqa: F401
 from ttss.TTSS import TTSS  # noqa: F401
 from ttss.Vehicle import Vehicle  # noqa: F401
+from ttss.VehicleChanges import VehicleChanges  # noqa: F401
+from ttss.VehicleFrame import VehicleFrame  # noqa: F401
+from ttss.VehicleTracker import VehicleTracker  # noqa: F401
+
+try:
+    from ttss.AsyncTTSS import AsyncTTSS  # noqa: F401
+except ImportError:  # httpx is not installed
+    pass
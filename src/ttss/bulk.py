@@ -0,0 +1,315 @@
+import argparse
+import gzip
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from math import isnan
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import pytz
+
+from ttss.ArchiveRecord import ArchiveRecord
+from ttss.ResponseArchive import ResponseArchive
+from ttss.VehicleFrame import NO_HEADING
+from ttss.decoders import loads
+from ttss.extractors import extract_path_geometries, extract_stop_passages, extract_trip_passages, \
+    extract_vehicle_frame
+
+logger = logging.getLogger(__name__)
+
+Columns = Dict[str, List[Any]]
+
+# endpoint, timestamp, params, and either (offset, length) in the archive data file or a file path
+Item = Tuple[str, float, Dict[str, Any], Union[Tuple[int, int], str]]
+
+# url path suffix or file name prefix, endpoint
+ENDPOINTS: Tuple[Tuple[str, str], ...] = (
+    ('services/passageInfo/stopPassages/stopPoint', 'stop_point_passages'),
+    ('services/passageInfo/stopPassages/stop', 'stop_passages'),
+    ('services/tripInfo/tripPassages', 'trip_passages'),
+    ('geoserviceDispatcher/services/vehicleinfo/vehicles', 'vehicles'),
+    ('geoserviceDispatcher/services/pathinfo/route', 'route_paths'),
+    ('geoserviceDispatcher/services/pathinfo/vehicle', 'vehicle_paths'),
+)
+
+PART_PREFIX = 'part-'
+PART_SUFFIX = '.json.gz'
+
+
+def endpoint_of_url(url: str) -> Optional[str]:
+    path = url.split('?', 1)[0]
+    for suffix, endpoint in ENDPOINTS:
+        if path.endswith(suffix):
+            return endpoint
+    return None
+
+
+def endpoint_of_file(name: str) -> Optional[str]:
+    # files named after the url path like the test resources, e.g. passageInfo_stopPassages_stop.json
+    for suffix, endpoint in ENDPOINTS:
+        prefix = suffix.replace('services/', '', 1).replace('/', '_')
+        rest = name[len(prefix):]
+        if name.startswith(prefix) and not rest[:1].isalpha():
+            return endpoint
+    return None
+
+
+def _stop_passages(data: Any, timestamp: float, params: Dict[str, Any], tz: Any) -> Columns:
+    now = datetime.fromtimestamp(timestamp, tz).replace(microsecond=0)
+    stop, _, passages = extract_stop_passages(data, now=now)
+    columns: Columns = {name: [] for name in (
+        'timestamp', 'stop', 'passage_id', 'trip_id', 'route_id', 'route', 'direction', 'vehicle_id',
+        'planned_time', 'actual_time', 'status', 'old', 'dt')}
+    for passage in passages:
+        trip, route, vehicle = passage.trip, passage.route, passage.vehicle
+        columns['timestamp'].append(timestamp)
+        columns['stop'].append(stop.name)
+        columns['passage_id'].append(passage.id)
+        columns['trip_id'].append(trip.id if trip is not None else None)
+        columns['route_id'].append(route.id if route is not None else None)
+        columns['route'].append(route.name if route is not None else None)
+        columns['direction'].append(trip.direction if trip is not None else None)
+        columns['vehicle_id'].append(vehicle.id if vehicle is not None else None)
+        columns['planned_time'].append(_format_time(passage.planned_time))
+        columns['actual_time'].append(_format_time(passage.actual_time))
+        columns['status'].append(passage.status.value if passage.status is not None else None)
+        columns['old'].append(passage.old)
+        columns['dt'].append(passage.dt.isoformat() if passage.dt is not None else None)
+    return columns
+
+
+def _trip_passages(data: Any, timestamp: float, params: Dict[str, Any], tz: Any) -> Columns:
+    trip, passages = extract_trip_passages(data)
+    route = trip.route.name if trip is not None and trip.route is not None else None
+    direction = trip.direction if trip is not None else None
+    columns: Columns = {name: [] for name in (
+        'timestamp', 'trip_id', 'route', 'direction', 'seq_num', 'stop_id', 'stop', 'stop_number',
+        'planned_time', 'actual_time', 'status', 'old')}
+    for passage in passages:
+        stop = passage.stop
+        columns['timestamp'].append(timestamp)
+        columns['trip_id'].append(params.get('tripId', None))
+        columns['route'].append(route)
+        columns['direction'].append(direction)
+        columns['seq_num'].append(passage.seq_num)
+        columns['stop_id'].append(stop.id if stop is not None else None)
+        columns['stop'].append(stop.name if stop is not None else None)
+        columns['stop_number'].append(stop.number if stop is not None else None)
+        columns['planned_time'].append(_format_time(passage.planned_time))
+        columns['actual_time'].append(_format_time(passage.actual_time))
+        columns['status'].append(passage.status.value if passage.status is not None else None)
+        columns['old'].append(passage.old)
+    return columns
+
+
+def _vehicles(data: Any, timestamp: float, params: Dict[str, Any], tz: Any) -> Columns:
+    frame = extract_vehicle_frame(data)
+    n = len(frame)
+    return {
+        'timestamp': [timestamp] * n,
+        'last_update': [frame.last_update] * n,
+        'id': frame.ids,
+        'active': [bool(value) for value in frame.active],
+        'latitude': [None if isnan(value) else value for value in frame.latitude],
+        'longitude': [None if isnan(value) else value for value in frame.longitude],
+        'heading': [None if value == NO_HEADING else value for value in frame.heading],
+        'category': [frame.categories[value] for value in frame.category],
+        'color': [frame.colors[value] for value in frame.color],
+        'trip_id': frame.trip_ids,
+        'name': frame.names,
+    }
+
+
+def _paths(data: Any, timestamp: float, params: Dict[str, Any], tz: Any) -> Columns:
+    # one row per waypoint
+    columns: Columns = {name: [] for name in ('timestamp', 'id', 'path', 'color', 'latitude', 'longitude')}
+    for i, geometry in enumerate(extract_path_geometries(data)):
+        n = len(geometry)
+        columns['timestamp'].extend([timestamp] * n)
+        columns['id'].extend([params.get('id', None)] * n)
+        columns['path'].extend([i] * n)
+        columns['color'].extend([geometry.color] * n)
+        columns['latitude'].extend(geometry.latitudes)
+        columns['longitude'].extend(geometry.longitudes)
+    return columns
+
+
+EXTRACTORS: Dict[str, Callable[[Any, float, Dict[str, Any], Any], Columns]] = {
+    'stop_passages': _stop_passages,
+    'stop_point_passages': _stop_passages,
+    'trip_passages': _trip_passages,
+    'vehicles': _vehicles,
+    'route_paths': _paths,
+    'vehicle_paths': _paths,
+}
+
+
+def _format_time(value: Any) -> Optional[str]:
+    return value.strftime('%H:%M') if value is not None else None
+
+
+_archives: Dict[str, ResponseArchive] = {}
+
+
+def _read(archive_path: Optional[str], location: Union[Tuple[int, int], str]) -> bytes:
+    if isinstance(location, str):
+        if location.endswith('.gz'):
+            with gzip.open(location, 'rb') as f:
+                return f.read()
+        with open(location, 'rb') as f:
+            return f.read()
+    if archive_path is None:
+        raise ValueError('archive items need the archive path')
+    # one reader per worker process, without loading the whole index again
+    archive = _archives.get(archive_path, None)
+    if archive is None:
+        archive = _archives[archive_path] = ResponseArchive(archive_path, load_index=False)
+    offset, length = location
+    return archive.read(ArchiveRecord(timestamp=0, url='', offset=offset, length=length))
+
+
+def process_chunk(archive_path: Optional[str], items: List[Item], output: str, part: int,
+                  timezone: str) -> Dict[str, int]:
+    # runs in a worker: extracts a batch of responses and writes one part file per endpoint
+    tz = pytz.timezone(timezone)
+    tables: Dict[str, Columns] = {}
+    counts: Dict[str, int] = {}
+    for endpoint, timestamp, params, location in items:
+        try:
+            columns = EXTRACTORS[endpoint](loads(_read(archive_path, location)), timestamp, params, tz)
+        except Exception:
+            logger.exception('cannot extract %s response at %s (%s) from %s', endpoint, location, timestamp,
+                             archive_path or 'file')
+            counts['errors'] = counts.get('errors', 0) + 1
+            continue
+        table = tables.get(endpoint, None)
+        if table is None:
+            tables[endpoint] = columns
+        else:
+            for name, values in columns.items():
+                table[name].extend(values)
+        counts['responses'] = counts.get('responses', 0) + 1
+    for endpoint, table in tables.items():
+        rows = len(next(iter(table.values()), []))
+        counts[endpoint] = counts.get(endpoint, 0) + rows
+        directory = os.path.join(output, endpoint)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{PART_PREFIX}{part:06d}{PART_SUFFIX}')
+        with gzip.open(f'{path}.tmp', 'wt', encoding='utf-8', compresslevel=6) as f:
+            json.dump(table, f, separators=(',', ':'))
+        os.replace(f'{path}.tmp', path)
+    return counts
+
+
+def scan(source: Union[str, 'os.PathLike[str]']) -> Tuple[Optional[str], List[Item]]:
+    # a response archive, or a directory of raw JSON responses named after their endpoint
+    source = os.fspath(source)
+    if os.path.exists(os.path.join(source, 'index.jsonl')):
+        with ResponseArchive(source) as archive:
+            items: List[Item] = []
+            for record in archive:
+                endpoint = endpoint_of_url(record.url)
+                if endpoint is not None and record.status_code == 200:
+                    items.append((endpoint, record.timestamp, record.params, (record.offset, record.length)))
+            return source, items
+
+    items = []
+    for directory, _, names in os.walk(source):
+        for name in sorted(names):
+            if not (name.endswith('.json') or name.endswith('.json.gz')):
+                continue
+            endpoint = endpoint_of_file(name)
+            if endpoint is not None:
+                path = os.path.join(directory, name)
+                items.append((endpoint, os.path.getmtime(path), {}, path))
+    items.sort(key=lambda item: (item[1], item[3]))
+    return None, items
+
+
+def _chunks(items: List[Item], chunk_size: int) -> Iterator[List[Item]]:
+    for i in range(0, len(items), chunk_size):
+        yield items[i:i + chunk_size]
+
+
+def reprocess(source: Union[str, 'os.PathLike[str]'], output: Union[str, 'os.PathLike[str]'], *,
+              workers: Optional[int] = None, chunk_size: int = 256,
+              timezone: str = 'Europe/Warsaw') -> Dict[str, int]:
+    archive_path, items = scan(source)
+    output = os.fspath(output)
+    os.makedirs(output, exist_ok=True)
+    # parts of an earlier run would otherwise be read together with the new ones
+    for endpoint in EXTRACTORS:
+        _remove_parts(os.path.join(output, endpoint))
+    chunks = list(_chunks(items, chunk_size))
+    args = [(archive_path, chunk, output, part, timezone) for part, chunk in enumerate(chunks)]
+
+    totals: Dict[str, int] = {}
+    if workers == 1:
+        results: Iterable[Dict[str, int]] = (process_chunk(*arg) for arg in args)
+        try:
+            _add(totals, results)
+        finally:
+            _close_archives()
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            _add(totals, executor.map(process_chunk, *zip(*args)) if args else [])
+    return totals
+
+
+def _remove_parts(directory: str) -> None:
+    if not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        if name.startswith(PART_PREFIX):
+            os.remove(os.path.join(directory, name))
+
+
+def _close_archives() -> None:
+    while _archives:
+        _, archive = _archives.popitem()
+        archive.close()
+
+
+def _add(totals: Dict[str, int], results: Iterable[Dict[str, int]]) -> None:
+    for counts in results:
+        for key, value in counts.items():
+            totals[key] = totals.get(key, 0) + value
+
+
+def read_table(output: Union[str, 'os.PathLike[str]'], endpoint: str) -> Columns:
+    directory = os.path.join(os.fspath(output), endpoint)
+    table: Columns = {}
+    if not os.path.isdir(directory):
+        return table
+    for name in sorted(os.listdir(directory)):
+        if not (name.startswith(PART_PREFIX) and name.endswith(PART_SUFFIX)):
+            continue
+        with gzip.open(os.path.join(directory, name), 'rt', encoding='utf-8') as f:
+            part: Columns = json.load(f)
+        for column, values in part.items():
+            table.setdefault(column, []).extend(values)
+    return table
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m ttss.bulk',
+                                     description='Reprocess archived TTSS responses into columnar tables.')
+    parser.add_argument('source', help='response archive or directory of raw JSON responses')
+    parser.add_argument('output', help='directory for the tables, one per endpoint')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes, all cores by default')
+    parser.add_argument('--chunk-size', type=int, default=256, help='responses per batch')
+    parser.add_argument('--timezone', default='Europe/Warsaw')
+    args = parser.parse_args(argv)
+
+    totals = reprocess(args.source, args.output, workers=args.workers, chunk_size=args.chunk_size,
+                       timezone=args.timezone)
+    for key, value in sorted(totals.items()):
+        print(f'{key}: {value}')
+    return 1 if totals.get('errors', 0) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,188 @@
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple, Union
+
+from ttss.Interner import Interner
+from ttss.Passage import Passage
+from ttss.Path import Path
+from ttss.Route import Route
+from ttss.Status import Status
+from ttss.Stop import Stop
+from ttss.Trip import Trip
+from ttss.Vehicle import Vehicle
+from ttss.extractors import extract_paths, extract_stop_passages, extract_vehicles_update
+from ttss.utils import parse_time, relative_datetimes
+
+try:
+    import msgspec
+except ImportError:  # msgspec is not installed
+    msgspec = None  # type: ignore[assignment]
+
+
+def _select_loads() -> Callable[[Union[bytes, str]], Any]:
+    try:
+        import orjson
+        return orjson.loads
+    except ImportError:
+        pass
+    if msgspec is not None:
+        return msgspec.json.decode
+    return json.loads
+
+
+loads = _select_loads()
+
+
+def decode_stop_passages(content: bytes, /, *, now: datetime,
+                         interner: Optional[Interner] = None) -> Tuple[Stop, List[Route], List[Passage]]:
+    if msgspec is None:
+        return extract_stop_passages(loads(content), now=now, interner=interner)
+    try:
+        data = _stop_passages_decoder.decode(content)
+    except msgspec.ValidationError:  # fall back, so malformed payloads raise the same errors as without msgspec
+        return extract_stop_passages(loads(content), now=now, interner=interner)
+    if interner is None:
+        interner = Interner()
+    stop = Stop(name=data.stopName)
+    routes = [
+        Route(id=route.id,
+              name=route.name,
+              type=route.routeType,
+              authority=route.authority,
+              directions=route.directions,
+              alerts=route.alerts)
+        for route in data.routes
+    ]
+    items = [(True, passage) for passage in data.old] + [(False, passage) for passage in data.actual]
+    dts = relative_datetimes(now, [passage.actualRelativeTime for _, passage in items])
+    passages = [
+        _decode_stop_passage(passage, stop=stop, dt=dt, old=old, interner=interner)
+        for (old, passage), dt in zip(items, dts)
+    ]
+    return stop, routes, passages
+
+
+def _decode_stop_passage(passage: Any, /, *, stop: Stop, dt: datetime, old: bool, interner: Interner) -> Passage:
+    route = interner.route(passage.routeId, passage.patternText)
+    trip = interner.trip(passage.tripId, route, passage.direction)
+    vehicle = interner.vehicle(passage.vehicleId, trip) if passage.vehicleId is not None else None
+    return Passage(id=passage.passageid,
+                   stop=stop,
+                   trip=trip,
+                   route=route,
+                   vehicle=vehicle,
+                   planned_time=parse_time(passage.plannedTime),
+                   actual_time=parse_time(passage.actualTime) if passage.actualTime is not None else None,
+                   dt=dt,
+                   status=Status(passage.status),
+                   old=old)
+
+
+def decode_paths(content: bytes, /) -> List[Path]:
+    if msgspec is None:
+        return extract_paths(loads(content))
+    try:
+        paths = _paths_decoder.decode(content).paths
+    except msgspec.ValidationError:  # fall back, so malformed payloads raise the same errors as without msgspec
+        return extract_paths(loads(content))
+    return [
+        Path(color=path.color,
+             waypoints=[(point.lat / 3_600_000, point.lon / 3_600_000) for point in path.wayPoints])
+        for path in paths
+    ]
+
+
+def decode_vehicles(content: bytes, /, *, interner: Optional[Interner] = None) -> List[Vehicle]:
+    return decode_vehicles_update(content, interner=interner)[1]
+
+
+def decode_vehicles_update(content: bytes, /, *,
+                           interner: Optional[Interner] = None) -> Tuple[Optional[int], List[Vehicle]]:
+    if msgspec is None:
+        return extract_vehicles_update(loads(content), interner=interner)
+    try:
+        data = _vehicles_decoder.decode(content)
+    except msgspec.ValidationError:  # fall back, so malformed payloads raise the same errors as without msgspec
+        return extract_vehicles_update(loads(content), interner=interner)
+    if interner is None:
+        interner = Interner()
+    return data.lastUpdate, [_decode_vehicle(vehicle, interner=interner) for vehicle in data.vehicles]
+
+
+def _decode_vehicle(data: Any, /, *, interner: Interner) -> Vehicle:
+    trip = None
+    if data.tripId is not None:
+        name = data.name
+        route_number: Optional[str] = name
+        direction: Optional[str] = None
+        if name is not None and ' ' in name:
+            route_number, direction = name.split(' ', 1)
+        trip = Trip(id=data.tripId, route=interner.route(None, route_number), direction=direction)
+
+    return Vehicle(id=data.id,
+                   active=data.isDeleted is msgspec.UNSET,
+                   category=data.category,
+                   latitude=data.latitude / 3_600_000 if data.latitude is not None else None,
+                   longitude=data.longitude / 3_600_000 if data.longitude is not None else None,
+                   heading=data.heading,
+                   color=data.color,
+                   trip=trip)
+
+
+if msgspec is not None:
+    class _Route(msgspec.Struct):
+        id: str
+        name: str
+        alerts: List[Any]
+        routeType: Optional[str] = None
+        authority: Optional[str] = None
+        directions: List[str] = []
+
+    class _StopPassage(msgspec.Struct):
+        passageid: str
+        routeId: str
+        tripId: str
+        direction: str
+        plannedTime: str
+        actualRelativeTime: int
+        status: str
+        patternText: Optional[str] = None
+        vehicleId: Optional[str] = None
+        actualTime: Optional[str] = None
+
+    class _StopPassages(msgspec.Struct):
+        stopName: str
+        routes: List[_Route]
+        old: List[_StopPassage]
+        actual: List[_StopPassage]
+
+    class _WayPoint(msgspec.Struct):
+        lat: float
+        lon: float
+
+    class _Path(msgspec.Struct):
+        color: str
+        wayPoints: List[_WayPoint]
+
+    class _Paths(msgspec.Struct):
+        paths: List[_Path]
+
+    class _Vehicle(msgspec.Struct):
+        id: str
+        # absent means active, even an explicit null marks the vehicle as deleted
+        isDeleted: Union[Optional[bool], msgspec.UnsetType] = msgspec.UNSET
+        latitude: Optional[float] = None
+        longitude: Optional[float] = None
+        heading: Optional[int] = None
+        category: Optional[str] = None
+        color: Optional[str] = None
+        name: Optional[str] = None
+        tripId: Optional[str] = None
+
+    class _Vehicles(msgspec.Struct):
+        vehicles: List[_Vehicle]
+        lastUpdate: Optional[int] = None
+
+    _stop_passages_decoder = msgspec.json.Decoder(_StopPassages)
+    _paths_decoder = msgspec.json.Decoder(_Paths)
+    _vehicles_decoder = msgspec.json.Decoder(_Vehicles)
@@ -1,17 +1,22 @@
 import re
-from datetime import timedelta, datetime
+from array import array
+from datetime import datetime
+from math import nan
 from html import unescape
-from typing import List, Dict, Tuple, Optional, Any, Union
+from typing import List, Dict, Tuple, Optional, Any, Union, Iterator
 
+from ttss.Interner import Interner
 from ttss.Passage import Passage
 from ttss.Path import Path
+from ttss.PathGeometry import PathGeometry
 from ttss.Route import Route
 from ttss.Status import Status
 from ttss.Stop import Stop
 from ttss.StopPoint import StopPoint
 from ttss.Trip import Trip
 from ttss.Vehicle import Vehicle
-from ttss.utils import parse_time, round_seconds
+from ttss.VehicleFrame import NO_HEADING, VehicleFrame
+from ttss.utils import parse_time, relative_datetime, relative_datetimes
 
 
 def extract_autocomplete_stops(html_text: str, /) -> List[Stop]:
@@ -89,30 +94,43 @@ def extract_stop_point(data: dict, /) -> StopPoint:
     return StopPoint(id=data['id'], name=data['passengerName'], code=data['stopPointCode'])
 
 
-def extract_stop_passages(data: dict, /, *, now: datetime) -> Tuple[Stop, List[Route], List[Passage]]:
+def extract_stop_passages(data: dict, /, *, now: datetime,
+                          interner: Optional[Interner] = None) -> Tuple[Stop, List[Route], List[Passage]]:
+    if interner is None:
+        interner = Interner()
+
     stop = Stop(name=data['stopName'])
 
     routes = [extract_route(route) for route in data['routes']]
 
-    passages = extract_stop_passages_list(data['old'], stop=stop, now=now, old=True) + \
-               extract_stop_passages_list(data['actual'], stop=stop, now=now, old=False)  # noqa
+    passages = extract_stop_passages_list(data['old'], stop=stop, now=now, old=True, interner=interner) + \
+               extract_stop_passages_list(data['actual'], stop=stop, now=now, old=False, interner=interner)  # noqa
 
     return stop, routes, passages
 
 
 def extract_stop_passages_list(passages: List[Dict[str, Any]], /, *,
-                               stop: Stop, now: datetime, old: bool) -> List[Passage]:
-    return [extract_stop_passage(passage, stop=stop, now=now, old=old) for passage in passages]
+                               stop: Stop, now: datetime, old: bool,
+                               interner: Optional[Interner] = None) -> List[Passage]:
+    if interner is None:
+        interner = Interner()
+    dts = relative_datetimes(now, [passage['actualRelativeTime'] for passage in passages])
+    return [
+        extract_stop_passage(passage, stop=stop, now=now, old=old, interner=interner, dt=dt)
+        for passage, dt in zip(passages, dts)
+    ]
 
 
-def extract_stop_passage(passage: Dict[str, Any], /, *, stop: Stop, now: datetime, old: bool) -> Passage:
-    route = Route(id=passage['routeId'], name=passage['patternText'] if 'patternText' in passage else None)
+def extract_stop_passage(passage: Dict[str, Any], /, *, stop: Stop, now: datetime, old: bool,
+                         interner: Optional[Interner] = None, dt: Optional[datetime] = None) -> Passage:
+    if interner is None:
+        interner = Interner()
 
-    trip = Trip(id=passage['tripId'],
-                route=route,
-                direction=passage['direction'])
+    route = interner.route(passage['routeId'], passage['patternText'] if 'patternText' in passage else None)
 
-    vehicle = Vehicle(id=passage['vehicleId'], trip=trip) if 'vehicleId' in passage else None
+    trip = interner.trip(passage['tripId'], route, passage['direction'])
+
+    vehicle = interner.vehicle(passage['vehicleId'], trip) if 'vehicleId' in passage else None
 
     return Passage(id=passage['passageid'],
                    stop=stop,
@@ -121,23 +139,42 @@ def extract_stop_passage(passage: Dict[str, Any], /, *, stop: Stop, now: datetim
                    vehicle=vehicle,
                    planned_time=parse_time(passage['plannedTime']),
                    actual_time=parse_time(passage['actualTime']) if 'actualTime' in passage else None,
-                   dt=round_seconds(now + timedelta(seconds=passage['actualRelativeTime'])),
+                   dt=dt if dt is not None else relative_datetime(now, passage['actualRelativeTime']),
                    status=Status(passage['status']),
                    old=old)
 
 
-def extract_stop_point_passages(data: dict, /, *, now: datetime) -> Tuple[Stop, List[Route], List[Passage]]:
-    return extract_stop_passages(data, now=now)
+def iter_stop_passages(data: dict, /, *, now: datetime, old: bool = True,
+                       interner: Optional[Interner] = None) -> Iterator[Passage]:
+    if interner is None:
+        interner = Interner()
+
+    stop = Stop(name=data['stopName'])
 
+    if old:
+        for passage in data['old']:
+            yield extract_stop_passage(passage, stop=stop, now=now, old=True, interner=interner)
+    for passage in data['actual']:
+        yield extract_stop_passage(passage, stop=stop, now=now, old=False, interner=interner)
 
-def extract_trip_passages_list(passages: List[Dict[str, Any]], /, *, trip: Trip, old: bool) -> List[Passage]:
-    return [extract_trip_passage(passage, trip=trip, old=old) for passage in passages]
 
+def extract_stop_point_passages(data: dict, /, *, now: datetime,
+                                interner: Optional[Interner] = None) -> Tuple[Stop, List[Route], List[Passage]]:
+    return extract_stop_passages(data, now=now, interner=interner)
 
-def extract_trip_passage(data: dict, /, *, trip: Trip, old: bool) -> Passage:
-    stop = Stop(id=data['stop']['id'],
-                name=data['stop']['name'],
-                number=data['stop']['shortName'])
+
+def extract_trip_passages_list(passages: List[Dict[str, Any]], /, *, trip: Trip, old: bool,
+                               interner: Optional[Interner] = None) -> List[Passage]:
+    if interner is None:
+        interner = Interner()
+    return [extract_trip_passage(passage, trip=trip, old=old, interner=interner) for passage in passages]
+
+
+def extract_trip_passage(data: dict, /, *, trip: Trip, old: bool, interner: Optional[Interner] = None) -> Passage:
+    if interner is None:
+        interner = Interner()
+
+    stop = interner.stop(data['stop']['id'], data['stop']['name'], data['stop']['shortName'])
 
     return Passage(stop=stop,
                    seq_num=int(data['stop_seq_num']),
@@ -149,11 +186,14 @@ def extract_trip_passage(data: dict, /, *, trip: Trip, old: bool) -> Passage:
                    old=old)
 
 
-def extract_trip_passages(data: dict, /) -> Tuple[Optional[Trip], List[Passage]]:
-    route = Route(name=data.get('routeName', None))
+def extract_trip_passages(data: dict, /, *,
+                          interner: Optional[Interner] = None) -> Tuple[Optional[Trip], List[Passage]]:
+    if interner is None:
+        interner = Interner()
+    route = interner.route(None, data.get('routeName', None))
     trip = Trip(route=route, direction=data.get('directionText', None))
-    passages = extract_trip_passages_list(data['old'], trip=trip, old=True) + \
-               extract_trip_passages_list(data['actual'], trip=trip, old=False)  # noqa
+    passages = extract_trip_passages_list(data['old'], trip=trip, old=True, interner=interner) + \
+               extract_trip_passages_list(data['actual'], trip=trip, old=False, interner=interner)  # noqa
     return trip, passages
 
 
@@ -191,6 +231,11 @@ def extract_paths(data: dict, /) -> List[Path]:
     return [extract_path(path) for path in data['paths']]
 
 
+def iter_paths(data: dict, /) -> Iterator[Path]:
+    for path in data['paths']:
+        yield extract_path(path)
+
+
 def extract_path(data: dict, /) -> Path:
     waypoints = [
         (point['lat'] / 3_600_000, point['lon'] / 3_600_000)
@@ -199,11 +244,37 @@ def extract_path(data: dict, /) -> Path:
     return Path(color=data['color'], waypoints=waypoints)
 
 
-def extract_vehicles(data: dict, /) -> List[Vehicle]:
-    return [extract_vehicle(vehicle) for vehicle in data['vehicles']]
+def extract_path_geometries(data: dict, /) -> List[PathGeometry]:
+    return [extract_path_geometry(path) for path in data['paths']]
+
+
+def extract_path_geometry(data: dict, /) -> PathGeometry:
+    points = data['wayPoints']
+    coordinates = array('i', [0]) * (2 * len(points))
+    coordinates[0::2] = array('i', [point['lat'] for point in points])
+    coordinates[1::2] = array('i', [point['lon'] for point in points])
+    return PathGeometry(color=data['color'], coordinates=coordinates)
+
+
+def extract_vehicles(data: dict, /, *, interner: Optional[Interner] = None) -> List[Vehicle]:
+    if interner is None:
+        interner = Interner()
+    return [extract_vehicle(vehicle, interner=interner) for vehicle in data['vehicles']]
+
 
+def iter_vehicles(data: dict, /, *, interner: Optional[Interner] = None) -> Iterator[Vehicle]:
+    if interner is None:
+        interner = Interner()
+    for vehicle in data['vehicles']:
+        yield extract_vehicle(vehicle, interner=interner)
 
-def extract_vehicle(data: dict, /) -> Vehicle:
+
+def extract_vehicles_update(data: dict, /, *,
+                            interner: Optional[Interner] = None) -> Tuple[Optional[int], List[Vehicle]]:
+    return data.get('lastUpdate', None), extract_vehicles(data, interner=interner)
+
+
+def extract_vehicle(data: dict, /, *, interner: Optional[Interner] = None) -> Vehicle:
     active = 'isDeleted' not in data
 
     latitude = data['latitude'] / 3_600_000 if 'latitude' in data else None
@@ -219,7 +290,7 @@ def extract_vehicle(data: dict, /) -> Vehicle:
         route_number = direction = None
 
     if 'tripId' in data:
-        route = Route(name=route_number)
+        route = interner.route(None, route_number) if interner is not None else Route(name=route_number)
         trip = Trip(id=data.get('tripId', None),
                     route=route,
                     direction=direction)
@@ -234,3 +305,25 @@ def extract_vehicle(data: dict, /) -> Vehicle:
                    heading=data.get('heading', None),
                    color=data.get('color', None),
                    trip=trip)
+
+
+def extract_vehicle_frame(data: dict, /) -> VehicleFrame:
+    vehicles = data['vehicles']
+    categories: Dict[Optional[str], int] = {}
+    colors: Dict[Optional[str], int] = {}
+    frame = VehicleFrame(
+        ids=[vehicle['id'] for vehicle in vehicles],
+        active=array('b', [0 if 'isDeleted' in vehicle else 1 for vehicle in vehicles]),
+        latitude=array('d', [vehicle.get('latitude', nan) / 3_600_000 for vehicle in vehicles]),
+        longitude=array('d', [vehicle.get('longitude', nan) / 3_600_000 for vehicle in vehicles]),
+        heading=array('h', [vehicle.get('heading', NO_HEADING) for vehicle in vehicles]),
+        category=array('I', [categories.setdefault(vehicle.get('category', None), len(categories))
+                             for vehicle in vehicles]),
+        color=array('I', [colors.setdefault(vehicle.get('color', None), len(colors)) for vehicle in vehicles]),
+        trip_ids=[vehicle.get('tripId', None) for vehicle in vehicles],
+        names=[vehicle.get('name', None) if 'tripId' in vehicle else None for vehicle in vehicles],
+        last_update=data.get('lastUpdate', None),
+    )
+    frame.categories = list(categories)
+    frame.colors = list(colors)
+    return frame
@@ -0,0 +1,142 @@
+import asyncio
+import functools
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, Optional, Sized, TypeVar, cast
+
+from ttss.RequestEvent import RequestEvent
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+Hook = Callable[[RequestEvent], None]
+
+# the event of the instrumented call running in the current thread or task
+_current_event: ContextVar[Optional[RequestEvent]] = ContextVar('ttss_current_event', default=None)
+
+
+def count_objects(result: Any) -> Optional[int]:
+    if result is None:
+        return 0
+    if isinstance(result, tuple):
+        return sum(count_objects(item) or 0 for item in result)
+    if isinstance(result, Sized) and not isinstance(result, str):
+        return len(result)
+    if hasattr(result, '__next__'):  # lazy iterators are not consumed
+        return None
+    return 1
+
+
+def record_response(url: str, params: Dict[str, Any], *, status_code: int, content: bytes,
+                    ttfb: Optional[float], network_time: float) -> None:
+    event = _current_event.get()
+    if event is None:
+        return
+    event.url = url
+    event.params = params
+    event.status_code = status_code
+    event.bytes = len(content)
+    event.ttfb = ttfb
+    event.network_time = network_time
+
+
+class InstrumentedIterator:
+    # lazy results are extracted as they are consumed, so the event is reported once, when the iterator is
+    # exhausted, fails, is closed or is garbage collected, even unconsumed, with the time spent producing the items
+    # and not the time the caller spent on them
+    def __init__(self, iterator: Iterator[Any], event: RequestEvent, total_time: float,
+                 report: Callable[[], None]) -> None:
+        self._iterator = iterator
+        self._event = event
+        self._report: Optional[Callable[[], None]] = report
+        event.total_time = total_time
+        event.objects = 0
+
+    def __iter__(self) -> 'InstrumentedIterator':
+        return self
+
+    def __next__(self) -> Any:
+        if self._report is None:
+            raise StopIteration
+        started = perf_counter()
+        try:
+            item = next(self._iterator)
+        except StopIteration:
+            self._event.total_time += perf_counter() - started
+            self.close()
+            raise
+        except Exception as e:
+            self._event.total_time += perf_counter() - started
+            self._event.error = e
+            self.close()
+            raise
+        self._event.total_time += perf_counter() - started
+        self._event.objects = (self._event.objects or 0) + 1
+        return item
+
+    def close(self) -> None:
+        report, self._report = self._report, None
+        if report is not None:
+            report()
+
+    def __del__(self) -> None:
+        self.close()
+
+
+def instrumented(method: F) -> F:
+    endpoint = method.__name__
+
+    def start() -> RequestEvent:
+        return RequestEvent(endpoint=endpoint)
+
+    def finish(self: Any, event: RequestEvent, total_time: float) -> None:
+        event.total_time = total_time
+        event.cached = event.status_code is None and event.error is None
+        for hook in self.hooks:
+            hook(event)
+
+    def complete(self: Any, event: RequestEvent, result: Any, started: float) -> Any:
+        total_time = perf_counter() - started
+        if hasattr(result, '__next__'):
+            return InstrumentedIterator(result, event, total_time, lambda: finish(self, event, event.total_time))
+        event.objects = count_objects(result)
+        finish(self, event, total_time)
+        return result
+
+    if asyncio.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            if not self.hooks:
+                return await method(self, *args, **kwargs)
+            event = start()
+            token = _current_event.set(event)
+            started = perf_counter()
+            try:
+                result = await method(self, *args, **kwargs)
+            except BaseException as e:
+                event.error = e
+                finish(self, event, perf_counter() - started)
+                raise
+            finally:
+                _current_event.reset(token)
+            return complete(self, event, result, started)
+
+        return cast(F, async_wrapper)
+
+    @functools.wraps(method)
+    def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+        if not self.hooks:
+            return method(self, *args, **kwargs)
+        event = start()
+        token = _current_event.set(event)
+        started = perf_counter()
+        try:
+            result = method(self, *args, **kwargs)
+        except BaseException as e:
+            event.error = e
+            finish(self, event, perf_counter() - started)
+            raise
+        finally:
+            _current_event.reset(token)
+        return complete(self, event, result, started)
+
+    return cast(F, wrapper)
@@ -0,0 +1,245 @@
+import argparse
+import json
+import random
+import time
+from datetime import datetime, tzinfo
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from html import escape
+from threading import Lock, Thread
+from types import TracebackType
+from typing import Any, Callable, Dict, Optional, Tuple, Type, Union
+from urllib.parse import parse_qs, urlsplit
+
+import pytz
+
+from ttss.testing.SyntheticNetwork import SyntheticNetwork
+
+Body = Optional[Union[Dict[str, Any], list, str]]
+
+
+class MockServer:
+    # a local TTSS server backed by a SyntheticNetwork, latency and jitter are in seconds
+    def __init__(self, network: Optional[SyntheticNetwork] = None, *,
+                 host: str = '127.0.0.1',
+                 port: int = 0,
+                 latency: float = 0.0,
+                 jitter: float = 0.0,
+                 tz: tzinfo = pytz.timezone('Europe/Warsaw'),
+                 clock: Optional[Callable[[], datetime]] = None,
+                 cache_size: int = 0) -> None:
+        self.network = network if network is not None else SyntheticNetwork()
+        self.host = host
+        self.latency = latency
+        self.jitter = jitter
+        self.tz = tz
+        self.clock = clock if clock is not None else lambda: datetime.now(self.tz).replace(microsecond=0)
+        self.requests = 0
+        # responses are memoized per path, params and clock reading, useful with a frozen clock for benchmarks
+        self.cache_size = cache_size
+        self._cache: Dict[Tuple[str, str, datetime], Tuple[int, str, bytes]] = {}
+        # the counter and the cache are shared by the handler threads
+        self._lock = Lock()
+        self._routes: Dict[str, Callable[[Dict[str, str]], Body]] = {
+            '/internetservice/services/lookup/autocomplete': self._autocomplete,
+            '/internetservice/services/lookup/autocomplete/json': self._autocomplete_json,
+            '/internetservice/services/lookup/fulltext': self._lookup_fulltext,
+            '/internetservice/services/lookup/stopsByCharacter': self._stops_by_character,
+            '/internetservice/services/lookup/autocomplete/nearStops/json': self._near_stops,
+            '/internetservice/geoserviceDispatcher/services/stopinfo/stops': self._stops,
+            '/internetservice/geoserviceDispatcher/services/stopinfo/stopPoints': self._stop_points,
+            '/internetservice/services/stopInfo/stop': self._stop,
+            '/internetservice/services/stopInfo/stopPoint': self._stop_point,
+            '/internetservice/services/passageInfo/stopPassages/stop': self._stop_passages,
+            '/internetservice/services/passageInfo/stopPassages/stopPoint': self._stop_point_passages,
+            '/internetservice/services/tripInfo/tripPassages': self._trip_passages,
+            '/internetservice/services/routeInfo/route': self._route_list,
+            '/internetservice/services/routeInfo/routeStops': self._route_stops,
+            '/internetservice/geoserviceDispatcher/services/pathinfo/route': self._route_paths,
+            '/internetservice/geoserviceDispatcher/services/pathinfo/vehicle': self._vehicle_paths,
+            '/internetservice/geoserviceDispatcher/services/vehicleinfo/vehicles': self._vehicles,
+        }
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f'http://{self.host}:{self._server.server_address[1]}'
+
+    def start(self) -> 'MockServer':
+        if self._thread is None:
+            self._thread = Thread(target=self._server.serve_forever, daemon=True)
+            self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> 'MockServer':
+        return self.start()
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]], exc_value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.stop()
+
+    def respond(self, path: str, query: str) -> Tuple[int, str, bytes]:
+        if self.cache_size <= 0:
+            return self._respond(path, query)
+        params = '&'.join(sorted(item for item in query.split('&') if not item.startswith('cacheBuster=')))
+        key = (path, params, self.clock())
+        with self._lock:
+            response = self._cache.get(key, None)
+        if response is None:
+            response = self._respond(path, query)
+            with self._lock:
+                if len(self._cache) >= self.cache_size:
+                    self._cache.clear()
+                self._cache[key] = response
+        return response
+
+    def _respond(self, path: str, query: str) -> Tuple[int, str, bytes]:
+        route = self._routes.get(path, None)
+        if route is None:
+            return 404, 'text/plain', b''
+        params = {key: values[-1] for key, values in parse_qs(query).items()}
+        try:
+            body = route(params)
+        except (KeyError, ValueError):
+            return 400, 'text/plain', b''
+        if body is None:
+            return 404, 'text/plain', b''
+        if isinstance(body, str):
+            return 200, 'text/html; charset=utf-8', body.encode()
+        return 200, 'application/json; charset=utf-8', json.dumps(body, ensure_ascii=False).encode()
+
+    def _handler(self) -> Type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:
+                with server._lock:
+                    server.requests += 1
+                delay = server.latency + (random.uniform(-server.jitter, server.jitter) if server.jitter else 0.0)
+                if delay > 0:
+                    time.sleep(delay)
+                url = urlsplit(self.path)
+                status, content_type, body = server.respond(url.path, url.query)
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
+
+    def _autocomplete(self, params: Dict[str, str]) -> Body:
+        items = ''.join(f'<li stop="{number}">{escape(name)}</li>\n'
+                        for number, name in self.network.autocomplete(params.get('query', '')))
+        return f'<ul>\n{items}</ul>\n'
+
+    def _autocomplete_json(self, params: Dict[str, str]) -> Body:
+        return self.network.autocomplete_json(params.get('query', ''))
+
+    def _lookup_fulltext(self, params: Dict[str, str]) -> Body:
+        return self.network.lookup_fulltext(params.get('search', ''))
+
+    def _stops_by_character(self, params: Dict[str, str]) -> Body:
+        return self.network.stops_by_character(params.get('character', ''))
+
+    def _near_stops(self, params: Dict[str, str]) -> Body:
+        return self.network.near_stops(float(params['lat']), float(params['lon']))
+
+    @staticmethod
+    def _box(params: Dict[str, str]) -> Tuple[int, int, int, int]:
+        return int(params['left']), int(params['bottom']), int(params['right']), int(params['top'])
+
+    def _stops(self, params: Dict[str, str]) -> Body:
+        return self.network.stops_in_box(*self._box(params))
+
+    def _stop_points(self, params: Dict[str, str]) -> Body:
+        return self.network.stop_points_in_box(*self._box(params))
+
+    def _stop(self, params: Dict[str, str]) -> Body:
+        return self.network.stop_info(params['stop'])
+
+    def _stop_point(self, params: Dict[str, str]) -> Body:
+        return self.network.stop_point_info(params['stopPoint'])
+
+    def _stop_passages(self, params: Dict[str, str]) -> Body:
+        stop = self.network.stop_index(params['stop'])
+        if stop is None:
+            return None
+        return self.network.stop_passages(stop, self.clock(),
+                                          time_frame=int(params.get('timeFrame', 120)),
+                                          route_id=params.get('routeId', None),
+                                          direction_name=params.get('direction', None))
+
+    def _stop_point_passages(self, params: Dict[str, str]) -> Body:
+        index = self.network.stop_point_index(params['stopPoint'])
+        if index is None:
+            return None
+        stop, direction = index
+        return self.network.stop_passages(stop, self.clock(),
+                                          time_frame=int(params.get('timeFrame', 120)),
+                                          route_id=params.get('routeId', None),
+                                          direction_name=params.get('direction', None),
+                                          direction=direction)
+
+    def _trip_passages(self, params: Dict[str, str]) -> Body:
+        return self.network.trip_passages(params['tripId'], self.clock())
+
+    def _route_list(self, params: Dict[str, str]) -> Body:
+        return self.network.route_list()
+
+    def _route_stops(self, params: Dict[str, str]) -> Body:
+        return self.network.route_stops(params['routeId'])
+
+    def _route_paths(self, params: Dict[str, str]) -> Body:
+        return self.network.route_paths(params['id'], params.get('direction', None))
+
+    def _vehicle_paths(self, params: Dict[str, str]) -> Body:
+        return self.network.vehicle_paths(params['id'])
+
+    def _vehicles(self, params: Dict[str, str]) -> Body:
+        return self.network.vehicles(self.clock())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog='python -m ttss.testing', description='Local mock TTSS server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help='response delay in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='random +/- delay in seconds')
+    parser.add_argument('--stops', type=int, default=400)
+    parser.add_argument('--routes', type=int, default=40)
+    parser.add_argument('--stops-per-route', type=int, default=20)
+    parser.add_argument('--headway', type=int, default=10, help='minutes between trips')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    network = SyntheticNetwork(stops=args.stops,
+                               routes=args.routes,
+                               stops_per_route=args.stops_per_route,
+                               headway=args.headway,
+                               seed=args.seed)
+    server = MockServer(network, host=args.host, port=args.port, latency=args.latency, jitter=args.jitter)
+    print(f'Serving {network.stops} stops and {network.routes} routes at {server.base_url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
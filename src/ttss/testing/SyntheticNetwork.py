@@ -0,0 +1,440 @@
+import random
+from dataclasses import dataclass, field
+from datetime import datetime
+from math import atan2, ceil, degrees, floor
+from typing import Any, Dict, List, Optional, Tuple
+
+from ttss.utils import haversine
+
+UNITS_PER_DEGREE = 3_600_000
+
+FIRST_WORDS = ('Rondo', 'Plac', 'Most', 'Park', 'Dworzec', 'Osiedle', 'Cmentarz', 'Szpital', 'Teatr', 'Hala',
+               'Brama', 'Aleja', 'Zajezdnia', 'Stadion', 'Kopiec', 'Błonia')
+
+SECOND_WORDS = ('Główny', 'Mogilskie', 'Grunwaldzki', 'Kamienna', 'Wiślana', 'Polna', 'Leśna', 'Słoneczna',
+                'Zielona', 'Nowa', 'Stara', 'Wschód', 'Zachód', 'Północ', 'Południe', 'Łąkowa')
+
+STOP_ID_BASE = 8059230041856000000
+STOP_POINT_ID_BASE = 8059229492100000000
+ROUTE_ID_BASE = 8059228650286000000
+TRIP_ID_BASE = 8059232507160000000
+VEHICLE_ID_BASE = -1188950296500000000
+PASSAGE_ID_BASE = -1188950300820000000
+
+# trip numbers are (route index * 2 + direction) * TRIPS_PER_DIRECTION + trip index within the day
+TRIPS_PER_DIRECTION = 10_000
+
+
+@dataclass
+class SyntheticNetwork:
+    # a deterministic network of stops and routes with a fixed timetable, for the mock TTSS server
+    stops: int = 400
+    routes: int = 40
+    stops_per_route: int = 20
+    headway: int = 10  # minutes between trips
+    minutes_between_stops: int = 2
+    first_departure: int = 4 * 60  # minutes after midnight
+    last_departure: int = 23 * 60 + 59
+    waypoints_per_segment: int = 10
+    latitude: float = 50.06
+    longitude: float = 19.94
+    spacing: float = 400.0  # meters between neighbouring stops
+    seed: int = 0
+    stop_names: List[str] = field(init=False, repr=False)
+    stop_coordinates: List[Tuple[int, int]] = field(init=False, repr=False)
+    route_sequences: List[List[int]] = field(init=False, repr=False)
+    routes_by_stop: Dict[int, List[Tuple[int, int]]] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        rng = random.Random(self.seed)
+        columns = max(1, ceil(self.stops ** 0.5))
+        latitude_step = self.spacing / 111_195
+        longitude_step = latitude_step / 0.64  # cos(50 degrees)
+
+        names: Dict[str, int] = {}
+        self.stop_names = []
+        self.stop_coordinates = []
+        for index in range(self.stops):
+            name = f'{rng.choice(FIRST_WORDS)} {rng.choice(SECOND_WORDS)}'
+            names[name] = names.get(name, 0) + 1
+            self.stop_names.append(name if names[name] == 1 else f'{name} {names[name]}')
+            row, column = divmod(index, columns)
+            latitude = self.latitude + (row - columns / 2 + rng.uniform(-0.2, 0.2)) * latitude_step
+            longitude = self.longitude + (column - columns / 2 + rng.uniform(-0.2, 0.2)) * longitude_step
+            self.stop_coordinates.append((round(latitude * UNITS_PER_DEGREE), round(longitude * UNITS_PER_DEGREE)))
+
+        self.route_sequences = []
+        self.routes_by_stop = {}
+        for route in range(self.routes):
+            stop = rng.randrange(self.stops)
+            sequence = [stop]
+            while len(sequence) < min(self.stops_per_route, self.stops):
+                row, column = divmod(stop, columns)
+                neighbours = [
+                    (row + dr) * columns + column + dc
+                    for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1))
+                    if 0 <= column + dc < columns and 0 <= (row + dr) * columns + column + dc < self.stops
+                ]
+                unvisited = [neighbour for neighbour in neighbours if neighbour not in sequence]
+                stop = rng.choice(unvisited or [index for index in range(self.stops) if index not in sequence])
+                sequence.append(stop)
+            self.route_sequences.append(sequence)
+            for position, stop in enumerate(sequence):
+                self.routes_by_stop.setdefault(stop, []).append((route, position))
+
+    # identifiers
+
+    def stop_number(self, stop: int) -> str:
+        return str(stop + 1)
+
+    def stop_index(self, stop_number: str) -> Optional[int]:
+        stop = int(stop_number) - 1 if stop_number.isdigit() else -1
+        return stop if 0 <= stop < self.stops else None
+
+    def stop_point_code(self, stop: int, direction: int) -> str:
+        return f'{stop + 1}{direction + 1:02}'
+
+    def stop_point_index(self, stop_point_code: str) -> Optional[Tuple[int, int]]:
+        if not stop_point_code.isdigit() or len(stop_point_code) < 3:
+            return None
+        stop = self.stop_index(stop_point_code[:-2])
+        direction = int(stop_point_code[-2:]) - 1
+        return (stop, direction) if stop is not None and direction in (0, 1) else None
+
+    def route_id(self, route: int) -> str:
+        return str(ROUTE_ID_BASE + route)
+
+    def route_index(self, route_id: str) -> Optional[int]:
+        route = int(route_id) - ROUTE_ID_BASE if route_id.isdigit() else -1
+        return route if 0 <= route < self.routes else None
+
+    def trip_id(self, route: int, direction: int, trip: int) -> str:
+        return str(TRIP_ID_BASE + (route * 2 + direction) * TRIPS_PER_DIRECTION + trip)
+
+    def trip_index(self, trip_id: str) -> Optional[Tuple[int, int, int]]:
+        number = int(trip_id) - TRIP_ID_BASE if trip_id.isdigit() else -1
+        route_direction, trip = divmod(number, TRIPS_PER_DIRECTION)
+        route, direction = divmod(route_direction, 2)
+        if number < 0 or route >= self.routes or trip >= self.trips_per_direction:
+            return None
+        return route, direction, trip
+
+    def vehicle_id(self, route: int, direction: int, trip: int) -> str:
+        return str(VEHICLE_ID_BASE - (route * 2 + direction) * TRIPS_PER_DIRECTION - trip)
+
+    def vehicle_trip_id(self, vehicle_id: str) -> Optional[str]:
+        try:
+            number = VEHICLE_ID_BASE - int(vehicle_id)
+        except ValueError:
+            return None
+        return str(TRIP_ID_BASE + number) if number >= 0 else None
+
+    # timetable
+
+    @property
+    def trips_per_direction(self) -> int:
+        return (self.last_departure - self.first_departure) // self.headway + 1
+
+    def sequence(self, route: int, direction: int) -> List[int]:
+        stops = self.route_sequences[route]
+        return stops if direction == 0 else stops[::-1]
+
+    def direction_name(self, route: int, direction: int) -> str:
+        return self.stop_names[self.sequence(route, direction)[-1]]
+
+    def route_name(self, route: int) -> str:
+        return str(route + 1)
+
+    def route_type(self, route: int) -> str:
+        return 'tram' if route % 2 == 0 else 'bus'
+
+    def departure(self, trip: int) -> int:
+        return self.first_departure + trip * self.headway
+
+    def delay(self, route: int, direction: int, trip: int) -> int:
+        return (((route * 2 + direction) * TRIPS_PER_DIRECTION + trip) * 2654435761 >> 16) % 4
+
+    def _route_json(self, route: int) -> Dict[str, Any]:
+        return {
+            'alerts': [],
+            'authority': 'MPK',
+            'directions': [self.direction_name(route, 0), self.direction_name(route, 1)],
+            'id': self.route_id(route),
+            'name': self.route_name(route),
+            'routeType': self.route_type(route),
+            'shortName': self.route_name(route),
+        }
+
+    @staticmethod
+    def _minutes(now: datetime) -> float:
+        return now.hour * 60 + now.minute + now.second / 60
+
+    @staticmethod
+    def _format(minutes: int) -> str:
+        hours, minutes = divmod(minutes % (24 * 60), 60)
+        return f'{hours:02}:{minutes:02}'
+
+    # endpoints
+
+    def autocomplete(self, query: str) -> List[Tuple[str, str]]:
+        query = query.lower()
+        return [
+            (self.stop_number(stop), name)
+            for stop, name in enumerate(self.stop_names)
+            if query and query in name.lower()
+        ][:20]
+
+    def autocomplete_json(self, query: str) -> List[Dict[str, Any]]:
+        stops = self.autocomplete(query)
+        return [{'name': 'Przystanki', 'count': len(stops), 'type': 'divider'}] + [
+            {'name': name, 'id': number, 'type': 'stop'} for number, name in stops
+        ]
+
+    def lookup_fulltext(self, search: str) -> Dict[str, Any]:
+        if search.isdigit():
+            results = [
+                {'stopPoint': self.stop_point_code(stop, direction),
+                 'stopPointPassengerName': f'{self.stop_names[stop]} ({self.stop_point_code(stop, direction)})'}
+                for stop in range(self.stops)
+                for direction in (0, 1)
+                if self.stop_point_code(stop, direction).startswith(search)
+            ]
+        else:
+            results = [{'stop': number, 'stopPassengerName': name} for number, name in self.autocomplete(search)]
+        return {'results': results[:20]}
+
+    def stops_by_character(self, character: str) -> Dict[str, Any]:
+        character = character.lower()
+        return {'stops': [
+            {'id': str(STOP_ID_BASE + stop), 'name': name, 'number': self.stop_number(stop)}
+            for stop, name in sorted(enumerate(self.stop_names), key=lambda item: item[1])
+            if name.lower().startswith(character)
+        ]}
+
+    def near_stops(self, latitude: float, longitude: float, *, count: int = 20) -> List[Dict[str, Any]]:
+        nearest = sorted(range(self.stops), key=lambda stop: haversine(
+            latitude, longitude,
+            self.stop_coordinates[stop][0] / UNITS_PER_DEGREE, self.stop_coordinates[stop][1] / UNITS_PER_DEGREE))
+        return [{'name': 'Przystanki', 'count': min(count, self.stops), 'type': 'divider'}] + [
+            {'name': self.stop_names[stop], 'id': self.stop_number(stop), 'type': 'stop'}
+            for stop in nearest[:count]
+        ]
+
+    def _in_box(self, stop: int, left: int, bottom: int, right: int, top: int) -> bool:
+        latitude, longitude = self.stop_coordinates[stop]
+        return bottom <= latitude <= top and left <= longitude <= right
+
+    def stops_in_box(self, left: int, bottom: int, right: int, top: int) -> Dict[str, Any]:
+        return {'stops': [
+            {'category': 'tram' if any(route % 2 == 0 for route, _ in self.routes_by_stop.get(stop, [])) else 'bus',
+             'id': str(STOP_ID_BASE + stop),
+             'latitude': self.stop_coordinates[stop][0],
+             'longitude': self.stop_coordinates[stop][1],
+             'name': self.stop_names[stop],
+             'shortName': self.stop_number(stop)}
+            for stop in range(self.stops)
+            if self._in_box(stop, left, bottom, right, top)
+        ]}
+
+    def stop_points_in_box(self, left: int, bottom: int, right: int, top: int) -> Dict[str, Any]:
+        return {'stopPoints': [
+            {'category': 'tram' if any(route % 2 == 0 for route, _ in self.routes_by_stop.get(stop, [])) else 'bus',
+             'id': str(STOP_POINT_ID_BASE + stop * 2 + direction),
+             'label': 'AB'[direction],
+             'latitude': self.stop_coordinates[stop][0] + direction * 100,
+             'longitude': self.stop_coordinates[stop][1],
+             'name': f'{self.stop_names[stop]} ({self.stop_point_code(stop, direction)})',
+             'shortName': self.stop_number(stop),
+             'stopPoint': self.stop_point_code(stop, direction)}
+            for stop in range(self.stops)
+            if self._in_box(stop, left, bottom, right, top)
+            for direction in (0, 1)
+        ]}
+
+    def stop_info(self, stop_number: str) -> Optional[Dict[str, Any]]:
+        stop = self.stop_index(stop_number)
+        if stop is None:
+            return None
+        return {'id': str(STOP_ID_BASE + stop), 'passengerName': self.stop_names[stop]}
+
+    def stop_point_info(self, stop_point_code: str) -> Optional[Dict[str, Any]]:
+        index = self.stop_point_index(stop_point_code)
+        if index is None:
+            return None
+        stop, direction = index
+        return {'id': str(STOP_POINT_ID_BASE + stop * 2 + direction),
+                'passengerName': f'{self.stop_names[stop]} ({stop_point_code})',
+                'stopPointCode': stop_point_code}
+
+    def stop_passages(self, stop: int, now: datetime, *, time_frame: int = 120, route_id: Optional[str] = None,
+                      direction_name: Optional[str] = None, direction: Optional[int] = None) -> Dict[str, Any]:
+        now_minutes = self._minutes(now)
+        now_seconds = round(now_minutes * 60)
+        old: List[Tuple[int, Dict[str, Any]]] = []
+        actual: List[Tuple[int, Dict[str, Any]]] = []
+        routes = set()
+        for route, position in self.routes_by_stop.get(stop, []):
+            if route_id is not None and self.route_id(route) != route_id:
+                continue
+            for trip_direction in (0, 1):
+                if direction is not None and trip_direction != direction:
+                    continue
+                if direction_name is not None and self.direction_name(route, trip_direction) != direction_name:
+                    continue
+                routes.add(route)
+                k = position if trip_direction == 0 else len(self.route_sequences[route]) - 1 - position
+                offset = self.first_departure + k * self.minutes_between_stops
+                first = max(0, ceil((now_minutes - 5 - offset) / self.headway))
+                last = min(self.trips_per_direction - 1, floor((now_minutes + time_frame - offset) / self.headway))
+                for trip in range(first, last + 1):
+                    planned = offset + trip * self.headway
+                    started = self.departure(trip) <= now_minutes
+                    expected = planned + self.delay(route, trip_direction, trip) if started else planned
+                    relative = expected * 60 - now_seconds
+                    passage_number = (route * 2 + trip_direction) * 1_000_000 + trip * 100 + k
+                    passage = {
+                        'actualRelativeTime': relative,
+                        'direction': self.direction_name(route, trip_direction),
+                        'passageid': str(PASSAGE_ID_BASE - passage_number),
+                        'patternText': self.route_name(route),
+                        'plannedTime': self._format(planned),
+                        'routeId': self.route_id(route),
+                        'tripId': self.trip_id(route, trip_direction, trip),
+                    }
+                    if not started:
+                        passage['status'] = 'PLANNED'
+                    else:
+                        passage['actualTime'] = self._format(expected)
+                        passage['vehicleId'] = self.vehicle_id(route, trip_direction, trip)
+                        if relative < -30:
+                            passage['status'] = 'DEPARTED'
+                        elif relative <= 30:
+                            passage['status'] = 'STOPPING'
+                        else:
+                            passage['status'] = 'PREDICTED'
+                    if relative < -30:
+                        old.append((relative, passage))
+                    elif relative <= time_frame * 60:
+                        actual.append((relative, passage))
+        return {
+            'actual': [passage for _, passage in sorted(actual, key=lambda item: item[0])],
+            'directions': [],
+            'generalAlerts': [],
+            'old': [passage for _, passage in sorted(old, key=lambda item: item[0])],
+            'routes': [self._route_json(route) for route in sorted(routes)],
+            'stopName': self.stop_names[stop],
+            'stopShortName': self.stop_number(stop),
+        }
+
+    def trip_passages(self, trip_id: str, now: datetime) -> Optional[Dict[str, Any]]:
+        index = self.trip_index(trip_id)
+        if index is None:
+            return None
+        route, direction, trip = index
+        now_minutes = self._minutes(now)
+        started = self.departure(trip) <= now_minutes
+        delay = self.delay(route, direction, trip) if started else 0
+        old, actual = [], []
+        for k, stop in enumerate(self.sequence(route, direction)):
+            planned = self.departure(trip) + k * self.minutes_between_stops
+            expected = planned + delay
+            passage: Dict[str, Any] = {
+                'plannedTime': self._format(planned),
+                'stop': {'id': str(STOP_ID_BASE + stop),
+                         'name': self.stop_names[stop],
+                         'shortName': self.stop_number(stop)},
+                'stop_seq_num': str(k + 1),
+            }
+            if started:
+                passage['actualTime'] = self._format(expected)
+            if started and expected < now_minutes:
+                passage['status'] = 'DEPARTED'
+                old.append(passage)
+            else:
+                passage['status'] = 'PREDICTED' if started else 'PLANNED'
+                actual.append(passage)
+        return {
+            'actual': actual,
+            'directionText': self.direction_name(route, direction),
+            'old': old,
+            'routeName': self.route_name(route),
+        }
+
+    def route_list(self) -> Dict[str, Any]:
+        return {'routes': [self._route_json(route) for route in range(self.routes)]}
+
+    def route_stops(self, route_id: str) -> Optional[Dict[str, Any]]:
+        route = self.route_index(route_id)
+        if route is None:
+            return None
+        return {
+            'route': self._route_json(route),
+            'stops': [
+                {'id': str(STOP_ID_BASE + stop), 'name': self.stop_names[stop], 'number': self.stop_number(stop)}
+                for stop in sorted(set(self.route_sequences[route]), key=lambda stop: self.stop_names[stop])
+            ],
+        }
+
+    def _path(self, route: int, direction: int) -> Dict[str, Any]:
+        sequence = self.sequence(route, direction)
+        points = []
+        for a, b in zip(sequence, sequence[1:]):
+            (latitude1, longitude1), (latitude2, longitude2) = self.stop_coordinates[a], self.stop_coordinates[b]
+            for i in range(self.waypoints_per_segment):
+                t = i / self.waypoints_per_segment
+                points.append((round(latitude1 + (latitude2 - latitude1) * t),
+                               round(longitude1 + (longitude2 - longitude1) * t)))
+        points.append(self.stop_coordinates[sequence[-1]])
+        return {
+            'color': '#f89f05',
+            'wayPoints': [{'lat': lat, 'lon': lon, 'seq': str(i + 1)} for i, (lat, lon) in enumerate(points)],
+        }
+
+    def route_paths(self, route_id: str, direction_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        route = self.route_index(route_id)
+        if route is None:
+            return None
+        return {'paths': [
+            self._path(route, direction)
+            for direction in (0, 1)
+            if direction_name is None or self.direction_name(route, direction) == direction_name
+        ]}
+
+    def vehicle_paths(self, vehicle_id: str) -> Optional[Dict[str, Any]]:
+        trip_id = self.vehicle_trip_id(vehicle_id)
+        index = self.trip_index(trip_id) if trip_id is not None else None
+        if index is None:
+            return None
+        route, direction, _ = index
+        return {'paths': [self._path(route, direction)]}
+
+    def vehicles(self, now: datetime) -> Dict[str, Any]:
+        now_minutes = self._minutes(now)
+        vehicles = []
+        for route in range(self.routes):
+            for direction in (0, 1):
+                sequence = self.sequence(route, direction)
+                duration = (len(sequence) - 1) * self.minutes_between_stops
+                first = max(0, ceil((now_minutes - duration - 3 - self.first_departure) / self.headway))
+                last = min(self.trips_per_direction - 1, floor((now_minutes - self.first_departure) / self.headway))
+                for trip in range(first, last + 1):
+                    elapsed = now_minutes - self.departure(trip) - self.delay(route, direction, trip)
+                    progress = min(max(elapsed / self.minutes_between_stops, 0.0), len(sequence) - 1.0)
+                    if elapsed > duration:
+                        continue
+                    k = min(int(progress), len(sequence) - 2)
+                    t = progress - k
+                    (latitude1, longitude1) = self.stop_coordinates[sequence[k]]
+                    (latitude2, longitude2) = self.stop_coordinates[sequence[k + 1]]
+                    heading = round(degrees(atan2((longitude2 - longitude1) * 0.64, latitude2 - latitude1))) % 360
+                    vehicles.append({
+                        'category': self.route_type(route),
+                        'color': '0x000000',
+                        'heading': heading,
+                        'id': self.vehicle_id(route, direction, trip),
+                        'latitude': round(latitude1 + (latitude2 - latitude1) * t),
+                        'longitude': round(longitude1 + (longitude2 - longitude1) * t),
+                        'name': f'{self.route_name(route)} {self.direction_name(route, direction)}',
+                        'tripId': self.trip_id(route, direction, trip),
+                    })
+        return {'lastUpdate': int(now.timestamp() * 1000), 'vehicles': vehicles}
@@ -0,0 +1,2 @@
+from ttss.testing.MockServer import MockServer  # noqa: F401
+from ttss.testing.SyntheticNetwork import SyntheticNetwork  # noqa: F401
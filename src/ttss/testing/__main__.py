@@ -0,0 +1,4 @@
+from ttss.testing.MockServer import main
+
+if __name__ == '__main__':
+    main()
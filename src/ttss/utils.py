@@ -1,9 +1,25 @@
-from datetime import datetime, time, timedelta
+import sys
+from datetime import datetime, time, timedelta, tzinfo
+from itertools import islice
+from math import asin, cos, radians, sin, sqrt
 from time import time_ns
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+# dataclass(slots=True) is only available on Python 3.10+
+SLOTS: Dict[str, Any] = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+T = TypeVar('T')
+
+
+# all 1440 possible 'HH:MM' values, strptime is only used for anything else
+TIMES: Dict[str, time] = {f'{hour:02}:{minute:02}': time(hour, minute) for hour in range(24) for minute in range(60)}
 
 
 def parse_time(string: str) -> time:
-    return datetime.strptime(string, '%H:%M').time()
+    try:
+        return TIMES[string]
+    except KeyError:
+        return datetime.strptime(string, '%H:%M').time()
 
 
 def timestamp_ms() -> str:
@@ -12,3 +28,57 @@ def timestamp_ms() -> str:
 
 def round_seconds(dt: datetime) -> datetime:
     return dt + timedelta(seconds=60 - dt.second) if dt.second > 30 else dt.replace(second=0)
+
+
+def _relative_minutes(now: datetime, seconds: int) -> int:
+    minutes, remainder = divmod(now.second + seconds, 60)
+    return minutes + 1 if remainder > 30 else minutes
+
+
+def relative_datetime(now: datetime, seconds: int) -> datetime:
+    # same as round_seconds(now + timedelta(seconds=seconds))
+    return now.replace(second=0) + timedelta(minutes=_relative_minutes(now, seconds))
+
+
+def relative_datetimes(now: datetime, seconds: Iterable[int]) -> List[datetime]:
+    base = now.replace(second=0)
+    dts: Dict[int, datetime] = {}
+    result = []
+    for value in seconds:
+        minutes = _relative_minutes(now, value)
+        dt = dts.get(minutes, None)
+        if dt is None:
+            dt = dts[minutes] = base + timedelta(minutes=minutes)
+        result.append(dt)
+    return result
+
+
+def localize(dt: datetime, tz: Optional[tzinfo]) -> datetime:
+    if tz is None:
+        return dt
+    if hasattr(tz, 'localize'):  # pytz
+        return tz.localize(dt)
+    return dt.replace(tzinfo=tz)
+
+
+def service_datetime(reference: datetime, value: time) -> datetime:
+    # the day (previous, same or next) that puts the time closest to the reference,
+    # so that 23:58 seen at 00:05 is yesterday and 00:10 seen at 23:50 is tomorrow
+    naive = reference.replace(tzinfo=None)
+    candidates = (datetime.combine(naive.date() + timedelta(days=days), value) for days in (-1, 0, 1))
+    return localize(min(candidates, key=lambda candidate: abs(candidate - naive)), reference.tzinfo)
+
+
+EARTH_RADIUS = 6_371_008.8
+
+
+def haversine(latitude1: float, longitude1: float, latitude2: float, longitude2: float) -> float:
+    phi1, phi2 = radians(latitude1), radians(latitude2)
+    a = sin((phi2 - phi1) / 2) ** 2 + cos(phi1) * cos(phi2) * sin(radians(longitude2 - longitude1) / 2) ** 2
+    return 2 * EARTH_RADIUS * asin(sqrt(a))
+
+
+def take(iterable: Iterable[T], *, predicate: Optional[Callable[[T], bool]] = None,
+         limit: Optional[int] = None) -> Iterator[T]:
+    iterator = iter(iterable) if predicate is None else filter(predicate, iterable)
+    return iterator if limit is None else islice(iterator, limit)
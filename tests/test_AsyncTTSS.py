@@ -0,0 +1,152 @@
+import asyncio
+from datetime import datetime, time
+from pathlib import Path
+from typing import Dict
+
+import httpx
+import pytest
+import pytz
+
+from ttss import Passage, Route, Status, Stop, Trip, Vehicle
+from ttss.AsyncTTSS import AsyncTTSS
+
+base_url = 'http://www.ttss.krakow.pl'
+
+tz = pytz.timezone('Europe/Warsaw')
+
+resources_dir = Path(__file__).parent / 'resources'
+
+resources: Dict[str, str] = {
+    '/internetservice/services/lookup/autocomplete/json': 'lookup_autocomplete_json.json',
+    '/internetservice/services/passageInfo/stopPassages/stop': 'passageInfo_stopPassages_stop.json',
+    '/internetservice/services/routeInfo/route': 'routeInfo_route.json',
+    '/internetservice/geoserviceDispatcher/services/vehicleinfo/vehicles':
+        'geoserviceDispatcher_vehicleinfo_vehicles.json',
+}
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path not in resources:
+        return httpx.Response(404)
+    with open(resources_dir / resources[request.url.path], 'r', encoding='utf-8') as f:
+        return httpx.Response(200, text=f.read())
+
+
+def make_ttss(**kwargs) -> AsyncTTSS:
+    return AsyncTTSS(base_url=base_url, client=httpx.AsyncClient(transport=httpx.MockTransport(handler)), **kwargs)
+
+
+def test_autocomplete_stops_json() -> None:
+    async def main():
+        async with make_ttss() as ttss:
+            return await ttss.autocomplete_stops_json(query='dwor')
+
+    stops = asyncio.run(main())
+
+    assert stops[1] == Stop(name='Dworzec Główny', number='131')
+    assert len(stops) == 6
+
+
+@pytest.mark.freeze_time(datetime(2021, 6, 28, 21, 33, 19).replace(tzinfo=tz))
+def test_get_stop_passages() -> None:
+    async def main():
+        async with make_ttss() as ttss:
+            return await ttss.get_stop_passages(stop_number='3242')
+
+    stop, routes, passages = asyncio.run(main())
+
+    assert stop == Stop(name='Teatr Słowackiego')
+    assert len(routes) == 8
+    assert len(passages) == 65
+
+    expected_route = Route(id='8059228650286874679', name='3')
+    expected_trip = Trip(id='8059232507168765972', route=expected_route, direction='Nowy Bieżanów P+R')
+    assert passages[2] == Passage(id='-1188950300820626854',
+                                  old=False,
+                                  status=Status.STOPPING,
+                                  planned_time=time(21, 32),
+                                  actual_time=time(21, 33),
+                                  dt=datetime(2021, 6, 28, 21, 33).replace(tzinfo=tz),
+                                  stop=stop,
+                                  trip=expected_trip,
+                                  route=expected_route,
+                                  vehicle=Vehicle(id='-1188950296502609298', trip=expected_trip))
+
+
+def test_get_stop_not_found() -> None:
+    async def main():
+        async with make_ttss() as ttss:
+            return await ttss.get_stop(stop_number='9999')
+
+    assert asyncio.run(main()) is None
+
+
+def test_get_vehicles_drops_empty_params() -> None:
+    requests = []
+
+    def recording_handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return handler(request)
+
+    async def main():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(recording_handler))
+        async with AsyncTTSS(base_url=base_url, client=client) as ttss:
+            return await ttss.get_vehicles()
+
+    vehicles = asyncio.run(main())
+
+    assert len(vehicles) == 754
+    assert 'lastUpdate' not in requests[0].url.params
+    assert requests[0].url.params['positionType'] == 'CORRECTED'
+
+
+def test_iter_vehicles() -> None:
+    async def main():
+        async with make_ttss() as ttss:
+            return await ttss.iter_vehicles(predicate=lambda vehicle: vehicle.category == 'tram', limit=5)
+
+    vehicles = list(asyncio.run(main()))
+
+    assert len(vehicles) == 5
+    assert all(vehicle.category == 'tram' for vehicle in vehicles)
+
+
+def test_max_concurrency() -> None:
+    in_flight = max_in_flight = 0
+
+    async def slow_handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return handler(request)
+
+    async def main():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(slow_handler))
+        async with AsyncTTSS(base_url=base_url, client=client, max_concurrency=3) as ttss:
+            return await asyncio.gather(*(ttss.get_routes() for _ in range(10)))
+
+    results = asyncio.run(main())
+
+    assert len(results) == 10
+    assert max_in_flight == 3
+
+
+@pytest.mark.freeze_time(datetime(2021, 6, 28, 21, 33, 19).replace(tzinfo=tz))
+def test_get_many_stop_passages() -> None:
+    def failing_handler(request: httpx.Request) -> httpx.Response:
+        if request.url.params['stop'] == '9999':
+            return httpx.Response(500)
+        return handler(request)
+
+    async def main():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(failing_handler))
+        async with AsyncTTSS(base_url=base_url, client=client) as ttss:
+            return await ttss.get_many_stop_passages(['3242', '9999'])
+
+    results = asyncio.run(main())
+
+    assert isinstance(results['9999'], httpx.HTTPStatusError)
+    stop, routes, passages = results['3242']
+    assert len(passages) == 65
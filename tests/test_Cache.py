@@ -0,0 +1,209 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+import pytz
+from requests_mock.mocker import Mocker
+
+from ttss import Cache, TTSS
+
+base_url = 'http://www.ttss.krakow.pl'
+
+tz = pytz.timezone('Europe/Warsaw')
+
+resources_dir = Path(__file__).parent / 'resources'
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_ttl() -> None:
+    clock = Clock()
+    cache = Cache(ttls={'endpoint': 10}, clock=clock)
+    calls = []
+
+    def load() -> int:
+        calls.append(clock.now)
+        return len(calls)
+
+    assert cache.get_or_load('endpoint', 'key', load) == 1
+    clock.now = 9.9
+    assert cache.get_or_load('endpoint', 'key', load) == 1
+    clock.now = 10.0
+    assert cache.get_or_load('endpoint', 'key', load) == 2
+
+    assert cache.hits == 1
+    assert cache.misses == 2
+    assert cache.hit_ratio == 1 / 3
+
+
+def test_cache_uncached_endpoint() -> None:
+    cache = Cache(ttls={})
+    calls = []
+
+    cache.get_or_load('endpoint', 'key', lambda: calls.append(1))
+    cache.get_or_load('endpoint', 'key', lambda: calls.append(1))
+
+    assert len(calls) == 2
+    assert len(cache) == 0
+    assert cache.hit_ratio is None
+
+
+def test_cache_lru() -> None:
+    cache = Cache(ttls={'endpoint': 10}, max_size=2)
+
+    cache.get_or_load('endpoint', 'a', lambda: 'a')
+    cache.get_or_load('endpoint', 'b', lambda: 'b')
+    cache.get_or_load('endpoint', 'a', lambda: 'a')
+    cache.get_or_load('endpoint', 'c', lambda: 'c')
+
+    assert len(cache) == 2
+    assert cache.get_or_load('endpoint', 'a', lambda: 'new a') == 'a'
+    assert cache.get_or_load('endpoint', 'b', lambda: 'new b') == 'new b'
+
+
+def test_cache_coalescing() -> None:
+    cache = Cache(ttls={'endpoint': 10})
+    started = threading.Event()
+    calls = []
+
+    def load() -> str:
+        calls.append(1)
+        started.set()
+        time.sleep(0.05)
+        return 'value'
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        first = executor.submit(cache.get_or_load, 'endpoint', 'key', load)
+        started.wait()
+        others = [executor.submit(cache.get_or_load, 'endpoint', 'key', load) for _ in range(4)]
+
+    assert first.result() == 'value'
+    assert [future.result() for future in others] == ['value'] * 4
+    assert len(calls) == 1
+    assert cache.misses == 1
+    assert cache.hits + cache.coalesced == 4
+
+
+def test_cache_invalidation_during_load() -> None:
+    cache = Cache(ttls={'endpoint': 10})
+
+    def load() -> str:
+        cache.invalidate('key')
+        return 'stale'
+
+    assert cache.get_or_load('endpoint', 'key', load) == 'stale'
+    assert cache.get_or_load('endpoint', 'key', lambda: 'fresh') == 'fresh'
+    assert cache.get_or_load('endpoint', 'key', lambda: 'other') == 'fresh'
+
+
+def test_cache_invalidate_where() -> None:
+    cache = Cache(ttls={'endpoint': 10})
+    for key in [('a', 1), ('a', 2), ('b', 1)]:
+        cache.get_or_load('endpoint', key, lambda: 'value')
+
+    assert cache.invalidate_where(lambda key: key in [('a', 1), ('a', 2)]) == 2
+    assert len(cache) == 1
+
+
+def test_cache_errors_are_not_cached() -> None:
+    cache = Cache(ttls={'endpoint': 10})
+
+    def load() -> str:
+        raise ValueError()
+
+    with pytest.raises(ValueError):
+        cache.get_or_load('endpoint', 'key', load)
+
+    assert cache.get_or_load('endpoint', 'key', lambda: 'value') == 'value'
+
+
+def test_ttss_cache(requests_mock: Mocker) -> None:
+    with open(resources_dir / 'routeInfo_route.json', 'r', encoding='utf-8') as f:
+        data = f.read()
+    requests_mock.get(f'{base_url}/internetservice/services/routeInfo/route', text=data)
+    ttss = TTSS(base_url=base_url, cache=Cache())
+
+    assert ttss.get_routes() == ttss.get_routes()
+
+    assert requests_mock.call_count == 1
+    assert ttss.cache is not None
+    assert ttss.cache.hits == 1
+
+
+@pytest.mark.freeze_time(datetime(2021, 6, 28, 21, 33, 19).replace(tzinfo=tz), tick=True)
+def test_ttss_cache_ignores_cache_buster(requests_mock: Mocker) -> None:
+    with open(resources_dir / 'passageInfo_stopPassages_stop.json', 'r', encoding='utf-8') as f:
+        data = f.read()
+    requests_mock.get(f'{base_url}/internetservice/services/passageInfo/stopPassages/stop', text=data)
+    ttss = TTSS(base_url=base_url, cache=Cache())
+
+    ttss.get_stop_passages('3242')
+    time.sleep(0.01)
+    ttss.get_stop_passages(stop_number='3242', now=datetime.now(tz))
+    ttss.get_stop_passages('3242', route_id='8059228650286874679')
+
+    assert requests_mock.call_count == 2
+    first, second = requests_mock.request_history
+    assert first.qs['cachebuster'] != second.qs['cachebuster']
+
+
+def test_ttss_cache_passages_use_callers_now(requests_mock: Mocker) -> None:
+    with open(resources_dir / 'passageInfo_stopPassages_stop.json', 'r', encoding='utf-8') as f:
+        data = f.read()
+    requests_mock.get(f'{base_url}/internetservice/services/passageInfo/stopPassages/stop', text=data)
+    requests_mock.get(f'{base_url}/internetservice/services/passageInfo/stopPassages/stopPoint', text=data)
+    ttss = TTSS(base_url=base_url, cache=Cache())
+    noon = tz.localize(datetime(2021, 6, 28, 12, 0))
+    evening = tz.localize(datetime(2021, 6, 28, 18, 0))
+
+    _, _, first = ttss.get_stop_passages('3242', now=noon)
+    _, _, second = ttss.get_stop_passages('3242', now=evening)
+    _, _, third = ttss.get_stop_point_passages('324201', now=noon)
+    _, _, fourth = ttss.get_stop_point_passages('324201', now=evening)
+
+    assert requests_mock.call_count == 2
+    assert ttss.cache is not None and ttss.cache.hits == 2
+    assert [passage.dt for passage in second] == [passage.dt + timedelta(hours=6)  # type: ignore[operator]
+                                                  for passage in first]
+    assert [passage.dt for passage in fourth] == [passage.dt + timedelta(hours=6)  # type: ignore[operator]
+                                                  for passage in third]
+    assert first[0].dt is not None and first[0].dt.hour == 11
+
+
+def test_ttss_cache_shared_between_services(requests_mock: Mocker) -> None:
+    with open(resources_dir / 'routeInfo_route.json', 'r', encoding='utf-8') as f:
+        data = f.read()
+    requests_mock.get(f'{base_url}/internetservice/services/routeInfo/route', text=data)
+    requests_mock.get('http://ttss.mpk.krakow.pl/internetservice/services/routeInfo/route', text='{"routes": []}')
+    cache = Cache()
+
+    trams = TTSS(base_url=base_url, cache=cache).get_routes()
+    trams_en = TTSS(base_url=base_url, language='en', cache=cache).get_routes()
+    buses = TTSS(base_url='http://ttss.mpk.krakow.pl', cache=cache).get_routes()
+
+    assert trams == trams_en != buses == []
+    assert requests_mock.call_count == 3
+
+
+def test_ttss_cache_returns_copies(requests_mock: Mocker) -> None:
+    with open(resources_dir / 'routeInfo_routeStops.json', 'r', encoding='utf-8') as f:
+        data = f.read()
+    requests_mock.get(f'{base_url}/internetservice/services/routeInfo/routeStops', text=data)
+    ttss = TTSS(base_url=base_url, cache=Cache())
+    route, stops = ttss.get_route_stops('8059228650286874769')
+    count = len(stops)
+
+    stops.clear()
+
+    assert ttss.get_route_stops('8059228650286874769')[0] == route
+    assert len(ttss.get_route_stops('8059228650286874769')[1]) == count > 0
+    assert requests_mock.call_count == 1
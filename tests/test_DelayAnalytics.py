@@ -0,0 +1,90 @@
+import json
+from dataclasses import replace
+from datetime import time
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from ttss import DelayAnalytics, Passage, Route, Status, Stop, Trip
+from ttss.extractors import extract_trip_passages
+
+resources_dir = Path(__file__).parent / 'resources'
+
+
+def passage(passage_id: Optional[str], planned: time, actual: time, *,
+            route: str = '1', stop: str = 'Rondo', status: Status = Status.PREDICTED, old: bool = False) -> Passage:
+    return Passage(id=passage_id, planned_time=planned, actual_time=actual, status=status, old=old,
+                   stop=Stop(name=stop), route=Route(name=route), trip=Trip(direction='Centrum'))
+
+
+def test_delay_analytics() -> None:
+    analytics = DelayAnalytics()
+
+    assert analytics.ingest([
+        passage('1', time(8, 0), time(8, 2)),
+        passage('2', time(8, 10), time(8, 10)),
+        passage('3', time(23, 59), time(0, 6), route='2'),
+        passage('4', time(9, 0), time(9, 0), status=Status.PLANNED),
+    ]) == 3
+    assert analytics.pending == 3
+    assert analytics.stats() == {}
+
+    # later observations replace the delay of a pending passage
+    assert analytics.ingest([
+        passage('1', time(8, 0), time(8, 5), status=Status.DEPARTED, old=True),
+        passage('2', time(8, 10), time(8, 8)),
+    ]) == 2
+    assert analytics.pending == 2
+    assert analytics.flush() == 2
+    analytics.ingest([passage('1', time(8, 0), time(8, 9), old=True)])
+
+    assert analytics.observations == 6
+    assert analytics.duplicates == 3
+    overall = analytics.stats()[()]
+    assert overall.count == 3
+    assert overall.mean == pytest.approx(10 / 3)
+    assert overall.quantile(0) == -2
+    assert overall.quantile(0.5) == 5
+    assert overall.quantile(1) == 7
+    assert (overall.early, overall.on_time, overall.late) == (1, 0, 2)
+    assert overall.on_time_ratio == 0
+
+    assert analytics.summary(['route', 'hour']) == [
+        {'route': '1', 'hour': 8, 'count': 2, 'mean': 1.5, 'p50': -2.0, 'p90': 5.0, 'p95': 5.0,
+         'on_time_ratio': 0.0},
+        {'route': '2', 'hour': 23, 'count': 1, 'mean': 7.0, 'p50': 7.0, 'p90': 7.0, 'p95': 7.0,
+         'on_time_ratio': 0.0},
+    ]
+    with pytest.raises(ValueError):
+        analytics.stats(['vehicle'])
+
+
+def test_delay_analytics_max_pending() -> None:
+    analytics = DelayAnalytics(max_pending=2)
+
+    analytics.ingest([passage(str(i), time(8, 0), time(8, 1)) for i in range(5)])
+
+    assert analytics.pending == 2
+    assert analytics.stats()[()].count == 3
+    assert analytics.stats()[()].on_time_ratio == 1
+
+
+def test_delay_analytics_trip_passages() -> None:
+    with open(resources_dir / 'tripInfo_tripPassages_actual.json', 'r', encoding='utf-8') as f:
+        trip, passages = extract_trip_passages(json.load(f))
+    planned = [
+        replace(passage, planned_time=time(21, 27), actual_time=None, status=Status.PLANNED)
+        for passage in passages
+        if passage.seq_num != 28
+    ]
+    analytics = DelayAnalytics()
+
+    assert analytics.ingest(passages, trip_id='8059232507168536594') == 0
+    assert analytics.ingest(passages, trip_id='8059232507168536594', planned=planned) == 12
+    analytics.flush()
+
+    stats = analytics.stats(['route', 'direction'])
+    assert list(stats) == [('24', 'Bronowice Małe')]
+    assert stats[('24', 'Bronowice Małe')].count == 12
+    assert stats[('24', 'Bronowice Małe')].quantile(0) == 3
@@ -0,0 +1,110 @@
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytz
+from requests_mock.mocker import Mocker
+from requests_mock.request import _RequestObjectProxy
+from requests_mock.response import _Context
+
+from ttss import DepartureBoard, TTSS
+from ttss.testing import MockServer, SyntheticNetwork
+
+base_url = 'http://www.ttss.krakow.pl'
+
+resources_dir = Path(__file__).parent / 'resources'
+
+tz = pytz.timezone('Europe/Warsaw')
+
+now = tz.localize(datetime(2021, 6, 28, 21, 33, 19))
+
+
+def test_departure_board(requests_mock: Mocker) -> None:
+    with open(resources_dir / 'passageInfo_stopPassages_stop.json', 'r', encoding='utf-8') as f:
+        stop_data = f.read()
+    with open(resources_dir / 'passageInfo_stopPassages_stopPoint.json', 'r', encoding='utf-8') as f:
+        stop_point_data = f.read()
+    requests_mock.get(f'{base_url}/internetservice/services/passageInfo/stopPassages/stop', text=stop_data)
+    requests_mock.get(f'{base_url}/internetservice/services/passageInfo/stopPassages/stopPoint', text=stop_point_data)
+    board = DepartureBoard(TTSS(base_url=base_url), stop_numbers=['3242'], stop_point_codes=['324239'])
+
+    timeline = board.update(now=now)
+
+    assert requests_mock.call_count == 2
+    assert len(timeline) == len(board) == 63
+    assert len({passage.id for passage in timeline}) == 63
+    assert not any(passage.old for passage in timeline)
+    dts = [passage.dt for passage in timeline]
+    assert dts == sorted(dts)  # type: ignore[type-var]
+    assert board.snapshot(3) == timeline[:3]
+    assert board.snapshot() == timeline
+    assert board.updated_at == now
+
+    board.unsubscribe(stop_number='3242')
+
+    assert board.sources == [('stop_point', '324239')]
+    assert len(board.snapshot()) == 15
+    board.stop()
+
+
+def test_departure_board_keeps_failing_sources(requests_mock: Mocker) -> None:
+    with open(resources_dir / 'passageInfo_stopPassages_stopPoint.json', 'r', encoding='utf-8') as f:
+        data = f.read()
+    failing = set()
+
+    def callback(request: _RequestObjectProxy, context: _Context) -> str:
+        if request.qs['stoppoint'][0] in failing:
+            context.status_code = 500
+            return ''
+        return data
+
+    requests_mock.get(f'{base_url}/internetservice/services/passageInfo/stopPassages/stopPoint', text=callback)
+    board = DepartureBoard(TTSS(base_url=base_url), old=True)
+    board.subscribe(stop_point_code='324239')
+    board.subscribe(stop_point_code='324239')
+    board.update(now=now)
+    failing.add('324239')
+
+    timeline = board.update(now=now)
+
+    assert board.stop_point_codes == ['324239']
+    assert len(timeline) == 16
+    assert list(board.errors) == [('stop_point', '324239')]
+    board.stop()
+
+
+def test_departure_board_unsubscribe_during_update(requests_mock: Mocker) -> None:
+    with open(resources_dir / 'passageInfo_stopPassages_stopPoint.json', 'r', encoding='utf-8') as f:
+        data = f.read()
+    board = DepartureBoard(TTSS(base_url=base_url), stop_point_codes=['324239'])
+
+    def callback(request: _RequestObjectProxy, context: _Context) -> str:
+        board.unsubscribe(stop_point_code='324239')
+        return data
+
+    requests_mock.get(f'{base_url}/internetservice/services/passageInfo/stopPassages/stopPoint', text=callback)
+
+    timeline = board.update(now=now)
+
+    assert board.sources == []
+    assert timeline == board.snapshot() == []
+    board.stop()
+
+
+def test_departure_board_merges_stop_points() -> None:
+    network = SyntheticNetwork(stops=50, routes=5, stops_per_route=10)
+    stop = network.route_sequences[0][2]
+
+    with MockServer(network, clock=lambda: now) as server:
+        ttss = TTSS(base_url=server.base_url)
+        _, _, passages = ttss.get_stop_passages(network.stop_number(stop), now=now)
+        board = DepartureBoard(ttss, stop_point_codes=[network.stop_point_code(stop, 0),
+                                                       network.stop_point_code(stop, 1)], interval=60)
+        with board:
+            while board.updated_at is None:
+                time.sleep(0.01)
+
+    timeline = board.snapshot()
+    assert len(timeline) == len({passage.id for passage in passages if not passage.old})
+    assert {passage.id for passage in timeline} == {passage.id for passage in passages if not passage.old}
+    assert [passage.dt for passage in timeline] == sorted(passage.dt for passage in timeline)  # type: ignore[type-var]
@@ -0,0 +1,52 @@
+import pytest
+
+from ttss import Histogram
+
+
+def test_observe() -> None:
+    histogram = Histogram(buckets=(1.0, 2.0, 5.0))
+    for value in (0.5, 1.0, 1.5, 3.0, 10.0):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.cumulative_counts() == [2, 3, 4, 5]
+    assert histogram.count == 5
+    assert histogram.sum == 16.0
+    assert histogram.mean == 3.2
+
+
+def test_quantile() -> None:
+    histogram = Histogram(buckets=(1.0, 2.0, 4.0))
+    assert histogram.quantile(0.5) is None
+
+    for _ in range(50):
+        histogram.observe(0.5)
+    for _ in range(50):
+        histogram.observe(3.0)
+
+    assert histogram.quantile(0.5) == 1.0
+    assert histogram.quantile(0.75) == pytest.approx(3.0)
+    assert histogram.quantile(0.99) == pytest.approx(3.96)
+
+
+def test_quantile_overflow() -> None:
+    histogram = Histogram(buckets=(1.0,))
+    histogram.observe(100.0)
+
+    assert histogram.quantile(0.5) == 1.0
+
+
+def test_merge() -> None:
+    histogram = Histogram(buckets=(1.0, 2.0))
+    other = Histogram(buckets=(1.0, 2.0))
+    histogram.observe(0.5)
+    other.observe(1.5)
+    other.observe(3.0)
+
+    histogram.merge(other)
+
+    assert histogram.counts == [1, 1, 1]
+    assert histogram.count == 3
+    assert histogram.sum == 5.0
+    with pytest.raises(ValueError):
+        histogram.merge(Histogram(buckets=(1.0,)))
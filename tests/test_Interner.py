@@ -0,0 +1,98 @@
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+import pytz
+
+from ttss import Interner, Passage, Route, Stop, Trip, Vehicle
+from ttss.extractors import extract_stop_passages, extract_vehicles
+
+resources_dir = Path(__file__).parent / 'resources'
+
+now = datetime(2021, 6, 28, 21, 33).replace(tzinfo=pytz.timezone('Europe/Warsaw'))
+
+
+def load(name: str) -> dict:
+    with open(resources_dir / name, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_interner() -> None:
+    interner = Interner()
+    route = interner.route('1', '52')
+    trip = interner.trip('2', route, 'Czerwone Maki P+R')
+
+    assert interner.route('1', '52') is route
+    assert interner.route('1', '50') is not route
+    assert interner.trip('2', route, 'Czerwone Maki P+R') is trip
+    assert interner.trip('2', Route(id='1', name='52'), 'Czerwone Maki P+R') is not trip
+    assert interner.vehicle('3', trip) is interner.vehicle('3', trip)
+    assert interner.stop('4', 'Rondo', '5') == Stop(id='4', name='Rondo', number='5')
+    assert len(interner) == 6
+
+    interner.clear()
+
+    assert len(interner) == 0
+
+
+def test_interner_max_size() -> None:
+    interner = Interner(max_size=2)
+    first = interner.route('1', '52')
+    interner.route('2', '50')
+    interner.route('1', '52')
+    interner.route('3', '4')
+
+    assert len(interner.routes) == 2
+    assert interner.route('1', '52') is first
+    assert ('2', '50') not in interner.routes
+
+
+def test_interner_threads() -> None:
+    data = load('passageInfo_stopPassages_stop.json')
+    interner = Interner()
+
+    def extract(_: int) -> list:
+        return extract_stop_passages(data, now=now, interner=interner)[2]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(extract, range(32)))
+
+    assert all(result == results[0] for result in results)
+    for passages in results[1:]:
+        assert all(a.trip is b.trip and a.vehicle is b.vehicle for a, b in zip(results[0], passages))
+    assert len(interner.trips) == len({passage.trip.id for passage in results[0] if passage.trip is not None})
+
+
+def test_stop_passages_share_routes() -> None:
+    _, _, passages = extract_stop_passages(load('passageInfo_stopPassages_stop.json'), now=now)
+
+    routes = {passage.route.id: passage.route for passage in passages if passage.route is not None}
+    assert all(passage.route is routes[passage.route.id] for passage in passages if passage.route is not None)
+    assert all(passage.trip is not None and passage.trip.route is passage.route for passage in passages)
+
+
+def test_stop_passages_share_across_responses() -> None:
+    data = load('passageInfo_stopPassages_stop.json')
+    interner = Interner()
+
+    _, _, first = extract_stop_passages(data, now=now, interner=interner)
+    _, _, second = extract_stop_passages(data, now=now, interner=interner)
+
+    assert first == second
+    assert all(a.trip is b.trip and a.vehicle is b.vehicle for a, b in zip(first, second))
+
+
+def test_vehicles_share_routes() -> None:
+    vehicles = extract_vehicles(load('geoserviceDispatcher_vehicleinfo_vehicles.json'))
+
+    routes = [vehicle.trip.route for vehicle in vehicles if vehicle.trip is not None and vehicle.trip.route is not None]
+    assert len({id(route) for route in routes}) == len({route.name for route in routes})
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason='dataclass(slots=True) requires Python 3.10+')
+@pytest.mark.parametrize('cls', [Passage, Route, Stop, Trip, Vehicle])
+def test_slots(cls: type) -> None:
+    assert not hasattr(cls(), '__dict__')
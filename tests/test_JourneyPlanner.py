@@ -0,0 +1,119 @@
+from datetime import datetime, time, timedelta
+from typing import List, Tuple
+
+import pytz
+
+from ttss import JourneyPlanner, Passage, Route, Status, Stop, Trip, TTSS
+from ttss.testing import MockServer, SyntheticNetwork
+
+tz = pytz.timezone('Europe/Warsaw')
+
+now = tz.localize(datetime(2021, 6, 28, 12, 0, 19))
+
+
+def trip_passages(stops: List[Tuple[str, time]]) -> List[Passage]:
+    return [
+        Passage(seq_num=i + 1, stop=Stop(name=name), actual_time=value, status=Status.PREDICTED)
+        for i, (name, value) in enumerate(stops)
+    ]
+
+
+def dt(hour: int, minute: int) -> datetime:
+    return tz.localize(datetime(2021, 6, 28, hour, minute))
+
+
+def test_journey_planner() -> None:
+    planner = JourneyPlanner()
+    planner.add_trip('1', Trip(route=Route(name='1'), direction='C'),
+                     trip_passages([('A', time(12, 0)), ('B', time(12, 5)), ('C', time(12, 30))]), now=now)
+    planner.add_trip('2', Trip(route=Route(name='2'), direction='D'),
+                     trip_passages([('B', time(12, 6)), ('C', time(12, 10)), ('D', time(12, 15))]), now=now)
+    planner.add_trip('3', Trip(route=Route(name='3'), direction='D'),
+                     trip_passages([('A', time(12, 20)), ('D', time(12, 25))]), now=now)
+
+    assert len(planner) == 5
+
+    journey = planner.plan('A', 'C', dt(11, 55))
+    assert journey is not None
+    assert [(leg.route, leg.from_stop, leg.to_stop, leg.stops) for leg in journey.legs] == [
+        ('1', 'A', 'B', 1),
+        ('2', 'B', 'C', 1),
+    ]
+    assert journey.departure == dt(12, 0)
+    assert journey.arrival == dt(12, 10)
+    assert journey.transfers == 1
+    assert journey.duration == timedelta(minutes=10)
+
+    # a 2 minute transfer misses route 2 at B
+    journey = planner.plan('A', 'C', dt(11, 55), transfer_time=timedelta(minutes=2))
+    assert journey is not None
+    assert [(leg.route, leg.from_stop, leg.to_stop, leg.stops) for leg in journey.legs] == [('1', 'A', 'C', 2)]
+
+    journey = planner.plan('A', 'D', dt(12, 1))
+    assert journey is not None
+    assert [leg.trip_id for leg in journey.legs] == ['3']
+    assert planner.plan('A', 'D', dt(12, 1), window=timedelta(minutes=5)) is None
+    assert planner.plan('D', 'A', dt(11, 0)) is None
+    assert planner.plan('A', 'unknown', dt(11, 0)) is None
+
+    # live times replace the trip
+    planner.add_trip('2', Trip(route=Route(name='2'), direction='D'),
+                     trip_passages([('B', time(12, 12)), ('C', time(12, 16)), ('D', time(12, 21))]), now=now)
+    journey = planner.plan('A', 'D', dt(11, 55))
+    assert journey is not None
+    assert journey.arrival == dt(12, 21)
+
+    assert planner.prune(dt(12, 22)) == 1
+    assert planner.plan('A', 'D', dt(11, 55)) is not None
+    planner.remove_trip('2')
+    journey = planner.plan('A', 'D', dt(11, 55))
+    assert journey is not None and journey.arrival == dt(12, 25)
+
+
+def test_journey_planner_stop_passages() -> None:
+    planner = JourneyPlanner()
+    trip = Trip(id='t', route=Route(name='1'), direction='C')
+
+    def passage(stop: str, minute: int) -> Passage:
+        return Passage(id=f'{stop}-t', stop=Stop(name=stop), trip=trip, route=trip.route, dt=dt(12, minute),
+                       actual_time=time(12, minute), status=Status.PREDICTED)
+
+    assert planner.add_stop_passages([passage('A', 0), passage('C', 10)]) == 1
+    assert planner.add_stop_passages([passage('B', 5)]) == 1
+
+    journey = planner.plan('A', 'C', dt(11, 59))
+    assert journey is not None
+    assert [(leg.from_stop, leg.to_stop, leg.stops) for leg in journey.legs] == [('A', 'C', 2)]
+
+
+def test_journey_planner_mock_server() -> None:
+    network = SyntheticNetwork(stops=60, routes=8, stops_per_route=12)
+
+    with MockServer(network, clock=lambda: now) as server:
+        ttss = TTSS(base_url=server.base_url)
+        trip_ids = [vehicle.trip.id for vehicle in ttss.get_vehicles() if vehicle.trip is not None and vehicle.trip.id]
+        planner = JourneyPlanner(transfer_time=timedelta(minutes=2))
+        planner.load_trips(ttss, trip_ids, now=now)
+
+    sequence = network.route_sequences[0]
+    origin, destination = network.stop_names[sequence[6]], network.stop_names[sequence[11]]
+    journey = planner.plan(origin, destination, now)
+    assert journey is not None
+    assert journey.legs[0].from_stop == origin and journey.legs[-1].to_stop == destination
+    assert journey.departure >= now
+    for leg, next_leg in zip(journey.legs, journey.legs[1:]):
+        assert leg.to_stop == next_leg.from_stop
+        assert next_leg.departure >= leg.arrival + timedelta(minutes=2)
+
+
+def test_journey_planner_load_trips_errors() -> None:
+    network = SyntheticNetwork(stops=60, routes=8, stops_per_route=12)
+
+    with MockServer(network, clock=lambda: now) as server:
+        ttss = TTSS(base_url=server.base_url)
+        trip_ids = [vehicle.trip.id for vehicle in ttss.get_vehicles() if vehicle.trip is not None and vehicle.trip.id]
+        planner = JourneyPlanner()
+        count = planner.load_trips(ttss, trip_ids + ['unknown'], now=now)
+
+    assert count == len(planner) > 0
+    assert list(planner.errors) == ['unknown']
@@ -0,0 +1,155 @@
+import asyncio
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+import httpx
+import pytest
+import pytz
+from requests import HTTPError
+from requests_mock.mocker import Mocker
+
+from ttss import Cache, Metrics, RequestEvent, TTSS
+from ttss.AsyncTTSS import AsyncTTSS
+
+base_url = 'http://www.ttss.krakow.pl'
+
+tz = pytz.timezone('Europe/Warsaw')
+
+resources_dir = Path(__file__).parent / 'resources'
+
+
+def test_metrics() -> None:
+    metrics = Metrics(buckets=(0.01, 0.1))
+    metrics(RequestEvent(endpoint='get_stops', status_code=200, bytes=100, objects=3,
+                         network_time=0.05, total_time=0.06))
+    metrics(RequestEvent(endpoint='get_stops', cached=True, objects=3, total_time=0.001))
+    metrics(RequestEvent(endpoint='get_vehicles', error=HTTPError(), status_code=500, bytes=10,
+                         network_time=0.2, total_time=0.2))
+
+    assert metrics.calls == {'get_stops': 2, 'get_vehicles': 1}
+    assert metrics.errors == {'get_vehicles': 1}
+    assert metrics.cache_hits == {'get_stops': 1}
+    assert metrics.bytes == {'get_stops': 100, 'get_vehicles': 10}
+    assert metrics.objects == {'get_stops': 6}
+    assert metrics.total_time['get_stops'].counts == [1, 1, 0]
+    assert metrics.network_time['get_stops'].count == 1
+    assert metrics.extract_time['get_stops'].sum == pytest.approx(0.01)
+
+    text = metrics.to_openmetrics()
+
+    assert '# TYPE ttss_calls counter\n' in text
+    assert 'ttss_calls_total{endpoint="get_stops"} 2\n' in text
+    assert 'ttss_errors_total{endpoint="get_vehicles"} 1\n' in text
+    assert '# TYPE ttss_duration_seconds histogram\n' in text
+    assert 'ttss_duration_seconds_bucket{endpoint="get_stops",le="0.01"} 1\n' in text
+    assert 'ttss_duration_seconds_bucket{endpoint="get_stops",le="0.1"} 2\n' in text
+    assert 'ttss_duration_seconds_bucket{endpoint="get_stops",le="+Inf"} 2\n' in text
+    assert 'ttss_duration_seconds_count{endpoint="get_vehicles"} 1\n' in text
+    assert text.endswith('# EOF\n')
+
+    metrics.reset()
+
+    assert metrics.calls == {}
+    assert metrics.to_openmetrics() == metrics.to_openmetrics()
+
+
+def test_ttss_hooks(requests_mock: Mocker) -> None:
+    with open(resources_dir / 'passageInfo_stopPassages_stop.json', 'r', encoding='utf-8') as f:
+        data = f.read()
+    requests_mock.get(f'{base_url}/internetservice/services/passageInfo/stopPassages/stop', text=data)
+    requests_mock.get(f'{base_url}/internetservice/services/routeInfo/route', status_code=500)
+
+    events: List[RequestEvent] = []
+    metrics = Metrics()
+    ttss = TTSS(base_url=base_url, cache=Cache(), hooks=[events.append, metrics])
+
+    now = tz.localize(datetime(2021, 6, 28, 21, 33, 19))
+    ttss.get_stop_passages(stop_number='3242', now=now)
+    ttss.get_stop_passages(stop_number='3242', now=now)
+    with pytest.raises(HTTPError):
+        ttss.get_routes()
+
+    assert [event.endpoint for event in events] == ['get_stop_passages', 'get_stop_passages', 'get_routes']
+
+    event = events[0]
+    assert event.url == f'{base_url}/internetservice/services/passageInfo/stopPassages/stop'
+    assert event.params['stop'] == '3242'
+    assert event.status_code == 200
+    assert event.bytes == len(data.encode())
+    assert event.objects == 1 + 8 + 65
+    assert not event.cached
+    assert event.error is None
+    assert event.network_time is not None and event.network_time <= event.total_time
+    assert event.extract_time is not None and event.extract_time > 0
+
+    assert events[1].cached
+    assert events[1].status_code is None
+    assert events[1].extract_time is None
+
+    assert events[2].status_code == 500
+    assert isinstance(events[2].error, HTTPError)
+    assert not events[2].cached
+
+    assert metrics.calls == {'get_stop_passages': 2, 'get_routes': 1}
+    assert metrics.cache_hits == {'get_stop_passages': 1}
+    assert metrics.errors == {'get_routes': 1}
+
+
+def test_ttss_hooks_lazy_extraction(requests_mock: Mocker) -> None:
+    with open(resources_dir / 'geoserviceDispatcher_vehicleinfo_vehicles.json', 'r', encoding='utf-8') as f:
+        data = f.read()
+    requests_mock.get(f'{base_url}/internetservice/geoserviceDispatcher/services/vehicleinfo/vehicles', text=data)
+    events: List[RequestEvent] = []
+    ttss = TTSS(base_url=base_url, hooks=[events.append])
+
+    vehicles = ttss.iter_vehicles(predicate=lambda vehicle: vehicle.category == 'tram', limit=5)
+
+    assert events == []
+    assert len(list(vehicles)) == 5
+    [event] = events
+    assert event.endpoint == 'iter_vehicles'
+    assert event.objects == 5
+    assert event.status_code == 200
+    assert event.extract_time is not None and event.extract_time > 0
+
+    vehicles = ttss.iter_vehicles()
+    next(vehicles)
+    del vehicles  # abandoned iterators are reported when they are collected
+
+    assert len(events) == 2
+    assert events[1].objects == 1
+
+    ttss.iter_vehicles()  # discarded unconsumed
+
+    assert len(events) == 3
+    assert events[2].status_code == 200
+    assert events[2].bytes == len(data.encode())
+    assert events[2].objects == 0
+    assert not events[2].cached
+
+
+def test_ttss_without_hooks(requests_mock: Mocker) -> None:
+    requests_mock.get(f'{base_url}/internetservice/services/routeInfo/route', text='{"routes": []}')
+
+    ttss = TTSS(base_url=base_url)
+
+    assert ttss.get_routes() == []
+
+
+def test_async_ttss_hooks() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, text='{"routes": []}')
+
+    events: List[RequestEvent] = []
+
+    async def main():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        async with AsyncTTSS(base_url=base_url, client=client, hooks=[events.append]) as ttss:
+            await asyncio.gather(ttss.get_routes(), ttss.get_routes())
+
+    asyncio.run(main())
+
+    assert len(events) == 2
+    assert all(event.endpoint == 'get_routes' for event in events)
+    assert all(event.status_code == 200 and event.bytes == 14 and event.objects == 0 for event in events)
@@ -0,0 +1,140 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterator
+
+import pytest
+import pytz
+
+from ttss import Status, Transport, TTSS
+from ttss.testing import MockServer, SyntheticNetwork
+
+tz = pytz.timezone('Europe/Warsaw')
+
+now = tz.localize(datetime(2021, 6, 28, 12, 0, 19))
+
+
+@pytest.fixture(scope='module')
+def server() -> Iterator[MockServer]:
+    with MockServer(SyntheticNetwork(stops=100, routes=10, stops_per_route=15), clock=lambda: now) as server:
+        yield server
+
+
+@pytest.fixture
+def ttss(server: MockServer) -> Iterator[TTSS]:
+    with TTSS(base_url=server.base_url) as ttss:
+        yield ttss
+
+
+def test_lookups(server: MockServer, ttss: TTSS) -> None:
+    name = server.network.stop_names[0]
+    number = server.network.stop_number(0)
+
+    assert any(stop.number == number for stop in ttss.autocomplete_stops(name))
+    assert any(stop.number == number for stop in ttss.autocomplete_stops_json(name))
+    assert any(result.name == name for result in ttss.lookup_fulltext(name))
+    assert any(stop.number == number for stop in ttss.get_stops_by_character(name[0]))
+    assert ttss.get_near_stops(50.06, 19.94)
+    assert len(ttss.get_stops()) == 100
+    assert len(ttss.get_stop_points()) == 200
+    assert len(ttss.get_stops(min_latitude=50.06, min_longitude=19.94)) < 100
+    stop = ttss.get_stop(number)
+    assert stop is not None and stop.name == name
+    assert ttss.get_stop('1000') is None
+    stop_point = ttss.get_stop_point(server.network.stop_point_code(0, 1))
+    assert stop_point is not None and stop_point.code == f'{number}02'
+
+
+def test_passages(server: MockServer, ttss: TTSS) -> None:
+    network = server.network
+    number = network.stop_number(network.route_sequences[0][3])
+
+    stop, routes, passages = ttss.get_stop_passages(number, now=now)
+
+    assert stop.name == network.stop_names[network.route_sequences[0][3]]
+    assert network.route_id(0) in {route.id for route in routes}
+    assert {passage.status for passage in passages} >= {Status.DEPARTED, Status.PREDICTED, Status.PLANNED}
+    assert all(passage.dt is not None for passage in passages)
+
+    _, _, filtered = ttss.get_stop_passages(number, now=now, route_id=network.route_id(0),
+                                            direction=network.direction_name(0, 0))
+    assert filtered
+    assert all(passage.trip is not None and passage.trip.direction == network.direction_name(0, 0)
+               for passage in filtered)
+
+    passage = passages[-1]
+    assert passage.trip is not None and passage.trip.id is not None and passage.trip.route is not None
+    trip, trip_passages = ttss.get_trip_passages(passage.trip.id)
+    assert trip is not None and trip.route is not None and trip.route.name == passage.trip.route.name
+    assert [trip_passage.seq_num for trip_passage in trip_passages] == list(range(1, 16))
+
+    _, _, stop_point_passages = ttss.get_stop_point_passages(f'{number}01', now=now)
+    assert 0 < len(stop_point_passages) < len(passages)
+
+
+def test_routes_and_vehicles(server: MockServer, ttss: TTSS) -> None:
+    routes = ttss.get_routes()
+    assert len(routes) == 10
+
+    route, stops = ttss.get_route_stops(routes[0].id or '')
+    assert route == routes[0]
+    assert len(stops) == 15
+
+    paths = ttss.get_route_paths(routes[0].id or '')
+    assert [len(path.waypoints) for path in paths] == [141, 141]
+    assert ttss.get_route_paths('1') == []
+
+    vehicles = ttss.get_vehicles()
+    assert vehicles
+    assert all(vehicle.active and vehicle.trip is not None for vehicle in vehicles)
+    assert len(ttss.get_vehicle_paths(vehicles[0].id or '')) == 1
+
+
+def test_concurrency(server: MockServer) -> None:
+    network = server.network
+    numbers = [network.stop_number(stop) for stop in range(network.stops)]
+    requests_before = server.requests
+    threads_before = threading.active_count()
+
+    with TTSS(base_url=server.base_url, transport=Transport(pool_maxsize=16)) as ttss:
+        results = ttss.get_many_stop_passages(numbers, max_workers=16)
+
+    assert all(not isinstance(result, Exception) for result in results.values())
+    assert server.requests - requests_before == len(numbers)
+    assert threading.active_count() <= threads_before + 16
+
+
+def test_latency() -> None:
+    with MockServer(SyntheticNetwork(stops=10, routes=1, stops_per_route=5), latency=0.05) as server:
+        with TTSS(base_url=server.base_url) as ttss:
+            response = ttss.transport.get(f'{server.base_url}/internetservice/services/routeInfo/route', {})
+
+    assert response.status_code == 200
+    assert response.elapsed.total_seconds() >= 0.05
+
+
+def test_response_cache() -> None:
+    with MockServer(SyntheticNetwork(stops=10, routes=1, stops_per_route=5), clock=lambda: now,
+                    cache_size=10) as server:
+        first = server.respond('/internetservice/geoserviceDispatcher/services/vehicleinfo/vehicles', 'cacheBuster=1')
+        second = server.respond('/internetservice/geoserviceDispatcher/services/vehicleinfo/vehicles', 'cacheBuster=2')
+
+    assert first is second
+    assert server.respond('/unknown', '')[0] == 404
+    assert server.respond('/internetservice/services/stopInfo/stop', '')[0] == 400
+
+
+def test_response_cache_threads() -> None:
+    server = MockServer(SyntheticNetwork(stops=50, routes=5, stops_per_route=10), clock=lambda: now, cache_size=4)
+    network = server.network
+
+    def respond(stop: int) -> int:
+        return server.respond('/internetservice/services/passageInfo/stopPassages/stop',
+                              f'stop={network.stop_number(stop % network.stops)}')[0]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        statuses = list(executor.map(respond, range(400)))
+    server.stop()
+
+    assert statuses == [200] * 400
+    assert len(server._cache) <= 4
@@ -0,0 +1,36 @@
+import json
+from pathlib import Path
+
+from ttss import NetworkGraph, Route, Stop, TTSS
+from ttss.testing import MockServer, SyntheticNetwork
+from ttss.extractors import extract_route_stops
+
+resources_dir = Path(__file__).parent / 'resources'
+
+
+def test_network_graph() -> None:
+    with open(resources_dir / 'routeInfo_routeStops.json', 'r', encoding='utf-8') as f:
+        route, stops = extract_route_stops(json.load(f))
+    other = Route(id='2', name='2')
+    graph = NetworkGraph([(route, stops), (other, [Stop(name='Salwator'), Stop(name='Zoo')])])
+
+    assert len(graph.stops) == 50
+    assert graph.routes_at('Salwator') == [other, route]
+    assert [stop.name for stop in graph.stops_on(other)] == ['Salwator', 'Zoo']
+    assert graph.route_plan('Bieńczycka', 'Dąbie') == [route]
+    assert graph.route_plan('Bieńczycka', 'Zoo') == [route, other]
+    assert graph.route_plan('Zoo', 'Zoo') == []
+    assert graph.route_plan('Zoo', 'unknown') is None
+
+
+def test_network_graph_fetch() -> None:
+    network = SyntheticNetwork(stops=60, routes=8, stops_per_route=12)
+
+    with MockServer(network) as server:
+        graph = NetworkGraph.fetch(TTSS(base_url=server.base_url))
+
+    assert len(graph.routes) == 8
+    assert set(graph.stops) == {network.stop_names[stop] for sequence in network.route_sequences for stop in sequence}
+    first, last = network.route_sequences[0][0], network.route_sequences[0][-1]
+    plan = graph.route_plan(network.stop_names[first], network.stop_names[last])
+    assert plan is not None and len(plan) == 1
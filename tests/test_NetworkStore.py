@@ -0,0 +1,84 @@
+import gzip
+import time
+from pathlib import Path
+
+import pytest
+from requests_mock.mocker import Mocker
+
+from ttss import NetworkSnapshot, NetworkStore, TTSS
+
+base_url = 'http://www.ttss.krakow.pl'
+
+resources_dir = Path(__file__).parent / 'resources'
+
+
+@pytest.fixture
+def network(requests_mock: Mocker) -> Mocker:
+    for endpoint, resource in [
+        ('geoserviceDispatcher/services/stopinfo/stops', 'geoserviceDispatcher_stopinfo_stops.json'),
+        ('geoserviceDispatcher/services/stopinfo/stopPoints', 'geoserviceDispatcher_stopinfo_stopPoints.json'),
+        ('services/routeInfo/route', 'routeInfo_route.json'),
+        ('geoserviceDispatcher/services/pathinfo/route', 'geoserviceDispatcher_pathinfo_route.json'),
+    ]:
+        with open(resources_dir / resource, 'r', encoding='utf-8') as f:
+            requests_mock.get(f'{base_url}/internetservice/{endpoint}', text=f.read())
+    return requests_mock
+
+
+def test_network_store(network: Mocker, tmp_path: Path) -> None:
+    store = NetworkStore(TTSS(base_url=base_url), tmp_path)
+
+    snapshot = store.get()
+
+    assert store.path.exists()
+    assert len(snapshot.stops) == 4
+    assert len(snapshot.stop_points) == 12
+    assert len(snapshot.routes) == len(snapshot.route_paths) > 0
+    assert all(len(paths) == 2 for paths in snapshot.route_paths.values())
+    assert store.get() is snapshot
+
+    call_count = network.call_count
+    loaded = NetworkStore(TTSS(base_url=base_url), tmp_path).get()
+
+    assert network.call_count == call_count
+    assert loaded == snapshot
+
+
+def test_network_store_key(tmp_path: Path) -> None:
+    store_pl = NetworkStore(TTSS(base_url=base_url), tmp_path)
+    store_en = NetworkStore(TTSS(base_url=base_url, language='en'), tmp_path)
+    store_bus = NetworkStore(TTSS(base_url='http://ttss.mpk.krakow.pl'), tmp_path)
+
+    assert len({store_pl.path, store_en.path, store_bus.path}) == 3
+
+
+def test_network_store_corrupted(tmp_path: Path) -> None:
+    store = NetworkStore(TTSS(base_url=base_url), tmp_path)
+    store.path.write_bytes(b'not a snapshot')
+
+    assert store.load() is None
+
+
+def test_network_store_incompatible(tmp_path: Path) -> None:
+    store = NetworkStore(TTSS(base_url=base_url), tmp_path)
+
+    # pickled by a version whose models no longer exist
+    for data in [b'cttss.Stop\nRemovedModel\n.', b'cttss.removed_module\nStop\n.', b'cttss.Stop\nStop\n(I1\ntR.']:
+        store.path.write_bytes(gzip.compress(data))
+
+        assert store.load() is None
+    assert 'network-v' in store.path.name
+
+
+def test_network_store_stale(network: Mocker, tmp_path: Path) -> None:
+    store = NetworkStore(TTSS(base_url=base_url), tmp_path, max_age=60)
+    store.save(NetworkSnapshot(created_at=time.time() - 120))
+    store = NetworkStore(TTSS(base_url=base_url), tmp_path, max_age=60)
+
+    stale = store.get()
+
+    assert stale.stops == []
+    store.refresh_in_background().join()
+    fresh = store.get()
+    assert len(fresh.stops) == 4
+    assert store.load() == fresh
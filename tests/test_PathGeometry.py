@@ -0,0 +1,68 @@
+import json
+from pathlib import Path as FilePath
+
+import pytest
+
+from ttss import Path, PathGeometry
+from ttss.extractors import extract_path_geometries, extract_paths
+
+resources_dir = FilePath(__file__).parent / 'resources'
+
+
+@pytest.fixture
+def data() -> dict:
+    with open(resources_dir / 'geoserviceDispatcher_pathinfo_route.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_extract_path_geometries(data: dict) -> None:
+    geometries = extract_path_geometries(data)
+
+    assert [len(geometry) for geometry in geometries] == [507, 561]
+    assert [geometry.to_path() for geometry in geometries] == extract_paths(data)
+    assert geometries[0].coordinates.itemsize * len(geometries[0].coordinates) == 507 * 8
+
+
+def test_from_path(data: dict) -> None:
+    path = extract_paths(data)[0]
+
+    assert PathGeometry.from_path(path) == extract_path_geometries(data)[0]
+
+
+def test_polyline() -> None:
+    path = Path(color='#000000', waypoints=[(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)])
+    geometry = PathGeometry.from_path(path)
+
+    encoded = geometry.encode_polyline()
+
+    assert encoded == '_p~iF~ps|U_ulLnnqC_mqNvxq`@'
+    assert PathGeometry.decode_polyline('#000000', encoded) == geometry
+
+
+def test_simplify_straight_line() -> None:
+    path = Path(color='#000000', waypoints=[(50.0, 20.0 + i / 1000) for i in range(100)])
+
+    simplified = PathGeometry.from_path(path).simplify(1.0)
+
+    assert simplified.waypoints == [(50.0, 20.0), (50.0, 20.099)]
+
+
+def test_simplify_keeps_corners() -> None:
+    path = Path(color='#000000', waypoints=[(50.0, 20.0), (50.0, 20.005), (50.0, 20.01), (50.01, 20.01)])
+
+    simplified = PathGeometry.from_path(path).simplify(1.0)
+
+    assert simplified.waypoints == [(50.0, 20.0), (50.0, 20.01), (50.01, 20.01)]
+
+
+def test_lods(data: dict) -> None:
+    geometry = extract_path_geometries(data)[0]
+
+    lods = geometry.lods(range(10, 19))
+
+    sizes = [len(lods[zoom]) for zoom in range(10, 19)]
+    assert sizes == sorted(sizes)
+    assert sizes[0] < len(geometry) // 4
+    assert all(lod.coordinates[:2] == geometry.coordinates[:2] for lod in lods.values())
+    assert all(lod.coordinates[-2:] == geometry.coordinates[-2:] for lod in lods.values())
+    assert geometry.simplify(0) == geometry
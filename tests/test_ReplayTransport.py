@@ -0,0 +1,111 @@
+from pathlib import Path
+from typing import List
+
+from requests_mock.mocker import Mocker
+
+from ttss import RecordingTransport, ReplayTransport, ResponseArchive, Route, TTSS
+from ttss.ResponseArchive import request_key
+
+base_url = 'http://www.ttss.krakow.pl'
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def record(path: Path, requests_mock: Mocker) -> None:
+    url = f'{base_url}/internetservice/services/routeInfo/route'
+    requests_mock.get(url, [
+        {'text': '{"routes": [{"id": "1", "name": "1", "alerts": []}]}'},
+        {'text': '{"routes": [{"id": "2", "name": "2", "alerts": []}]}'},
+    ])
+    requests_mock.get(f'{base_url}/internetservice/services/stopInfo/stop', status_code=404)
+
+    times = iter([1000.0, 1060.0, 1061.0])
+    transport = RecordingTransport(ResponseArchive(path), clock=lambda: next(times))
+    with TTSS(base_url=base_url, transport=transport) as ttss:
+        ttss.get_routes()
+        ttss.get_routes()
+        assert ttss.get_stop(stop_number='1') is None
+
+
+def names(routes: List[Route]) -> List[str]:
+    return [route.name or '' for route in routes]
+
+
+def test_record(tmp_path: Path, requests_mock: Mocker) -> None:
+    record(tmp_path, requests_mock)
+
+    with ResponseArchive(tmp_path) as archive:
+        assert [record.timestamp for record in archive] == [1000.0, 1060.0, 1061.0]
+        assert [record.status_code for record in archive] == [200, 200, 404]
+        assert archive.records[0].url == f'{base_url}/internetservice/services/routeInfo/route'
+        assert archive.records[2].params['stop'] == '1'
+        assert archive.records[2].params['language'] == 'pl'
+
+
+def test_replay_sequential(tmp_path: Path, requests_mock: Mocker) -> None:
+    record(tmp_path, requests_mock)
+    requests_mock.reset()
+
+    with TTSS(base_url=base_url, transport=ReplayTransport(ResponseArchive(tmp_path), speed=None)) as ttss:
+        assert names(ttss.get_routes()) == ['1']
+        assert names(ttss.get_routes()) == ['2']
+        assert names(ttss.get_routes()) == ['2']
+        assert ttss.get_stop(stop_number='1') is None
+        assert ttss.get_stop(stop_number='2') is None
+
+    assert requests_mock.call_count == 0
+
+
+def test_replay_speed(tmp_path: Path, requests_mock: Mocker) -> None:
+    record(tmp_path, requests_mock)
+
+    clock = Clock()
+    transport = ReplayTransport(ResponseArchive(tmp_path), speed=10.0, clock=clock)
+    ttss = TTSS(base_url=base_url, transport=transport)
+
+    assert transport.replay_timestamp == 1000.0
+    assert names(ttss.get_routes()) == ['1']
+    clock.now = 5.9
+    assert names(ttss.get_routes()) == ['1']
+    clock.now = 6.0
+    assert transport.replay_timestamp == 1060.0
+    assert names(ttss.get_routes()) == ['2']
+    assert not transport.finished
+    clock.now = 7.0
+    assert transport.finished
+
+    transport.rewind()
+    assert names(ttss.get_routes()) == ['1']
+
+
+def test_replay_speed_before_first_record(tmp_path: Path, requests_mock: Mocker) -> None:
+    record(tmp_path, requests_mock)
+
+    clock = Clock()
+    transport = ReplayTransport(ResponseArchive(tmp_path), speed=10.0, clock=clock)
+    key = request_key(f'{base_url}/internetservice/services/stopInfo/stop', {'language': 'pl', 'stop': '1'})
+
+    # the stop was first requested at 1061.0
+    assert transport._find(key) is None
+    clock.now = 6.1
+    assert transport._find(key) is transport.archive.records[2]
+
+
+def test_replay_latency(tmp_path: Path, requests_mock: Mocker) -> None:
+    record(tmp_path, requests_mock)
+    with ResponseArchive(tmp_path) as archive:
+        archive.records[0].elapsed = 0.5
+
+        sleeps: List[float] = []
+        transport = ReplayTransport(archive, speed=2.0, simulate_latency=True, clock=Clock(), sleep=sleeps.append)
+        response = transport.get(f'{base_url}/internetservice/services/routeInfo/route', {'language': 'pl'})
+
+    assert sleeps == [0.25]
+    assert response.elapsed.total_seconds() == 0.5
+    assert response.json()['routes'][0]['id'] == '1'
@@ -0,0 +1,84 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from ttss import ArchiveRecord, ResponseArchive
+from ttss.ResponseArchive import DATA_FILE, INDEX_FILE, request_key
+
+
+def test_append_and_read(tmp_path: Path) -> None:
+    with ResponseArchive(tmp_path) as archive:
+        first = archive.append('http://host/a', {'id': 1, 'direction': None}, b'{"first": true}', timestamp=10.0)
+        second = archive.append('http://host/b', {}, b'x' * 10_000, timestamp=11.0, status_code=404,
+                                encoding='utf-8', content_type='application/json', elapsed=0.25)
+
+        assert len(archive) == 2
+        assert archive.read(first) == b'{"first": true}'
+        assert archive.read(second) == b'x' * 10_000
+        assert first.params == {'id': 1}
+        assert second.offset == first.length
+        assert os.path.getsize(tmp_path / DATA_FILE) < 1_000
+
+    with ResponseArchive(tmp_path) as archive:
+        assert list(archive) == [first, second]
+        assert archive.records[1] == ArchiveRecord(timestamp=11.0,
+                                                   url='http://host/b',
+                                                   status_code=404,
+                                                   encoding='utf-8',
+                                                   content_type='application/json',
+                                                   elapsed=0.25,
+                                                   offset=first.length,
+                                                   length=second.length)
+        assert archive.read(second) == b'x' * 10_000
+
+        third = archive.append('http://host/c', {}, b'third', timestamp=12.0)
+
+        assert third.offset == first.length + second.length
+        assert archive.read(third) == b'third'
+        assert archive.read(first) == b'{"first": true}'
+
+
+def test_truncated_index(tmp_path: Path) -> None:
+    with ResponseArchive(tmp_path) as archive:
+        first = archive.append('http://host/a', {}, b'first', timestamp=10.0)
+        archive.append('http://host/b', {}, b'second', timestamp=11.0)
+    index = (tmp_path / INDEX_FILE).read_bytes()
+    # a crash in the middle of writing the second line
+    (tmp_path / INDEX_FILE).write_bytes(index[:-10])
+
+    with ResponseArchive(tmp_path) as archive:
+        assert list(archive) == [first]
+        third = archive.append('http://host/c', {}, b'third', timestamp=12.0)
+
+    with ResponseArchive(tmp_path) as archive:
+        assert list(archive) == [first, third]
+        assert archive.read(third) == b'third'
+
+
+def test_unterminated_index_line(tmp_path: Path) -> None:
+    with ResponseArchive(tmp_path) as archive:
+        first = archive.append('http://host/a', {}, b'first', timestamp=10.0)
+        archive.append('http://host/b', {}, b'second', timestamp=11.0)
+    (tmp_path / INDEX_FILE).write_bytes((tmp_path / INDEX_FILE).read_bytes()[:-1])
+
+    with ResponseArchive(tmp_path) as archive:
+        assert list(archive) == [first]
+        third = archive.append('http://host/c', {}, b'third', timestamp=12.0)
+
+    with ResponseArchive(tmp_path) as archive:
+        assert list(archive) == [first, third]
+
+
+def test_corrupted_index(tmp_path: Path) -> None:
+    with ResponseArchive(tmp_path) as archive:
+        archive.append('http://host/a', {}, b'first', timestamp=10.0)
+    (tmp_path / INDEX_FILE).write_bytes(b'{"broken\n' + (tmp_path / INDEX_FILE).read_bytes())
+
+    with pytest.raises(ValueError):
+        ResponseArchive(tmp_path)
+
+
+def test_request_key() -> None:
+    assert request_key('http://host/a', {'b': 2, 'a': 'x y', 'c': None}) == 'http://host/a?a=x+y&b=2'
+    assert request_key('http://host/a', {'a': 1, 'cacheBuster': 123}, ignore=('cacheBuster',)) == 'http://host/a?a=1'
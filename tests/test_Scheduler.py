@@ -0,0 +1,140 @@
+import asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+import pytz
+from requests_mock.mocker import Mocker
+
+from ttss import Passage, Scheduler, TTSS
+from ttss.Scheduler import passages_interval
+
+base_url = 'http://www.ttss.krakow.pl'
+
+resources_dir = Path(__file__).parent / 'resources'
+
+tz = pytz.timezone('Europe/Warsaw')
+
+now = tz.localize(datetime(2021, 6, 28, 21, 33, 19))
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_register_spreads_first_runs() -> None:
+    clock = Clock()
+    scheduler = Scheduler(TTSS(base_url=base_url), rps=100, clock=clock, seed=1)
+    results: List[Any] = []
+    for i in range(10):
+        scheduler.register(str(i), lambda i=i: i, interval=10, callback=results.append)  # type: ignore[misc]
+
+    runs = []
+    for _ in range(10):
+        clock.now += 1
+        runs.append(scheduler.run_pending())
+
+    assert sorted(results) == list(range(10))
+    assert max(runs) < 10
+    with pytest.raises(ValueError):
+        scheduler.register('1', lambda: None, interval=10)
+
+    clock.now += 11
+
+    assert scheduler.run_pending() == 10
+    assert all(resource.runs == 2 for resource in scheduler.resources.values())
+    assert all(9 <= (resource.current_interval or 0) <= 11 for resource in scheduler.resources.values())
+
+
+def test_requests_per_second_budget() -> None:
+    clock = Clock()
+    scheduler = Scheduler(TTSS(base_url=base_url), rps=2, clock=clock)
+    for i in range(5):
+        scheduler.register(str(i), lambda: None, interval=1)
+    clock.now = 1
+
+    assert scheduler.run_pending() == 2
+    assert scheduler.run_pending() == 0
+
+    clock.now += 0.5
+
+    assert scheduler.run_pending() == 1
+
+
+def test_adapt_and_backoff() -> None:
+    clock = Clock()
+    scheduler = Scheduler(TTSS(base_url=base_url), clock=clock, jitter=0)
+    errors: List[Exception] = []
+
+    def fail() -> None:
+        raise RuntimeError('upstream')
+
+    adaptive = scheduler.register('adaptive', lambda: 3, interval=10, adapt=lambda result: result * 100)
+    failing = scheduler.register('failing', fail, interval=10, on_error=errors.append)
+    clock.now = 10
+    scheduler.run_pending()
+
+    assert adaptive.current_interval == 300
+    assert adaptive.next_run == 310
+    assert failing.current_interval == 20
+    assert failing.failures == 1
+    assert isinstance(failing.last_error, RuntimeError)
+    assert errors == [failing.last_error]
+
+    scheduler.unregister('failing')
+    clock.now = 100
+
+    assert scheduler.run_pending() == 0
+
+
+def test_passages_interval() -> None:
+    def passage(minutes: float, old: bool = False) -> Passage:
+        return Passage(old=old, dt=now + timedelta(minutes=minutes))
+
+    kwargs = {'interval': 10.0, 'fast_interval': 5.0, 'slow_interval': 120.0, 'soon': 120.0, 'now': now}
+    assert passages_interval([passage(1), passage(10)], **kwargs) == 5  # type: ignore[arg-type]
+    assert passages_interval([passage(-1, old=True), passage(10)], **kwargs) == 10  # type: ignore[arg-type]
+    assert passages_interval([passage(-1, old=True)], **kwargs) == 120  # type: ignore[arg-type]
+
+
+@pytest.mark.freeze_time(datetime(2021, 6, 28, 21, 33, 19).replace(tzinfo=tz))
+def test_poll_stop_passages(requests_mock: Mocker) -> None:
+    with open(resources_dir / 'passageInfo_stopPassages_stop.json', 'r', encoding='utf-8') as f:
+        requests_mock.get(f'{base_url}/internetservice/services/passageInfo/stopPassages/stop', text=f.read())
+    clock = Clock()
+    scheduler = Scheduler(TTSS(base_url=base_url), clock=clock, jitter=0)
+    results: List[Any] = []
+    resource = scheduler.poll_stop_passages('3242', interval=30, callback=results.append)
+    clock.now = 30
+
+    assert scheduler.run_pending() == 1
+    assert resource.key == 'stop_passages:3242'
+    assert requests_mock.last_request.qs['stop'] == ['3242']  # type: ignore[union-attr]
+    assert len(results[0][2]) == 65
+    assert resource.current_interval == 5
+
+
+def test_stream() -> None:
+    scheduler = Scheduler(TTSS(base_url=base_url), rps=1000)
+    counter = iter(range(1000))
+    scheduler.register('counter', lambda: next(counter), interval=0.01, min_interval=0.01)
+
+    async def collect() -> List[Any]:
+        results = []
+        async for result in scheduler.stream('counter'):
+            results.append(result)
+            if len(results) == 3:
+                break
+        return results
+
+    with scheduler:
+        results = asyncio.run(collect())
+
+    assert len(results) == 3
+    assert results == sorted(results)
+    assert scheduler.resources['counter'].callbacks == []
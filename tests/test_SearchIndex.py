@@ -0,0 +1,84 @@
+import pytest
+
+from ttss import SearchIndex, Stop, StopPoint
+from ttss.SearchIndex import fold
+
+stops = [
+    Stop(id='1', name='Dworcowa', number='623'),
+    Stop(id='2', name='Dworzec Główny', number='131'),
+    Stop(id='3', name='Dworzec Główny Tunel', number='1173'),
+    Stop(id='4', name='Dworzec Główny Zachód', number='2608'),
+    Stop(id='5', name='Dworzec Płaszów Estakada', number='2870'),
+    Stop(id='6', name='Dworzec Towarowy', number='70'),
+    Stop(id='7', name='Nowy Bieżanów P+R', number='3175'),
+    Stop(id='8', name='Łagiewniki', number='456'),
+    Stop(id='9', name='Plac Centralny im. R.Reagana', number='358'),
+]
+
+stop_points = [
+    StopPoint(id='11', name='Dworzec Główny (13139)', code='13139'),
+    StopPoint(id='12', name='Dworzec Główny Zachód (260829)', code='260829'),
+]
+
+
+@pytest.fixture
+def index() -> SearchIndex:
+    return SearchIndex(stops, stop_points)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Dworzec Główny', 'dworzec glowny'),
+    ('ŁAGIEWNIKI', 'lagiewniki'),
+    ('Nowy Bieżanów P+R', 'nowy biezanow p r'),
+    ('  Plac  Centralny im. R.Reagana ', 'plac centralny im r reagana'),
+])
+def test_fold(text: str, expected: str) -> None:
+    assert fold(text) == expected
+
+
+def test_search_prefix(index: SearchIndex) -> None:
+    assert index.search('dwor') == [
+        Stop(name='Dworcowa', number='623'),
+        Stop(name='Dworzec Główny', number='131'),
+        StopPoint(name='Dworzec Główny (13139)', code='13139'),
+        Stop(name='Dworzec Główny Tunel', number='1173'),
+        Stop(name='Dworzec Główny Zachód', number='2608'),
+        StopPoint(name='Dworzec Główny Zachód (260829)', code='260829'),
+        Stop(name='Dworzec Płaszów Estakada', number='2870'),
+        Stop(name='Dworzec Towarowy', number='70'),
+    ]
+
+
+def test_search_diacritics(index: SearchIndex) -> None:
+    assert index.search('Dworzec Glowny', limit=2) == [
+        Stop(name='Dworzec Główny', number='131'),
+        StopPoint(name='Dworzec Główny (13139)', code='13139'),
+    ]
+    assert index.search('lagiew') == [Stop(name='Łagiewniki', number='456')]
+
+
+def test_search_word_prefix(index: SearchIndex) -> None:
+    assert index.search('glowny zach') == [
+        Stop(name='Dworzec Główny Zachód', number='2608'),
+        StopPoint(name='Dworzec Główny Zachód (260829)', code='260829'),
+    ]
+    assert index.search('reagana') == [Stop(name='Plac Centralny im. R.Reagana', number='358')]
+
+
+def test_search_code(index: SearchIndex) -> None:
+    assert index.search('2608') == [
+        Stop(name='Dworzec Główny Zachód', number='2608'),
+        StopPoint(name='Dworzec Główny Zachód (260829)', code='260829'),
+    ]
+
+
+def test_search_fuzzy(index: SearchIndex) -> None:
+    assert index.search('Dworzek Towarowy')[0] == Stop(name='Dworzec Towarowy', number='70')
+    assert index.search('xyz') == []
+    assert index.search('  ') == []
+
+
+def test_search_deduplicates() -> None:
+    index = SearchIndex(stops + stops)
+
+    assert len(index) == len(stops)
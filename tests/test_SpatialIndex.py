@@ -0,0 +1,97 @@
+import random
+from pathlib import Path
+
+import pytest
+from requests_mock.mocker import Mocker
+
+from ttss import SpatialIndex, Stop, StopPoint, TTSS
+from ttss.utils import haversine
+
+base_url = 'http://www.ttss.krakow.pl'
+
+resources_dir = Path(__file__).parent / 'resources'
+
+
+@pytest.fixture
+def stops() -> list:
+    rng = random.Random(42)
+    return [
+        Stop(number=str(i), latitude=rng.uniform(49.95, 50.15), longitude=rng.uniform(19.75, 20.20))
+        for i in range(2000)
+    ]
+
+
+def test_nearest(stops: list) -> None:
+    index = SpatialIndex(stops)
+
+    for latitude, longitude in [(50.0614, 19.9366), (50.0, 19.8), (50.2, 20.3), (49.0, 19.0)]:
+        expected = sorted(stops, key=lambda stop: haversine(latitude, longitude, stop.latitude, stop.longitude))[:5]
+        actual = index.nearest(latitude, longitude, k=5)
+        assert [stop for _, stop in actual] == expected
+        assert actual[0][0] == haversine(latitude, longitude, expected[0].latitude, expected[0].longitude)
+
+
+def test_nearest_max_distance(stops: list) -> None:
+    index = SpatialIndex(stops)
+
+    assert index.nearest(49.0, 19.0, k=3, max_distance=1000) == []
+    assert len(index.nearest(50.05, 19.95, k=3, max_distance=1000)) == 3
+
+
+def test_nearest_ties_across_rings() -> None:
+    stops = [Stop(latitude=0.5, longitude=longitude) for longitude in (0.125, 0.8125, 0.75, 1.0)]
+    index = SpatialIndex(stops, cell_size=1.0)
+
+    result = index.nearest(0.5, 0.875, k=2)
+
+    # 0.75 and 1.0 are equally far, and are found in different rings
+    assert result[0][1].longitude == 0.8125
+    assert result[1][1].longitude in (0.75, 1.0)
+    assert result[1][0] == pytest.approx(haversine(0.5, 0.875, 0.5, 1.0))
+
+
+def test_within_radius(stops: list) -> None:
+    index = SpatialIndex(stops)
+
+    for radius in [0, 300, 1500, 10_000]:
+        expected = {
+            stop.number for stop in stops
+            if haversine(50.0614, 19.9366, stop.latitude, stop.longitude) <= radius
+        }
+        actual = index.within_radius(50.0614, 19.9366, radius)
+        assert {stop.number for _, stop in actual} == expected
+        assert [distance for distance, _ in actual] == sorted(distance for distance, _ in actual)
+
+
+def test_within_bbox(stops: list) -> None:
+    index = SpatialIndex(stops)
+
+    for bbox in [(50.06, 19.93, 50.07, 19.95), (49.0, 19.0, 51.0, 21.0), (50.5, 20.5, 50.6, 20.6)]:
+        min_latitude, min_longitude, max_latitude, max_longitude = bbox
+        expected = {
+            stop.number for stop in stops
+            if min_latitude <= stop.latitude <= max_latitude and min_longitude <= stop.longitude <= max_longitude
+        }
+        assert {stop.number for stop in index.within_bbox(*bbox)} == expected
+
+
+def test_empty_index() -> None:
+    index: SpatialIndex[Stop] = SpatialIndex([Stop(number='1')])
+
+    assert len(index) == 0
+    assert index.nearest(50.0, 20.0) == []
+    assert index.within_radius(50.0, 20.0, 1000) == []
+    assert index.within_bbox(49.0, 19.0, 51.0, 21.0) == []
+
+
+def test_stop_points_index(requests_mock: Mocker) -> None:
+    with open(resources_dir / 'geoserviceDispatcher_stopinfo_stopPoints.json', 'r', encoding='utf-8') as f:
+        data = f.read()
+    requests_mock.get(f'{base_url}/internetservice/geoserviceDispatcher/services/stopinfo/stopPoints', text=data)
+    index: SpatialIndex[StopPoint] = SpatialIndex(TTSS(base_url=base_url).get_stop_points())
+
+    (distance, stop_point), = index.nearest(50.0642325, 19.945034166666666)
+
+    assert len(index) == 12
+    assert distance == 0.0
+    assert stop_point.code == '13139'
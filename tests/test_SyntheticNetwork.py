@@ -0,0 +1,65 @@
+from datetime import datetime
+
+import pytz
+
+from ttss.testing import SyntheticNetwork
+
+tz = pytz.timezone('Europe/Warsaw')
+
+now = tz.localize(datetime(2021, 6, 28, 12, 0, 19))
+
+
+def test_deterministic() -> None:
+    network = SyntheticNetwork(seed=1)
+
+    assert network.stop_names == SyntheticNetwork(seed=1).stop_names
+    assert network.route_sequences == SyntheticNetwork(seed=1).route_sequences
+    assert network.route_sequences != SyntheticNetwork(seed=2).route_sequences
+    assert len(set(network.stop_names)) == network.stops
+    assert all(len(set(sequence)) == network.stops_per_route for sequence in network.route_sequences)
+
+
+def test_identifiers() -> None:
+    network = SyntheticNetwork()
+
+    assert network.stop_index(network.stop_number(123)) == 123
+    assert network.stop_index('0') is None
+    assert network.stop_index('abc') is None
+    assert network.stop_point_index(network.stop_point_code(123, 1)) == (123, 1)
+    assert network.route_index(network.route_id(7)) == 7
+    assert network.trip_index(network.trip_id(7, 1, 42)) == (7, 1, 42)
+    assert network.vehicle_trip_id(network.vehicle_id(7, 1, 42)) == network.trip_id(7, 1, 42)
+
+
+def test_stop_passages_match_trips() -> None:
+    network = SyntheticNetwork()
+    stop = network.route_sequences[0][3]
+
+    data = network.stop_passages(stop, now)
+
+    assert data['stopName'] == network.stop_names[stop]
+    assert data['actual']
+    relative_times = [passage['actualRelativeTime'] for passage in data['old'] + data['actual']]
+    assert relative_times == sorted(relative_times)
+    for passage in data['old'] + data['actual']:
+        trip = network.trip_passages(passage['tripId'], now)
+        assert trip is not None
+        times = {item['stop']['shortName']: item['plannedTime'] for item in trip['old'] + trip['actual']}
+        assert times[network.stop_number(stop)] == passage['plannedTime']
+        assert trip['directionText'] == passage['direction']
+
+
+def test_vehicles_follow_timetable() -> None:
+    network = SyntheticNetwork()
+
+    vehicles = network.vehicles(now)['vehicles']
+
+    duration = (network.stops_per_route - 1) * network.minutes_between_stops
+    assert abs(len(vehicles) - network.routes * 2 * duration / network.headway) <= network.routes * 2
+    for vehicle in vehicles:
+        index = network.trip_index(vehicle['tripId'])
+        assert index is not None
+        route, direction, trip = index
+        assert vehicle['name'] == f'{route + 1} {network.direction_name(route, direction)}'
+        assert network.departure(trip) <= 12 * 60 + 1
+    assert network.vehicles(tz.localize(datetime(2021, 6, 28, 2, 0)))['vehicles'] == []
@@ -3,7 +3,10 @@ from pathlib import Path
 
 import pytest
 import pytz
+from requests import HTTPError
 from requests_mock.mocker import Mocker
+from requests_mock.request import _RequestObjectProxy
+from requests_mock.response import _Context
 
 from ttss import Passage, Route, Status, Stop, StopPoint, Trip, TTSS, Vehicle
 
@@ -231,6 +234,8 @@ def test_get_stop_passages(ttss: TTSS, requests_mock: Mocker) -> None:
                                   trip=expected_trip,
                                   route=expected_route,
                                   vehicle=expected_vehicle)
+    assert passages[2].planned_dt == tz.localize(datetime(2021, 6, 28, 21, 32))
+    assert passages[2].actual_dt == tz.localize(datetime(2021, 6, 28, 21, 33))
 
     expected_route = Route(id='8059228650286874686', name='24')
     expected_trip = Trip(id='8059232507168155665', route=expected_route, direction='Kurdwanów P+R')
@@ -331,6 +336,77 @@ def test_get_stop_point_passages(ttss: TTSS, requests_mock: Mocker) -> None:
                                   vehicle=expected_vehicle)
 
 
+@pytest.mark.freeze_time(datetime(2021, 6, 28, 21, 33, 19).replace(tzinfo=tz))
+def test_get_many_stop_passages(ttss: TTSS, requests_mock: Mocker) -> None:
+    with open(resources_dir / 'passageInfo_stopPassages_stop.json', 'r', encoding='utf-8') as f:
+        data = f.read()
+
+    def callback(request: _RequestObjectProxy, context: _Context) -> str:
+        if request.qs['stop'] == ['9999']:
+            context.status_code = 500
+            return ''
+        return data
+
+    requests_mock.get(f'{base_url}/internetservice/services/passageInfo/stopPassages/stop', text=callback)
+
+    results = ttss.get_many_stop_passages(['3242', '9999', '131'], max_workers=2)
+
+    assert list(results) == ['3242', '9999', '131']
+    assert isinstance(results['9999'], HTTPError)
+    first, second = results['3242'], results['131']
+    assert not isinstance(first, Exception) and not isinstance(second, Exception)
+    assert len(first[2]) == len(second[2]) == 65
+    assert [passage.dt for passage in first[2]] == [passage.dt for passage in second[2]]
+    assert first[2][2].dt == datetime(2021, 6, 28, 21, 33).replace(tzinfo=tz)
+
+
+@pytest.mark.freeze_time(datetime(2021, 6, 28, 21, 33, 19).replace(tzinfo=tz))
+def test_get_many_stop_point_passages(ttss: TTSS, requests_mock: Mocker) -> None:
+    with open(resources_dir / 'passageInfo_stopPassages_stopPoint.json', 'r', encoding='utf-8') as f:
+        data = f.read()
+    requests_mock.get(f'{base_url}/internetservice/services/passageInfo/stopPassages/stopPoint', text=data)
+
+    results = ttss.get_many_stop_point_passages(['324239', '324229'])
+
+    assert set(results) == {'324239', '324229'}
+    for result in results.values():
+        assert not isinstance(result, Exception)
+        stop, routes, passages = result
+        assert stop == Stop(name='Teatr Słowackiego')
+        assert len(passages) == 16
+
+
+@pytest.mark.freeze_time(datetime(2021, 6, 28, 21, 33, 19).replace(tzinfo=tz))
+def test_iter_stop_passages(ttss: TTSS, requests_mock: Mocker) -> None:
+    with open(resources_dir / 'passageInfo_stopPassages_stop.json', 'r', encoding='utf-8') as f:
+        data = f.read()
+    requests_mock.get(f'{base_url}/internetservice/services/passageInfo/stopPassages/stop', text=data)
+
+    _, _, expected = ttss.get_stop_passages(stop_number='3242')
+
+    assert list(ttss.iter_stop_passages(stop_number='3242')) == expected
+    assert list(ttss.iter_stop_passages(stop_number='3242', old=False)) == expected[2:]
+    assert list(ttss.iter_stop_passages(stop_number='3242', limit=3)) == expected[:3]
+
+    passages = ttss.iter_stop_passages(stop_number='3242',
+                                       old=False,
+                                       predicate=lambda passage: passage.route is not None and passage.route.name == '14',
+                                       limit=2)
+    assert [passage.id for passage in passages] == ['-1188950300820635578', expected[10].id]
+
+
+@pytest.mark.freeze_time(datetime(2021, 6, 28, 21, 33, 19).replace(tzinfo=tz))
+def test_iter_stop_point_passages(ttss: TTSS, requests_mock: Mocker) -> None:
+    with open(resources_dir / 'passageInfo_stopPassages_stopPoint.json', 'r', encoding='utf-8') as f:
+        data = f.read()
+    requests_mock.get(f'{base_url}/internetservice/services/passageInfo/stopPassages/stopPoint', text=data)
+
+    _, _, expected = ttss.get_stop_point_passages(stop_point_code='324201')
+
+    assert list(ttss.iter_stop_point_passages(stop_point_code='324201')) == expected
+    assert list(ttss.iter_stop_point_passages(stop_point_code='324201', limit=1)) == expected[:1]
+
+
 def test_get_trip_passages_actual(ttss: TTSS, requests_mock: Mocker) -> None:
     with open(resources_dir / 'tripInfo_tripPassages_actual.json', 'r', encoding='utf-8') as f:
         data = f.read()
@@ -447,6 +523,23 @@ def test_get_route_paths(ttss: TTSS, requests_mock: Mocker) -> None:
     assert paths[1].waypoints[560] == (50.09481611111111, 20.065258888888888)
 
 
+def test_iter_route_paths(ttss: TTSS, requests_mock: Mocker) -> None:
+    with open(resources_dir / 'geoserviceDispatcher_pathinfo_route.json', 'r', encoding='utf-8') as f:
+        data = f.read()
+    requests_mock.get(f'{base_url}/internetservice/geoserviceDispatcher/services/pathinfo/route', text=data)
+
+    paths = list(ttss.iter_route_paths(route_id='route_id', predicate=lambda path: len(path.waypoints) > 507))
+
+    assert len(paths) == 1
+    assert len(paths[0].waypoints) == 561
+
+
+def test_iter_route_paths_not_found(ttss: TTSS, requests_mock: Mocker) -> None:
+    requests_mock.get(f'{base_url}/internetservice/geoserviceDispatcher/services/pathinfo/route', status_code=404)
+
+    assert list(ttss.iter_route_paths(route_id='route_id')) == []
+
+
 def test_get_vehicle_paths(ttss: TTSS, requests_mock: Mocker) -> None:
     with open(resources_dir / 'geoserviceDispatcher_pathinfo_vehicle.json', 'r', encoding='utf-8') as f:
         data = f.read()
@@ -495,3 +588,19 @@ def test_get_vehicles(ttss: TTSS, requests_mock: Mocker) -> None:
                                     trip=Trip(id='8059232507168536594',
                                               route=Route(name='1'),
                                               direction='Zajezdnia Nowa Huta'))
+
+
+def test_iter_vehicles(ttss: TTSS, requests_mock: Mocker) -> None:
+    with open(resources_dir / 'geoserviceDispatcher_vehicleinfo_vehicles.json', 'r', encoding='utf-8') as f:
+        data = f.read()
+    requests_mock.get(f'{base_url}/internetservice/geoserviceDispatcher/services/vehicleinfo/vehicles', text=data)
+
+    vehicles = ttss.iter_vehicles(predicate=lambda vehicle: vehicle.active is True)
+
+    assert next(vehicles).active
+    assert len(list(vehicles)) == 128
+
+    trams = list(ttss.iter_vehicles(predicate=lambda vehicle: vehicle.category == 'tram', limit=5))
+
+    assert len(trams) == 5
+    assert all(tram.category == 'tram' for tram in trams)
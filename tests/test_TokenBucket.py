@@ -0,0 +1,19 @@
+from ttss import TokenBucket
+
+
+def test_token_bucket() -> None:
+    now = [0.0]
+    bucket = TokenBucket(rate=2, clock=lambda: now[0])
+
+    assert bucket.consume() == 0
+    assert bucket.consume() == 0
+    assert bucket.consume() == 0.5
+
+    now[0] += 0.5
+
+    assert bucket.consume() == 0
+    assert bucket.consume() == 0.5
+
+    now[0] += 10
+
+    assert [bucket.consume() for _ in range(3)] == [0, 0, 0.5]
@@ -0,0 +1,121 @@
+import json
+import threading
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from ttss import TrajectoryPoint, TrajectoryStore, Trip, Vehicle
+from ttss.extractors import extract_vehicles
+
+resources_dir = Path(__file__).parent / 'resources'
+
+start = 1624908805962
+
+
+def snapshot(i: int) -> List[Vehicle]:
+    return [
+        Vehicle(id='a', active=True, latitude=50.0 + i / 1000, longitude=19.9, heading=90,
+                trip=Trip(id=f'trip-{i // 10}')),
+        Vehicle(id='b', active=True, latitude=50.1, longitude=20.0 + i / 1000),
+        Vehicle(id='deleted', active=False),
+    ]
+
+
+def test_trajectory_store(tmp_path: Path) -> None:
+    with TrajectoryStore(tmp_path, segment_duration=60_000) as store:
+        for i in range(30):
+            assert store.append(snapshot(i), timestamp=start + i * 5_000) == 2
+
+        assert len(store.segments) == 2
+        assert store.vehicle_ids() == {'a', 'b'}
+        points = store.trajectory('a', start + 10_000, start + 100_000)
+        assert [point.timestamp for point in points] == [start + i * 5_000 for i in range(2, 20)]
+        assert points[0] == TrajectoryPoint(vehicle_id='a', timestamp=start + 10_000, latitude=50.002, longitude=19.9,
+                                            heading=90, trip_id='trip-0')
+        assert points[-1].trip_id == 'trip-1'
+        assert len(store.trajectory('a', start, start + 150_000)) == 30
+        assert store.trajectory('unknown', start, start + 150_000) == []
+
+        position = store.position('b', start + 12_000)
+        assert position is not None
+        assert position.timestamp == start + 10_000
+        assert position.heading is None and position.trip_id is None
+        assert store.position('b', start + 12_000, max_age=1_000) is None
+        assert store.position('b', start - 1) is None
+
+        inside = store.vehicles_in_box(start + 100_000, 50.0, 19.8, 50.05, 19.95)
+        assert [(point.vehicle_id, point.timestamp) for point in inside] == [('a', start + 100_000)]
+        assert len(store.vehicles_in_box(start + 100_000, 49, 19, 51, 21)) == 2
+        assert store.vehicles_in_box(start + 500_000, 49, 19, 51, 21) == []
+
+        with pytest.raises(ValueError):
+            store.append(snapshot(0), timestamp=start)
+
+    with TrajectoryStore(tmp_path, segment_duration=60_000) as store:
+        assert len(store.segments) == 3
+        assert len(store.trajectory('a', start, start + 150_000)) == 30
+        store.append(snapshot(30), timestamp=start + 150_000)
+        assert len(store.trajectory('a', start, start + 200_000)) == 31
+
+    with TrajectoryStore(tmp_path) as store:
+        assert len(store.segments) == 4
+
+
+def test_trajectory_store_vehicles(tmp_path: Path) -> None:
+    with open(resources_dir / 'geoserviceDispatcher_vehicleinfo_vehicles.json', 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    vehicles = extract_vehicles(data)
+
+    with TrajectoryStore(tmp_path) as store:
+        count = store.append(vehicles, timestamp=data['lastUpdate'])
+        store.flush()
+
+        points = store.vehicles_in_box(data['lastUpdate'], -90, -180, 90, 180)
+        assert len(points) == count
+        expected = {
+            vehicle.id: vehicle for vehicle in vehicles
+            if vehicle.active and vehicle.latitude is not None and vehicle.longitude is not None
+        }
+        for point in points:
+            vehicle = expected[point.vehicle_id]
+            assert point.latitude == pytest.approx(vehicle.latitude)
+            assert point.longitude == pytest.approx(vehicle.longitude)
+            assert point.heading == vehicle.heading
+            assert point.trip_id == (vehicle.trip.id if vehicle.trip is not None else None)
+
+
+def test_trajectory_store_buffer_limits(tmp_path: Path) -> None:
+    store = TrajectoryStore(tmp_path, max_buffer_rows=10, max_buffer_age=20_000)
+    for i in range(12):
+        store.append(snapshot(i), timestamp=start + i * 1_000)
+
+    # sealed after 10 rows, before the crash
+    assert len(store.segments) == 2
+    with TrajectoryStore(tmp_path) as reopened:
+        assert len(reopened.trajectory('a', start, start + 60_000)) == 10
+
+    store.append(snapshot(12), timestamp=start + 30_000)
+
+    assert len(store.segments) == 3
+    assert len(store.trajectory('a', start, start + 60_000)) == 13
+    store.close()
+
+
+def test_trajectory_store_close_waits_for_queries(tmp_path: Path) -> None:
+    store = TrajectoryStore(tmp_path)
+    store.append(snapshot(0), timestamp=start)
+    store.flush()
+
+    with store._overlapping(start, start) as segments:
+        closing = threading.Thread(target=store.close)
+        closing.start()
+        closing.join(0.05)
+
+        assert closing.is_alive()
+        assert segments[0].point('a', 0).latitude == 50.0
+
+    closing.join()
+    assert not closing.is_alive()
+    with pytest.raises(ValueError):
+        store.trajectory('a', start, start + 1)
@@ -0,0 +1,67 @@
+from unittest.mock import patch
+
+from requests.adapters import HTTPAdapter
+from requests_mock.mocker import Mocker
+
+from ttss import Transport, TTSS
+
+base_url = 'http://www.ttss.krakow.pl'
+
+
+def test_transport_pool() -> None:
+    transport = Transport(pool_connections=4, pool_maxsize=32, max_retries=5, backoff_factor=0.5)
+
+    adapter = transport.session.get_adapter(base_url)
+    assert isinstance(adapter, HTTPAdapter)
+    assert adapter._pool_connections == 4  # type: ignore[attr-defined]
+    assert adapter._pool_maxsize == 32  # type: ignore[attr-defined]
+    assert adapter.max_retries.total == 5
+    assert adapter.max_retries.backoff_factor == 0.5
+
+
+def test_transport_headers() -> None:
+    transport = Transport(headers={'User-Agent': 'ttss-test'})
+
+    assert transport.session.headers['User-Agent'] == 'ttss-test'
+
+
+def test_ttss_reuses_session(requests_mock: Mocker) -> None:
+    requests_mock.get(f'{base_url}/internetservice/services/routeInfo/route', text='{"routes": []}')
+    ttss = TTSS(base_url=base_url)
+
+    with patch.object(ttss.transport.session, 'get', wraps=ttss.transport.session.get) as get:
+        ttss.get_routes()
+        ttss.get_routes()
+
+    assert get.call_count == 2
+    assert requests_mock.call_count == 2
+
+
+def test_ttss_passes_options(requests_mock: Mocker) -> None:
+    requests_mock.get(f'{base_url}/internetservice/services/routeInfo/route', text='{"routes": []}')
+    ttss = TTSS(base_url=base_url, options={'timeout': 3})
+
+    ttss.get_routes()
+
+    assert requests_mock.last_request is not None
+    assert requests_mock.last_request.timeout == 3
+
+
+def test_transport_timeout(requests_mock: Mocker) -> None:
+    requests_mock.get(f'{base_url}/internetservice/services/routeInfo/route', text='{"routes": []}')
+
+    TTSS(base_url=base_url).get_routes()
+    assert requests_mock.last_request is not None
+    assert requests_mock.last_request.timeout == 10.0
+
+    TTSS(base_url=base_url, transport=Transport(timeout=None)).get_routes()
+    assert requests_mock.last_request.timeout is None
+
+
+def test_ttss_context_manager() -> None:
+    ttss = TTSS(base_url=base_url)
+
+    with patch.object(ttss.transport.session, 'close') as close:
+        with ttss as entered:
+            assert entered is ttss
+        close.assert_called_once_with()
@@ -0,0 +1,169 @@
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+import pytz
+
+from requests_mock.mocker import Mocker
+from requests_mock.request import _RequestObjectProxy
+from requests_mock.response import _Context
+
+from ttss import Route, Trip, TripDetailService, TTSS, Vehicle, VehicleChanges, VehicleTracker
+from ttss.testing import MockServer, SyntheticNetwork
+
+base_url = 'http://www.ttss.krakow.pl'
+
+resources_dir = Path(__file__).parent / 'resources'
+
+trip_url = f'{base_url}/internetservice/services/tripInfo/tripPassages'
+
+paths_url = f'{base_url}/internetservice/geoserviceDispatcher/services/pathinfo/vehicle'
+
+
+def mock(requests_mock: Mocker) -> None:
+    with open(resources_dir / 'tripInfo_tripPassages_actual.json', 'r', encoding='utf-8') as f:
+        trip_data = f.read()
+    with open(resources_dir / 'geoserviceDispatcher_pathinfo_route.json', 'r', encoding='utf-8') as f:
+        paths_data = f.read()
+
+    def slow(data: str) -> Callable[[_RequestObjectProxy, _Context], str]:
+        def callback(request: _RequestObjectProxy, context: _Context) -> str:
+            time.sleep(0.05)
+            return data
+        return callback
+
+    requests_mock.get(trip_url, text=slow(trip_data))
+    requests_mock.get(paths_url, text=slow(paths_data))
+
+
+def test_trip_detail(requests_mock: Mocker) -> None:
+    mock(requests_mock)
+
+    with TripDetailService(TTSS(base_url=base_url)) as service:
+        detail = service.get('8059232507168536594', vehicle_id='-1188950296502609818')
+
+        assert detail.trip_id == '8059232507168536594'
+        assert detail.vehicle_id == '-1188950296502609818'
+        assert detail.trip is not None and detail.trip.direction == 'Bronowice Małe'
+        assert len(detail.passages) == 13
+        assert len(detail.paths) == 2
+        history = requests_mock.request_history
+        assert {request.url.split('?')[0] for request in history} == {trip_url, paths_url}
+        assert service.get('8059232507168536594', vehicle_id='-1188950296502609818') is detail
+        assert requests_mock.call_count == 2
+
+        assert service.get('other').paths == []
+        assert requests_mock.call_count == 3
+
+
+def test_trip_detail_by_vehicle(requests_mock: Mocker) -> None:
+    mock(requests_mock)
+
+    with TripDetailService(TTSS(base_url=base_url)) as service:
+        without_vehicle = service.get('8059232507168536594')
+        with_vehicle = service.get('8059232507168536594', vehicle_id='-1188950296502609818')
+
+        assert without_vehicle.paths == []
+        assert with_vehicle.vehicle_id == '-1188950296502609818'
+        assert len(with_vehicle.paths) == 2
+        assert requests_mock.call_count == 3
+
+        service.invalidate('8059232507168536594')
+
+        assert service.cache.hits == 0
+        assert len(service.cache) == 0
+
+
+def test_trip_detail_concurrent_fetch() -> None:
+    network = SyntheticNetwork(stops=20, routes=2, stops_per_route=10)
+    now = pytz.timezone('Europe/Warsaw').localize(datetime(2021, 6, 28, 12, 0, 19))
+
+    with MockServer(network, latency=0.1, clock=lambda: now) as server:
+        ttss = TTSS(base_url=server.base_url)
+        vehicle = network.vehicles(now)['vehicles'][0]
+        with TripDetailService(ttss) as service:
+            started = time.perf_counter()
+            detail = service.get(vehicle['tripId'], vehicle_id=vehicle['id'])
+            elapsed = time.perf_counter() - started
+
+    assert server.requests == 2
+    assert elapsed < 0.19
+    assert len(detail.passages) == 10
+    assert len(detail.paths) == 1
+
+
+def test_trip_detail_coalescing(requests_mock: Mocker) -> None:
+    mock(requests_mock)
+    service = TripDetailService(TTSS(base_url=base_url))
+    results = []
+
+    def get() -> None:
+        results.append(service.get('8059232507168536594', vehicle_id='-1188950296502609818'))
+
+    threads = [threading.Thread(target=get) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    service.close()
+
+    assert len(results) == 20
+    assert all(result is results[0] for result in results)
+    assert requests_mock.call_count == 2
+    assert service.cache.misses == 1
+    assert service.cache.hits + service.cache.coalesced == 19
+
+
+def test_trip_detail_invalidation(requests_mock: Mocker) -> None:
+    mock(requests_mock)
+    service = TripDetailService(TTSS(base_url=base_url))
+    detail = service.get('8059232507168536594')
+    trip = Trip(id='8059232507168536594', route=Route(name='24'), direction='Bronowice Małe')
+
+    assert service.apply(VehicleChanges(added=[Vehicle(id='1', trip=trip)])) == 0
+    assert service.get('8059232507168536594') is detail
+
+    assert service.apply(VehicleChanges(updated=[Vehicle(id='1', trip=trip), Vehicle(id='2')])) == 1
+    assert service.get('8059232507168536594') is not detail
+    assert requests_mock.call_count == 2
+
+
+def test_trip_detail_invalidation_on_trip_switch(requests_mock: Mocker) -> None:
+    mock(requests_mock)
+    service = TripDetailService(TTSS(base_url=base_url))
+    tracker = VehicleTracker(TTSS(base_url=base_url))
+    tracker.apply(None, [Vehicle(id='1', active=True, trip=Trip(id='8059232507168536594'))])
+    detail = service.get('8059232507168536594', vehicle_id='1')
+    other = service.get('other')
+
+    changes = tracker.apply(None, [Vehicle(id='1', active=True, trip=Trip(id='other'))])
+
+    assert changes.previous[0].trip == Trip(id='8059232507168536594')
+    assert service.apply(changes) == 2
+    assert service.get('8059232507168536594', vehicle_id='1') is not detail
+    assert service.get('other') is not other
+    service.close()
+
+
+def test_trip_detail_invalidation_during_fetch(requests_mock: Mocker) -> None:
+    with open(resources_dir / 'tripInfo_tripPassages_actual.json', 'r', encoding='utf-8') as f:
+        data = f.read()
+    trip = Trip(id='8059232507168536594')
+    service = TripDetailService(TTSS(base_url=base_url))
+
+    def callback(request: _RequestObjectProxy, context: _Context) -> str:
+        # the vehicle moves while the first fetch is in flight
+        if requests_mock.call_count == 1:
+            service.apply(VehicleChanges(updated=[Vehicle(id='1', trip=trip)]))
+        return data
+
+    requests_mock.get(trip_url, text=callback)
+
+    first = service.get('8059232507168536594')
+    second = service.get('8059232507168536594')
+
+    assert second is not first
+    assert service.get('8059232507168536594') is second
+    assert requests_mock.call_count == 2
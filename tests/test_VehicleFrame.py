@@ -0,0 +1,76 @@
+import json
+from math import isnan
+from pathlib import Path
+
+from requests_mock.mocker import Mocker
+
+from ttss import TTSS, VehicleFrame
+from ttss.extractors import extract_vehicle_frame, extract_vehicles
+
+base_url = 'http://www.ttss.krakow.pl'
+
+resources_dir = Path(__file__).parent / 'resources'
+
+
+def load() -> dict:
+    with open(resources_dir / 'geoserviceDispatcher_vehicleinfo_vehicles.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_extract_vehicle_frame() -> None:
+    frame = extract_vehicle_frame(load())
+
+    assert len(frame) == 754
+    assert frame.last_update == 1624908805962
+    assert frame.ids[0] == '-1188950296508647671'
+    assert frame.active[0] == 0
+    assert isnan(frame.latitude[0])
+    assert frame.active[753] == 1
+    assert frame.latitude[753] == 50.09469611111111
+    assert frame.longitude[753] == 20.06513888888889
+    assert frame.heading[753] == 180
+    assert frame.category_of(753) == 'tram'
+    assert frame.color_of(753) == '0x000000'
+    assert frame.trip_ids[753] == '8059232507168536594'
+    assert frame.names[753] == '1 Zajezdnia Nowa Huta'
+    assert sum(frame.active) == 129
+
+
+def test_vehicle_frame_to_vehicles() -> None:
+    data = load()
+
+    assert extract_vehicle_frame(data).to_vehicles() == extract_vehicles(data)
+
+
+def test_vehicle_frame_from_vehicles() -> None:
+    data = load()
+    vehicles = extract_vehicles(data)
+
+    frame = VehicleFrame.from_vehicles(vehicles, last_update=data['lastUpdate'])
+
+    assert frame.to_vehicles() == vehicles
+    assert frame.ids == extract_vehicle_frame(data).ids
+    assert frame.last_update == 1624908805962
+
+
+def test_vehicle_frame_many_categories_and_colors() -> None:
+    data = {'lastUpdate': 1624908805962, 'vehicles': [
+        {'id': str(i), 'category': f'category{i}', 'color': f'0x{i:06x}'} for i in range(1000)
+    ]}
+
+    frame = extract_vehicle_frame(data)
+
+    assert len(frame.categories) == 1000
+    assert frame.category_of(999) == 'category999'
+    assert frame.color_of(999) == '0x0003e7'
+    assert VehicleFrame.from_vehicles(frame.to_vehicles()).color_of(300) == '0x00012c'
+
+
+def test_get_vehicle_frame(requests_mock: Mocker) -> None:
+    with open(resources_dir / 'geoserviceDispatcher_vehicleinfo_vehicles.json', 'r', encoding='utf-8') as f:
+        data = f.read()
+    requests_mock.get(f'{base_url}/internetservice/geoserviceDispatcher/services/vehicleinfo/vehicles', text=data)
+
+    frame = TTSS(base_url=base_url).get_vehicle_frame()
+
+    assert len(frame) == 754
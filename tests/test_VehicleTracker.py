@@ -0,0 +1,74 @@
+import json
+from pathlib import Path
+
+from requests_mock.mocker import Mocker
+
+from ttss import Route, Trip, TTSS, Vehicle, VehicleTracker
+
+base_url = 'http://www.ttss.krakow.pl'
+
+resources_dir = Path(__file__).parent / 'resources'
+
+url = f'{base_url}/internetservice/geoserviceDispatcher/services/vehicleinfo/vehicles'
+
+
+def test_vehicle_tracker(requests_mock: Mocker) -> None:
+    with open(resources_dir / 'geoserviceDispatcher_vehicleinfo_vehicles.json', 'r', encoding='utf-8') as f:
+        data = f.read()
+    requests_mock.get(url, text=data)
+    tracker = VehicleTracker(TTSS(base_url=base_url))
+
+    changes = tracker.update()
+
+    assert 'lastupdate' not in requests_mock.last_request.qs  # type: ignore[union-attr]
+    assert tracker.last_update == 1624908805962
+    assert len(tracker.vehicles) == 129
+    assert len(changes.added) == 129
+    assert changes.updated == changes.removed == []
+
+    delta = {
+        'lastUpdate': 1624908807962,
+        'vehicles': [
+            {'isDeleted': True, 'id': '-1188950296502609662'},
+            {'isDeleted': True, 'id': 'unknown'},
+            {'color': '0x000000', 'heading': 90, 'latitude': 180340000, 'name': '1 Zajezdnia Nowa Huta',
+             'tripId': '8059232507168536594', 'id': '-1188950296502609818', 'category': 'tram', 'longitude': 72234000},
+            {'color': '0x000000', 'heading': 0, 'latitude': 180000000, 'name': '52 Czerwone Maki P+R',
+             'tripId': 'new-trip', 'id': 'new-vehicle', 'category': 'tram', 'longitude': 72000000},
+        ],
+    }
+    requests_mock.get(url, text=json.dumps(delta))
+
+    changes = tracker.update()
+
+    assert requests_mock.last_request.qs['lastupdate'] == ['1624908805962']  # type: ignore[union-attr]
+    assert tracker.last_update == 1624908807962
+    assert len(tracker.vehicles) == 129
+    assert [vehicle.id for vehicle in changes.removed] == ['-1188950296502609662']
+    assert [vehicle.id for vehicle in changes.updated] == ['-1188950296502609818']
+    assert [vehicle.id for vehicle in changes.previous] == ['-1188950296502609818']
+    assert changes.previous[0] != changes.updated[0]
+    assert changes.added == [Vehicle(id='new-vehicle',
+                                     active=True,
+                                     latitude=50.0,
+                                     longitude=20.0,
+                                     heading=0,
+                                     category='tram',
+                                     color='0x000000',
+                                     trip=Trip(id='new-trip', route=Route(name='52'), direction='Czerwone Maki P+R'))]
+    assert tracker.vehicles['-1188950296502609818'].heading == 90
+    assert '-1188950296502609662' not in tracker.vehicles
+
+
+def test_vehicle_tracker_unchanged() -> None:
+    tracker = VehicleTracker(TTSS(base_url=base_url))
+    vehicle = Vehicle(id='1', active=True, latitude=50.0, longitude=20.0)
+
+    assert tracker.apply(1, [vehicle])
+    assert not tracker.apply(2, [Vehicle(id='1', active=True, latitude=50.0, longitude=20.0)])
+    assert tracker.last_update == 2
+
+    tracker.reset()
+
+    assert tracker.vehicles == {}
+    assert tracker.last_update is None
@@ -0,0 +1,95 @@
+from pathlib import Path
+
+import pytest
+
+from ttss import ResponseArchive, bulk
+from ttss.bulk import endpoint_of_file, endpoint_of_url, main, read_table, reprocess
+
+base_url = 'http://www.ttss.krakow.pl'
+
+resources_dir = Path(__file__).parent / 'resources'
+
+timestamp = 1624908799.0
+
+
+def test_endpoints() -> None:
+    assert endpoint_of_url(f'{base_url}/internetservice/services/passageInfo/stopPassages/stop?stop=1') == \
+        'stop_passages'
+    assert endpoint_of_url(f'{base_url}/internetservice/services/passageInfo/stopPassages/stopPoint') == \
+        'stop_point_passages'
+    assert endpoint_of_url(f'{base_url}/internetservice/services/routeInfo/route') is None
+    assert endpoint_of_file('passageInfo_stopPassages_stop.json') == 'stop_passages'
+    assert endpoint_of_file('passageInfo_stopPassages_stopPoint.json') == 'stop_point_passages'
+    assert endpoint_of_file('tripInfo_tripPassages_actual.json') == 'trip_passages'
+    assert endpoint_of_file('geoserviceDispatcher_vehicleinfo_vehicles-1624908805.json.gz') == 'vehicles'
+    assert endpoint_of_file('geoserviceDispatcher_stopinfo_stops.json') is None
+
+
+@pytest.fixture
+def archive_dir(tmp_path: Path) -> Path:
+    path = tmp_path / 'archive'
+    with ResponseArchive(path) as archive:
+        for i in range(5):
+            archive.append(f'{base_url}/internetservice/services/passageInfo/stopPassages/stop', {'stop': '3242'},
+                           (resources_dir / 'passageInfo_stopPassages_stop.json').read_bytes(),
+                           timestamp=timestamp + i)
+            archive.append(f'{base_url}/internetservice/geoserviceDispatcher/services/vehicleinfo/vehicles', {},
+                           (resources_dir / 'geoserviceDispatcher_vehicleinfo_vehicles.json').read_bytes(),
+                           timestamp=timestamp + i)
+        archive.append(f'{base_url}/internetservice/services/tripInfo/tripPassages', {'tripId': '8059232507168536594'},
+                       (resources_dir / 'tripInfo_tripPassages_actual.json').read_bytes(), timestamp=timestamp)
+        archive.append(f'{base_url}/internetservice/geoserviceDispatcher/services/pathinfo/route', {'id': '1'},
+                       (resources_dir / 'geoserviceDispatcher_pathinfo_route.json').read_bytes(), timestamp=timestamp)
+        archive.append(f'{base_url}/internetservice/services/routeInfo/route', {}, b'{}', timestamp=timestamp)
+        archive.append(f'{base_url}/internetservice/services/passageInfo/stopPassages/stop', {'stop': '1'},
+                       b'{"broken": true}', timestamp=timestamp)
+    return path
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_reprocess_archive(archive_dir: Path, tmp_path: Path, workers: int) -> None:
+    output = tmp_path / 'output'
+
+    totals = reprocess(archive_dir, output, workers=workers, chunk_size=3)
+
+    assert totals == {'responses': 12, 'errors': 1, 'stop_passages': 5 * 65, 'vehicles': 5 * 754,
+                      'trip_passages': 13, 'route_paths': 1068}
+    passages = read_table(output, 'stop_passages')
+    assert len(passages['passage_id']) == 5 * 65
+    assert passages['stop'][0] == 'Teatr Słowackiego'
+    assert passages['dt'][2] == '2021-06-28T21:33:00+02:00'
+    assert passages['timestamp'] == sorted(passages['timestamp'])
+    vehicles = read_table(output, 'vehicles')
+    assert set(vehicles) >= {'id', 'latitude', 'longitude', 'trip_id'}
+    assert len(set(vehicles['id'])) == 754
+    trips = read_table(output, 'trip_passages')
+    assert set(trips['trip_id']) == {'8059232507168536594'}
+    assert read_table(output, 'route_paths')['id'][0] == '1'
+    assert read_table(output, 'unknown') == {}
+
+
+def test_reprocess_directory(tmp_path: Path, capsys: pytest.CaptureFixture) -> None:
+    assert main([str(resources_dir), str(tmp_path), '--workers', '1']) == 0
+
+    output = capsys.readouterr().out
+    assert 'responses: 7' in output
+    assert len(read_table(tmp_path, 'stop_point_passages')['passage_id']) == 16
+    assert len(read_table(tmp_path, 'trip_passages')['seq_num']) == 2 * 13
+
+
+def test_reprocess_replaces_earlier_output(tmp_path: Path) -> None:
+    reprocess(resources_dir, tmp_path, workers=1, chunk_size=1)
+    reprocess(resources_dir, tmp_path, workers=1, chunk_size=100)
+
+    assert len(read_table(tmp_path, 'trip_passages')['seq_num']) == 2 * 13
+    assert len(list((tmp_path / 'trip_passages').iterdir())) == 1
+
+
+def test_reprocess_logs_errors(archive_dir: Path, tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    totals = reprocess(archive_dir, tmp_path / 'output', workers=1)
+
+    assert totals['errors'] == 1
+    [record] = [record for record in caplog.records if record.name == 'ttss.bulk']
+    assert 'stop_passages' in record.getMessage()
+    assert str(archive_dir) in record.getMessage()
+    assert bulk._archives == {}
@@ -0,0 +1,73 @@
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+import pytz
+
+from ttss import decoders
+from ttss.extractors import extract_paths, extract_stop_passages, extract_vehicles, extract_vehicles_update
+
+resources_dir = Path(__file__).parent / 'resources'
+
+now = datetime(2021, 6, 28, 21, 33, 19).replace(tzinfo=pytz.timezone('Europe/Warsaw'))
+
+
+def read(name: str) -> bytes:
+    with open(resources_dir / name, 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture(params=['msgspec', 'fallback'])
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    if request.param == 'msgspec':
+        pytest.importorskip('msgspec')
+    else:
+        monkeypatch.setattr(decoders, 'msgspec', None)
+    return request.param
+
+
+def test_loads() -> None:
+    assert decoders.loads(b'{"a": [1, 2.5, "\\u0142"]}') == {'a': [1, 2.5, 'ł']}
+
+
+@pytest.mark.parametrize('name', ['passageInfo_stopPassages_stop.json', 'passageInfo_stopPassages_stopPoint.json'])
+def test_decode_stop_passages(backend: str, name: str) -> None:
+    content = read(name)
+
+    assert decoders.decode_stop_passages(content, now=now) == extract_stop_passages(json.loads(content), now=now)
+
+
+@pytest.mark.parametrize('name', ['geoserviceDispatcher_pathinfo_route.json',
+                                  'geoserviceDispatcher_pathinfo_vehicle.json'])
+def test_decode_paths(backend: str, name: str) -> None:
+    content = read(name)
+
+    assert decoders.decode_paths(content) == extract_paths(json.loads(content))
+
+
+def test_decode_vehicles(backend: str) -> None:
+    content = read('geoserviceDispatcher_vehicleinfo_vehicles.json')
+
+    assert decoders.decode_vehicles(content) == extract_vehicles(json.loads(content))
+    assert decoders.decode_vehicles_update(content) == extract_vehicles_update(json.loads(content))
+
+
+def test_decode_vehicles_deleted(backend: str) -> None:
+    content = b'{"lastUpdate": 1, "vehicles": [{"id": "1"}, {"id": "2", "isDeleted": null}, {"id": "3", "isDeleted": true}]}'
+
+    vehicles = decoders.decode_vehicles(content)
+
+    assert [vehicle.active for vehicle in vehicles] == [True, False, False]
+    assert vehicles == extract_vehicles(json.loads(content))
+
+
+@pytest.mark.parametrize('decode, content', [
+    (lambda content: decoders.decode_vehicles(content), b'{"lastUpdate": 1}'),
+    (lambda content: decoders.decode_paths(content), b'{}'),
+    (lambda content: decoders.decode_stop_passages(content, now=now), b'{"stopName": "Rondo"}'),
+])
+def test_decode_missing_field(backend: str, decode: Callable[[bytes], Any], content: bytes) -> None:
+    with pytest.raises(KeyError):
+        decode(content)
@@ -1,12 +1,19 @@
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
 
 import pytest
+import pytz
 
-from ttss.utils import parse_time, round_seconds, timestamp_ms
+from ttss.utils import haversine, parse_time, relative_datetime, relative_datetimes, round_seconds, \
+    service_datetime, take, timestamp_ms
+
+tz = pytz.timezone('Europe/Warsaw')
 
 
 def test_parse_time():
     assert parse_time('12:34') == time(12, 34)
+    assert parse_time('00:00') == time(0, 0)
+    assert parse_time('23:59') == time(23, 59)
+    assert parse_time('9:05') == time(9, 5)
 
 
 @pytest.mark.freeze_time('2021-06-28 21:33:19')
@@ -25,3 +32,60 @@ def test_timestamp_ms():
 ])
 def test_round_seconds(dt: datetime, expected: datetime):
     assert round_seconds(dt) == expected
+
+
+@pytest.mark.parametrize('second', [0, 1, 29, 30, 31, 59])
+@pytest.mark.parametrize('seconds', [-61, -31, -30, -1, 0, 1, 29, 30, 31, 59, 60, 3599, 7200])
+def test_relative_datetime(second: int, seconds: int):
+    now = tz.localize(datetime(2021, 6, 28, 21, 33, second))
+    expected = round_seconds(now + timedelta(seconds=seconds))
+    assert relative_datetime(now, seconds) == expected
+    assert relative_datetimes(now, [seconds]) == [expected]
+
+
+def test_relative_datetimes_shares_objects():
+    now = tz.localize(datetime(2021, 6, 28, 21, 33, 19))
+    dts = relative_datetimes(now, [0, 10, 60, 41])
+    assert dts == [tz.localize(datetime(2021, 6, 28, 21, 33)), tz.localize(datetime(2021, 6, 28, 21, 33)),
+                   tz.localize(datetime(2021, 6, 28, 21, 34)), tz.localize(datetime(2021, 6, 28, 21, 34))]
+    assert dts[0] is dts[1]
+    assert dts[2] is dts[3]
+
+
+@pytest.mark.parametrize('reference, value, expected', [
+    (datetime(2021, 6, 28, 21, 33), time(21, 30), datetime(2021, 6, 28, 21, 30)),
+    (datetime(2021, 6, 28, 0, 5), time(23, 58), datetime(2021, 6, 27, 23, 58)),
+    (datetime(2021, 6, 28, 23, 50), time(0, 10), datetime(2021, 6, 29, 0, 10)),
+    (datetime(2021, 10, 30, 23, 50), time(0, 10), datetime(2021, 10, 31, 0, 10)),
+    (datetime(2021, 10, 31, 12, 0), time(4, 0), datetime(2021, 10, 31, 4, 0)),
+])
+def test_service_datetime(reference: datetime, value: time, expected: datetime):
+    dt = service_datetime(tz.localize(reference), value)
+    assert dt == tz.localize(expected)
+    assert dt.utcoffset() == tz.localize(expected).utcoffset()
+    assert service_datetime(reference, value) == expected
+
+
+def test_haversine():
+    assert haversine(50.0614, 19.9366, 50.0614, 19.9366) == 0.0
+    assert haversine(50.0647, 19.9450, 50.0614, 19.9366) == pytest.approx(703, abs=1)
+    assert haversine(0.0, 0.0, 0.0, 1.0) == pytest.approx(111_195, abs=1)
+
+
+def test_take():
+    assert list(take(range(10))) == list(range(10))
+    assert list(take(range(10), limit=3)) == [0, 1, 2]
+    assert list(take(range(10), predicate=lambda i: i % 2 == 1)) == [1, 3, 5, 7, 9]
+    assert list(take(range(10), predicate=lambda i: i % 2 == 1, limit=2)) == [1, 3]
+
+
+def test_take_stops_early():
+    consumed = []
+
+    def numbers():
+        for i in range(10):
+            consumed.append(i)
+            yield i
+
+    assert list(take(numbers(), predicate=lambda i: i > 2, limit=2)) == [3, 4]
+    assert consumed == [0, 1, 2, 3, 4]